@@ -0,0 +1,168 @@
+"""
+Plain-text extraction from uploaded resumes.
+
+Text is extracted once per ResumeBlob by a background task (see
+applications.tasks), so applicants do not wait for it. Applications sharing
+the blob are then re-indexed with the text. Blobs that predate the task, or
+whose task gave up, are picked up by `manage.py extract_resumes`.
+
+DOCX and TXT are read with the standard library. PDFs use pypdf when it is
+installed; otherwise a minimal reader pulls the text operators out of the
+page content streams, which covers resumes exported by word processors.
+Legacy .doc files are not extracted.
+"""
+import logging
+import re
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+from django.utils import timezone
+
+from task_queue.queue import enqueue
+
+from .models import ResumeBlob
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # Optional dependency
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 100000  # Characters kept per resume
+MAX_DOCX_XML_SIZE = 20 * 1024 * 1024  # Uncompressed document.xml read at most
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class UnsupportedResume(Exception):
+    pass
+
+
+def _text_from_txt(fp):
+    return fp.read(MAX_TEXT_LENGTH * 4).decode('utf-8', errors='replace')
+
+
+def _text_from_docx(fp):
+    with zipfile.ZipFile(fp) as archive:
+        try:
+            info = archive.getinfo('word/document.xml')
+        except KeyError:
+            raise UnsupportedResume('no word/document.xml')
+        if info.file_size > MAX_DOCX_XML_SIZE:
+            raise UnsupportedResume('document.xml too large')
+        paragraphs, current = [], []
+        with archive.open(info) as xml:
+            for event, element in ElementTree.iterparse(xml, events=('end',)):
+                if element.tag == WORD_NS + 't' and element.text:
+                    current.append(element.text)
+                elif element.tag == WORD_NS + 'tab':
+                    current.append('\t')
+                elif element.tag == WORD_NS + 'p':
+                    paragraphs.append(''.join(current))
+                    current = []
+                    element.clear()
+        return '\n'.join(paragraphs)
+
+
+STREAM_RE = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.DOTALL)
+TEXT_OP_RE = re.compile(rb'\((?:\\.|[^\\)])*\)\s*(?:Tj|\'|")|\[(?:\\.|[^\]])*\]\s*TJ|(?<![A-Za-z])(?:T\*|T[dD]|ET)(?![A-Za-z])')
+STRING_RE = re.compile(rb'\(((?:\\.|[^\\)])*)\)')
+ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+
+def _unescape(raw):
+    def replace(match):
+        value = match.group(1)
+        if value in ESCAPES:
+            return ESCAPES[value]
+        if value[:1].isdigit():
+            return bytes([int(value, 8) & 0xFF])
+        return value if value not in (b'\n', b'\r') else b''
+    return re.sub(rb'\\([0-7]{1,3}|.)', replace, raw, flags=re.DOTALL)
+
+
+def _text_from_pdf_streams(data):
+    """Text shown by Tj/TJ operators in (Flate or uncompressed) content streams"""
+    lines = []
+    for match in STREAM_RE.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        line = []
+        for op in TEXT_OP_RE.finditer(stream):
+            token = op.group(0)
+            if token[:1] in (b'(', b'['):
+                line.extend(_unescape(s).decode('latin-1') for s in STRING_RE.findall(token))
+            elif line:
+                lines.append(''.join(line))
+                line = []
+        if line:
+            lines.append(''.join(line))
+    return '\n'.join(lines)
+
+
+def _text_from_pdf(fp):
+    if PdfReader is not None:
+        return '\n'.join(page.extract_text() or '' for page in PdfReader(fp).pages)
+    return _text_from_pdf_streams(fp.read())
+
+
+EXTRACTORS = {
+    'txt': _text_from_txt,
+    'docx': _text_from_docx,
+    'pdf': _text_from_pdf,
+}
+
+
+def extract_text(name, fp):
+    """Plain text of a resume file; raises UnsupportedResume for formats that cannot be read"""
+    ext = name.rsplit('.', 1)[1].lower() if '.' in name else ''
+    extractor = EXTRACTORS.get(ext)
+    if extractor is None:
+        raise UnsupportedResume(f'no text extractor for .{ext}')
+    text = extractor(fp)
+    # Collapse runs of whitespace; keep line breaks as single newlines
+    text = re.sub(r'[ \t\r\f\v]+', ' ', text.replace('\x00', ''))
+    return re.sub(r'\n\s*\n+', '\n', text).strip()[:MAX_TEXT_LENGTH]
+
+
+def extract_blob(blob):
+    """Extract and store one blob's text, then re-index its applications"""
+    from .search import index_applications
+
+    try:
+        with blob.file.open('rb') as fp:
+            blob.text = extract_text(blob.file.name, fp)
+        blob.text_status = 'done'
+    except UnsupportedResume:
+        blob.text, blob.text_status = '', 'unsupported'
+    except Exception:
+        logger.exception('Could not extract text from resume %s', blob.file.name)
+        blob.text, blob.text_status = '', 'failed'
+    blob.text_extracted_at = timezone.now()
+    blob.save(update_fields=['text', 'text_status', 'text_extracted_at'])
+    if blob.text:
+        index_applications(blob.applications.all())
+    return blob.text_status
+
+
+def schedule_extraction(blob):
+    """Queue text extraction for a newly stored blob"""
+    from .tasks import extract_resume
+
+    if blob.text_status == 'pending':
+        enqueue(extract_resume, blob_id=blob.pk)
+
+
+def extract_pending(limit=None):
+    """Extract every blob still pending; returns {status: count}"""
+    counts = {}
+    blobs = ResumeBlob.objects.filter(text_status='pending').order_by('pk')
+    for blob in blobs[:limit] if limit else blobs.iterator():
+        status = extract_blob(blob)
+        counts[status] = counts.get(status, 0) + 1
+    return counts
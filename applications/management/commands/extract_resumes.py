@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from applications.extraction import extract_pending
+from applications.models import ResumeBlob
+
+
+class Command(BaseCommand):
+    help = 'Extract searchable text from resumes that have not been processed yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry resumes whose extraction failed')
+        parser.add_argument('--limit', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            ResumeBlob.objects.filter(text_status='failed').update(text_status='pending')
+        counts = extract_pending(limit=options['limit'])
+        if not counts:
+            self.stdout.write('No resumes pending extraction.')
+            return
+        summary = ', '.join(f'{count} {status}' for status, count in sorted(counts.items()))
+        self.stdout.write(self.style.SUCCESS(f'Processed {sum(counts.values())} resumes ({summary}).'))
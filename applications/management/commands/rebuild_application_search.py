@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from applications.search import application_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the job application full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not application_index.available():
+            self.stdout.write('Full-text search index is only used on SQLite; nothing to do.')
+            return
+        count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} applications.'))
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:02
+
+import hashlib
+import os
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'doc': 'application/msword',
+    'txt': 'text/plain',
+}
+
+
+def move_resumes_to_blobs(apps, schema_editor):
+    """Hash every existing resume and point its application at the shared blob"""
+    JobApplication = apps.get_model('applications', 'JobApplication')
+    ResumeBlob = apps.get_model('applications', 'ResumeBlob')
+    blobs = {}
+    for application in JobApplication.objects.exclude(resume_file='').exclude(resume_file=None).iterator():
+        name = application.resume_file.name
+        if not default_storage.exists(name):
+            continue
+        digest = hashlib.sha256()
+        with default_storage.open(name, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        blob = blobs.get(sha256)
+        if blob is None:
+            ext = name.rsplit('.', 1)[1].lower() if '.' in name else ''
+            blob_name = f'resumes/{sha256[:2]}/{sha256}.{ext}'
+            if not default_storage.exists(blob_name):
+                with default_storage.open(name, 'rb') as f:
+                    default_storage.save(blob_name, f)
+            blob = blobs[sha256] = ResumeBlob.objects.create(
+                sha256=sha256,
+                file=blob_name,
+                size=default_storage.size(blob_name),
+                content_type=CONTENT_TYPES.get(ext, 'application/octet-stream'),
+                original_name=os.path.basename(name)[:255],
+            )
+        application.resume_blob = blob
+        application.save(update_fields=['resume_blob'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(max_length=255, upload_to='resumes/')),
+                ('size', models.PositiveIntegerField()),
+                ('content_type', models.CharField(max_length=100)),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'resume_blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='resume_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='applications', to='applications.resumeblob'),
+        ),
+        migrations.RunPython(move_resumes_to_blobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='jobapplication',
+            name='resume_file',
+        ),
+        migrations.RenameField(
+            model_name='jobapplication',
+            old_name='resume_blob',
+            new_name='resume_file',
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+# BM25 weights, in column order: full_name, position_applied, skills,
+# work_experience, education, resume_text
+RANK_WEIGHTS = 'bm25(4.0, 6.0, 8.0, 2.0, 2.0, 1.0)'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS application_search USING fts5("
+        "full_name, position_applied, skills, work_experience, education, resume_text, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO application_search (application_search, rank) VALUES ('rank', %s)", [RANK_WEIGHTS]
+    )
+    schema_editor.execute(
+        "INSERT INTO application_search "
+        "(rowid, full_name, position_applied, skills, work_experience, education, resume_text) "
+        "SELECT a.id, COALESCE(a.full_name, ''), COALESCE(a.position_applied, ''), COALESCE(a.skills, ''), "
+        "COALESCE(a.work_experience, ''), COALESCE(a.education, ''), COALESCE(b.text, '') "
+        "FROM applications a LEFT JOIN resume_blobs b ON b.id = a.resume_file_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS application_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_resume_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeblob',
+            name='text',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='resumeblob',
+            name='text_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('done', 'Extracted'), ('unsupported', 'Unsupported format'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='resumeblob',
+            name='text_extracted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
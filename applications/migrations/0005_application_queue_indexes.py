@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_resume_text_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['status', '-applied_date', '-id'], name='applications_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['position_applied', 'status', '-applied_date', '-id'], name='applications_position_idx'),
+        ),
+    ]
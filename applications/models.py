@@ -1,6 +1,32 @@
 from django.db import models
 from django.utils import timezone
-from authentication.models import Employee
+from authentication.models import Employee, IdSequence
+
+
+class ResumeBlob(models.Model):
+    """A distinct resume file, stored once under its SHA-256 and shared by every application that uploaded it"""
+    TEXT_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Extracted'),
+        ('unsupported', 'Unsupported format'),
+        ('failed', 'Failed'),
+    ]
+    
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='resumes/', max_length=255)
+    size = models.PositiveIntegerField()
+    content_type = models.CharField(max_length=100)
+    original_name = models.CharField(max_length=255, blank=True)  # As first uploaded
+    created_at = models.DateTimeField(default=timezone.now)
+    text = models.TextField(blank=True)  # Extracted plain text, for search
+    text_status = models.CharField(max_length=20, choices=TEXT_STATUS_CHOICES, default='pending')
+    text_extracted_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'resume_blobs'
+    
+    def __str__(self):
+        return f"{self.original_name or self.file.name} ({self.sha256[:12]})"
 
 
 class JobApplication(models.Model):
@@ -18,7 +44,7 @@ class JobApplication(models.Model):
     phone = models.CharField(max_length=20)
     address = models.TextField()
     position_applied = models.CharField(max_length=100)
-    resume_file = models.FileField(upload_to='resumes/', null=True, blank=True)
+    resume_file = models.ForeignKey(ResumeBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='applications')
     work_experience = models.TextField()
     education = models.TextField()
     skills = models.TextField()
@@ -28,8 +54,16 @@ class JobApplication(models.Model):
     processed_date = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
     
+    ID_SEQUENCE = 'application_id'
+    
     class Meta:
         db_table = 'applications'
+        indexes = [
+            # HR queue: filter by status, newest first
+            models.Index(fields=['status', '-applied_date', '-id'], name='applications_status_date_idx'),
+            # Position filter, and covers the status/position counts
+            models.Index(fields=['position_applied', 'status', '-applied_date', '-id'], name='applications_position_idx'),
+        ]
     
     def __str__(self):
         return f"{self.application_id} - {self.full_name}"
@@ -39,18 +73,10 @@ class JobApplication(models.Model):
             self.application_id = self.generate_application_id()
         super().save(*args, **kwargs)
     
+    @staticmethod
+    def format_application_id(num):
+        return f"APP{num:04d}"
+    
     def generate_application_id(self):
         """Generate next application ID in format APP0001, APP0002, etc."""
-        last_app = JobApplication.objects.filter(
-            application_id__startswith='APP'
-        ).order_by('application_id').last()
-        
-        if last_app and last_app.application_id:
-            try:
-                num = int(last_app.application_id[3:]) + 1
-            except (ValueError, IndexError):
-                num = 1
-        else:
-            num = 1
-        
-        return f"APP{num:04d}"
\ No newline at end of file
+        return self.format_application_id(IdSequence.next_value(self.ID_SEQUENCE))
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Applicant search backed by an FTS5 index over the application's text fields
+and the text extracted from its resume. Rows are ranked with BM25, weighted
+towards skills and the position applied for (the weights are stored in the
+index's rank configuration by the migration that creates it).
+"""
+from django.db.models import Q
+
+from payroll_system.fts import FTSIndex
+
+from .models import JobApplication
+
+SEARCH_FIELDS = ['full_name', 'position_applied', 'skills', 'work_experience', 'education', 'resume_text']
+
+application_index = FTSIndex('application_search', SEARCH_FIELDS)
+
+
+def _values(application):
+    blob = application.resume_file
+    return {
+        'full_name': application.full_name,
+        'position_applied': application.position_applied,
+        'skills': application.skills,
+        'work_experience': application.work_experience,
+        'education': application.education,
+        'resume_text': blob.text if blob else '',
+    }
+
+
+def _rows(queryset, batch_size=1000):
+    fields = SEARCH_FIELDS[:-1]
+    for row in queryset.values('id', *fields, 'resume_file__text').iterator(chunk_size=batch_size):
+        row['resume_text'] = row['resume_file__text']
+        yield row['id'], row
+
+
+def index_application(application):
+    application_index.upsert(application.pk, _values(application))
+
+
+def index_applications(queryset):
+    """Re-index several applications, e.g. all those sharing a newly extracted resume"""
+    for rowid, values in _rows(queryset):
+        application_index.upsert(rowid, values)
+
+
+def unindex_application(application_pk):
+    application_index.delete(application_pk)
+
+
+def rebuild_index(batch_size=1000):
+    return application_index.rebuild(_rows(JobApplication.objects.all(), batch_size), batch_size=batch_size)
+
+
+def search_applications(queryset, query, limit, offset=0):
+    """
+    (page of applications best match first, total matches) within a filtered
+    queryset. Without the FTS index, falls back to substring matching on the
+    application fields, newest first.
+    """
+    query = (query or '').strip()
+    if application_index.available():
+        ids = application_index.ranked_ids(query, limit=limit, offset=offset, within=queryset)
+        rows = {application.pk: application for application in queryset.filter(id__in=ids)}
+        return [rows[pk] for pk in ids if pk in rows], application_index.count(query, within=queryset)
+    matches = queryset.filter(
+        Q(full_name__icontains=query) |
+        Q(position_applied__icontains=query) |
+        Q(skills__icontains=query) |
+        Q(work_experience__icontains=query) |
+        Q(education__icontains=query) |
+        Q(resume_file__text__icontains=query)
+    ).order_by('-applied_date')
+    return list(matches[offset:offset + limit]), matches.count()
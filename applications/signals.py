@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import JobApplication
+from .search import SEARCH_FIELDS, index_application, unindex_application
+
+
+@receiver(post_save, sender=JobApplication)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS + ['resume_file']):
+        return  # Status changes do not touch indexed text
+    index_application(instance)
+
+
+@receiver(post_delete, sender=JobApplication)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_application(instance.pk)
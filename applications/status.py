@@ -0,0 +1,55 @@
+"""
+Public application status lookups.
+
+The lookup is unauthenticated, so it is rate limited per client IP before
+anything touches the database, and IDs that are not in the APP0001 format
+are rejected without a query. Results are cached for a short time;
+update_application_status drops the cached entry when HR changes a status.
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+
+from security.throttle import SlidingWindowThrottle
+
+from .models import JobApplication
+
+STATUS_CACHE_TIMEOUT = 60
+APPLICATION_ID_RE = re.compile(r'^APP\d{4,10}$')
+STATUS_FIELDS = ('application_id', 'full_name', 'position_applied', 'applied_date', 'status', 'notes')
+
+
+def lookup_throttle():
+    return SlidingWindowThrottle(
+        'status-lookup',
+        getattr(settings, 'STATUS_LOOKUP_LIMIT', 10),
+        getattr(settings, 'STATUS_LOOKUP_WINDOW', 60),
+    )
+
+
+def normalize_id(application_id):
+    """The application ID in canonical form, or None if it cannot be one"""
+    application_id = (application_id or '').strip().upper()
+    return application_id if APPLICATION_ID_RE.match(application_id) else None
+
+
+def _key(application_id):
+    return f'applications:status:{application_id}'
+
+
+def get_status(application_id):
+    """Status fields of an application as a dict, or None if there is no such application"""
+    application_id = normalize_id(application_id)
+    if application_id is None:
+        return None
+    status = cache.get(_key(application_id))
+    if status is None:
+        status = JobApplication.objects.filter(application_id=application_id).values(*STATUS_FIELDS).first()
+        if status is not None:
+            cache.set(_key(application_id), status, STATUS_CACHE_TIMEOUT)
+    return status
+
+
+def invalidate_status(application_id):
+    cache.delete(_key(application_id))
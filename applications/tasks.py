@@ -0,0 +1,12 @@
+from task_queue.queue import task
+
+from .extraction import extract_blob
+from .models import ResumeBlob
+
+
+@task(priority=5)
+def extract_resume(blob_id):
+    """Extract a stored resume's text and re-index the applications that use it"""
+    blob = ResumeBlob.objects.filter(pk=blob_id, text_status='pending').first()
+    if blob:
+        extract_blob(blob)
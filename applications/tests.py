@@ -1,3 +1,263 @@
-from django.test import TestCase
+import hashlib
+import io
+import shutil
+import tempfile
+import zipfile
+import zlib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+
+from authentication.models import Employee
+from .extraction import UnsupportedResume, extract_text
+from .models import JobApplication, ResumeBlob
+from .search import search_applications
+from .status import get_status, normalize_id
+from .uploads import blob_name, looks_like
+
+SUBMIT_URL = '/applications/apply/submit/'
+
+
+def application_form(**extra):
+    form = {
+        'full_name': 'Applicant', 'email': 'applicant@example.com', 'phone': '555-0100', 'address': 'Main St',
+        'position': 'Developer', 'work_experience': 'Five years', 'education': 'BSc', 'skills': 'Python',
+    }
+    form.update(extra)
+    return form
+
+
+def docx(text):
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w') as archive:
+        archive.writestr('word/document.xml', (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p><w:p><w:r><w:t>Second</w:t></w:r></w:p>'
+            '</w:body></w:document>'
+        ))
+    return output.getvalue()
+
+
+def pdf(text):
+    content = zlib.compress(
+        b'BT /F1 12 Tf 72 712 Td (' + text.encode() + b') Tj 0 -14 Td [(Ku) -20 (bernetes)] TJ ET'
+    )
+    return (b'%PDF-1.4\n1 0 obj << /Length ' + str(len(content)).encode() + b' /Filter /FlateDecode >>\nstream\n'
+            + content + b'\nendstream\nendobj\n%%EOF')
+
+
+class MediaRootTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ResumeUploadTests(MediaRootTestCase):
+    def submit(self, filename, content, **extra):
+        return self.client.post(SUBMIT_URL, application_form(resume=SimpleUploadedFile(filename, content), **extra))
+
+    def test_identical_resumes_are_stored_once(self):
+        content = b'%PDF-1.4 resume'
+        self.assertEqual(self.submit('first.pdf', content).status_code, 200)
+        self.assertEqual(self.submit('second.pdf', content, full_name='Other').status_code, 200)
+
+        blob = ResumeBlob.objects.get()
+        self.assertEqual(blob.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(blob.file.name, blob_name(blob.sha256, 'pdf'))
+        self.assertEqual((blob.size, blob.original_name, blob.content_type), (len(content), 'first.pdf', 'application/pdf'))
+        self.assertTrue(default_storage.exists(blob.file.name))
+        self.assertEqual(JobApplication.objects.filter(resume_file=blob).count(), 2)
+
+    def test_content_must_match_extension(self):
+        response = self.submit('resume.pdf', b'MZ\x90\x00')
+        self.assertEqual(response.status_code, 302)
+        self.submit('resume.exe', b'MZ')
+        self.submit('resume.txt', b'text\x00binary')
+        self.assertFalse(JobApplication.objects.exists())
+        self.assertFalse(ResumeBlob.objects.exists())
+
+    @override_settings(RESUME_MAX_SIZE=100)
+    def test_oversized_resume_is_rejected(self):
+        self.assertEqual(self.submit('resume.txt', b'a' * 500).status_code, 302)
+        self.assertFalse(JobApplication.objects.exists())
+
+    def test_resume_is_optional_and_csrf_still_checked(self):
+        self.assertEqual(self.client.post(SUBMIT_URL, application_form()).status_code, 200)
+        self.assertEqual(Client(enforce_csrf_checks=True).post(SUBMIT_URL, application_form()).status_code, 403)
+
+    def test_signatures(self):
+        self.assertTrue(looks_like('docx', b'PK\x03\x04rest'))
+        self.assertFalse(looks_like('doc', b'PK\x03\x04rest'))
+        self.assertTrue(looks_like('txt', 'résumé'.encode()[:-1]))  # Character cut at the chunk boundary
+        self.assertFalse(looks_like('txt', b'\xff\xfe plain'))
+
+
+class ResumeSearchTests(MediaRootTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hr = Employee.objects.create(username='hr', name='HR', role='HR')
+
+    def submit(self, full_name, filename, content, **extra):
+        self.client.post(SUBMIT_URL, application_form(
+            full_name=full_name, resume=SimpleUploadedFile(filename, content), **extra
+        ))
+        return JobApplication.objects.get(full_name=full_name)
+
+    def test_extract_text(self):
+        self.assertEqual(extract_text('cv.docx', io.BytesIO(docx('Python Django'))), 'Python Django\nSecond')
+        self.assertEqual(extract_text('cv.pdf', io.BytesIO(pdf('Golang expert'))), 'Golang expert\nKubernetes')
+        self.assertEqual(extract_text('cv.txt', io.BytesIO(b'  Rust\n\n\nSQL\t ')), 'Rust\nSQL')
+        with self.assertRaises(UnsupportedResume):
+            extract_text('cv.doc', io.BytesIO(b'\xd0\xcf\x11\xe0'))
+
+    def test_uploaded_resumes_are_extracted_and_indexed(self):
+        alice = self.submit('Alice', 'cv.docx', docx('Rustacean embedded'))
+        bob = self.submit('Bob', 'cv.pdf', pdf('Golang expert'), skills='rust rust rust')
+
+        self.assertEqual(set(ResumeBlob.objects.values_list('text_status', flat=True)), {'done'})
+        self.assertEqual(search_applications(JobApplication.objects.all(), 'golang', 10), ([bob], 1))
+        self.assertEqual(search_applications(JobApplication.objects.all(), 'rust', 10), ([bob, alice], 2))
+        self.assertEqual(search_applications(JobApplication.objects.filter(full_name='Alice'), 'rust', 10), ([alice], 1))
+        self.assertEqual(search_applications(JobApplication.objects.all(), 'rust', 1, offset=1), ([alice], 2))
+
+    def test_unreadable_resume_is_marked_failed(self):
+        with self.assertLogs('applications.extraction', 'ERROR'):
+            self.submit('Carol', 'cv.docx', b'PK\x03\x04 not a zip')
+        self.assertEqual(ResumeBlob.objects.get().text_status, 'failed')
+        self.assertEqual(search_applications(JobApplication.objects.all(), 'carol', 10)[1], 1)
+
+    def test_status_change_keeps_index_in_step(self):
+        bob = self.submit('Bob', 'cv.pdf', pdf('Golang expert'))
+        self.client.force_login(self.hr)
+        self.client.post(f'/applications/hr/applications/{bob.id}/update/', {'status': 'Accepted', 'notes': 'ok'})
+        self.assertEqual(search_applications(JobApplication.objects.filter(status='Accepted'), 'golang', 10)[1], 1)
+        self.assertEqual(search_applications(JobApplication.objects.filter(status='Pending'), 'golang', 10)[1], 0)
+
+    def test_hr_views(self):
+        bob = self.submit('Bob', 'cv.pdf', pdf('Golang expert'))
+        self.submit('Alice', 'cv.docx', docx('Rustacean embedded'))
+        self.client.force_login(self.hr)
+
+        response = self.client.get('/applications/hr/applications/', {'q': 'golang', 'status': 'Pending'})
+        self.assertContains(response, 'Bob')
+        self.assertNotContains(response, 'Alice')
+        self.assertContains(self.client.get(f'/applications/hr/applications/{bob.id}/'), 'Golang expert')
+
+
+@override_settings(STATUS_LOOKUP_LIMIT=3, STATUS_LOOKUP_WINDOW=60)
+class StatusLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clock = mock.patch('security.throttle.time.time', return_value=6000.0)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.application = JobApplication.objects.create(
+            full_name='Zed', email='zed@example.com', phone='1', address='a', position_applied='Analyst',
+            work_experience='w', education='e', skills='s',
+        )
+        self.application_id = self.application.application_id
+
+    def lookup(self, application_id):
+        return self.client.get('/applications/apply/status/check.json', {'application_id': application_id})
+
+    def test_normalize_id(self):
+        self.assertEqual(normalize_id(' app0001 '), 'APP0001')
+        for value in (None, '', 'APP1', 'APP0001; DROP', 'EMP0001'):
+            with self.subTest(value=value):
+                self.assertIsNone(normalize_id(value))
+
+    def test_results_are_cached(self):
+        self.assertEqual(get_status(self.application_id.lower())['full_name'], 'Zed')
+        with self.assertNumQueries(0):
+            response = self.lookup(self.application_id.lower())
+        self.assertEqual(response.json()['application']['status'], 'Pending')
+        self.assertIn('max-age=60', response['Cache-Control'])
+
+    def test_malformed_ids_never_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.post('/applications/apply/status/check/', {'application_id': 'bogus'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.lookup('APP9999').status_code, 404)
+
+    def test_lookups_are_rate_limited_per_ip(self):
+        for _ in range(3):
+            self.assertEqual(self.lookup(self.application_id).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.post('/applications/apply/status/check/', {'application_id': self.application_id})
+        self.assertEqual(response.status_code, 429)
+        response = self.lookup(self.application_id)
+        self.assertEqual((response.status_code, response['Retry-After']), (429, '60'))
+        other_ip = self.client.get('/applications/apply/status/check.json', {'application_id': self.application_id},
+                                   REMOTE_ADDR='10.9.9.9')
+        self.assertEqual(other_ip.status_code, 200)
+
+    def test_status_update_invalidates_cache(self):
+        self.lookup(self.application_id)
+        self.client.force_login(Employee.objects.create(username='hr', name='HR', role='HR'))
+        self.client.post(f'/applications/hr/applications/{self.application.id}/update/',
+                         {'status': 'Accepted', 'notes': 'Welcome'})
+        self.assertEqual(self.lookup(self.application_id).json()['application']['status'], 'Accepted')
+
+    def test_status_page(self):
+        response = self.client.post('/applications/apply/status/check/', {'application_id': self.application_id})
+        self.assertContains(response, 'Zed')
+
+
+class ApplicationQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(Employee.objects.create(username='hr', name='HR', role='HR'))
+        start = timezone.now()
+        statuses = ['Pending', 'Under Review', 'Accepted', 'Rejected']
+        JobApplication.objects.bulk_create([
+            JobApplication(
+                application_id=f'APP{index + 1:04d}', full_name=f'Applicant {index}', email='a@example.com',
+                phone='1', address='a', position_applied='Developer' if index % 3 else 'Analyst',
+                work_experience='w', education='e', skills='s', status=statuses[index % 4],
+                applied_date=start - timedelta(hours=index // 2),  # Ties on date: the id breaks them
+            )
+            for index in range(40)
+        ])
+
+    def get(self, **params):
+        return self.client.get('/applications/hr/applications/', params).context
+
+    def test_keyset_pages_cover_every_row_once(self):
+        first = self.get()['applications']
+        second = self.get(after=first.next_cursor)['applications']
+        ids = [application.id for application in first] + [application.id for application in second]
+
+        self.assertEqual((len(first), len(second)), (25, 15))
+        self.assertFalse(second.has_next)
+        self.assertEqual(ids, list(JobApplication.objects.order_by('status', '-applied_date', '-id').values_list('id', flat=True)))
+        back = self.get(before=second.previous_cursor)['applications']
+        self.assertEqual([application.id for application in back], ids[:25])
+
+    def test_status_filter_pages(self):
+        first = self.get(status='Pending', position='Developer')['applications']
+        expected = JobApplication.objects.filter(status='Pending', position_applied='Developer')
+        self.assertEqual(sorted(application.id for application in first), sorted(expected.values_list('id', flat=True)))
+        self.assertFalse(first.has_next)
+
+    def test_counts_match_the_filters(self):
+        context = self.get(position='Analyst')
+        analyst = JobApplication.objects.filter(position_applied='Analyst')
+        self.assertEqual(context['status_counts'], [
+            (value, label, analyst.filter(status=value).count()) for value, label in JobApplication.STATUS_CHOICES
+        ])
+        self.assertEqual(context['total_count'], analyst.count())
+        self.assertEqual(context['position_counts'], [('Analyst', 14), ('Developer', 26)])
+
+        context = self.get(status='Accepted')
+        self.assertEqual(dict((value, count) for value, _, count in context['status_counts']),
+                         {'Pending': 10, 'Under Review': 10, 'Accepted': 10, 'Rejected': 10})
+        self.assertEqual({application.status for application in context['applications']}, {'Accepted'})
@@ -0,0 +1,124 @@
+"""
+Streaming resume uploads with content-addressed storage.
+
+ResumeUploadHandler replaces Django's default upload handlers for the
+application form. It checks the file's extension and leading bytes on the
+first chunk, hashes every chunk as it arrives, streams the body to a
+temporary file and drops the file as soon as it passes RESUME_MAX_SIZE.
+The view must install the handler before the request body is read, hence
+the csrf_exempt/csrf_protect pair on submit_application.
+
+store_resume then saves each distinct file once, under its SHA-256, and
+returns the ResumeBlob every application with the same content shares.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+
+from .models import ResumeBlob
+
+FIELD_NAME = 'resume'
+
+# extension: (content type, accepted leading bytes; None means plain text)
+ALLOWED_TYPES = {
+    'pdf': ('application/pdf', (b'%PDF-',)),
+    'docx': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', (b'PK\x03\x04',)),
+    'doc': ('application/msword', (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',)),
+    'txt': ('text/plain', None),
+}
+
+
+def max_resume_size():
+    return getattr(settings, 'RESUME_MAX_SIZE', 5 * 1024 * 1024)
+
+
+def extension(filename):
+    return filename.rsplit('.', 1)[1].lower() if '.' in (filename or '') else ''
+
+
+def looks_like(ext, head):
+    """Whether the first bytes of a file match what its extension claims"""
+    content_type, signatures = ALLOWED_TYPES[ext]
+    if signatures is None:
+        if b'\x00' in head:
+            return False
+        try:
+            head.decode('utf-8')
+        except UnicodeDecodeError as exc:
+            # A multi-byte character may be cut at the chunk boundary
+            return exc.start >= len(head) - 3
+        return True
+    return head.startswith(signatures)
+
+
+class ResumeUploadHandler(TemporaryFileUploadHandler):
+    """Validates, hashes and size-limits the resume while it streams in"""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.errors = []
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        if field_name != FIELD_NAME:
+            self.errors.append(f'Unexpected file field "{field_name}".')
+            raise SkipFile()
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.extension = extension(file_name)
+        if self.extension not in ALLOWED_TYPES:
+            self.errors.append('Resume must be a PDF, DOC, DOCX or TXT file.')
+            raise SkipFile()
+        self.digest = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and not looks_like(self.extension, raw_data[:2048]):
+            self.errors.append(f'The uploaded file is not a valid {self.extension.upper()} document.')
+            raise SkipFile()
+        self.received += len(raw_data)
+        if self.received > max_resume_size():
+            self.errors.append(f'Resume is larger than {max_resume_size() // (1024 * 1024)} MB.')
+            raise SkipFile()
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if file_size == 0:
+            self.errors.append('The uploaded resume is empty.')
+            return None
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.digest.hexdigest()
+        uploaded.content_type = ALLOWED_TYPES[self.extension][0]
+        return uploaded
+
+
+def blob_name(sha256, ext):
+    return f'resumes/{sha256[:2]}/{sha256}.{ext}'
+
+
+def store_resume(uploaded):
+    """Return the ResumeBlob for an uploaded file, saving its content only if it is new"""
+    blob = ResumeBlob.objects.filter(sha256=uploaded.sha256).first()
+    if blob:
+        return blob
+
+    name = blob_name(uploaded.sha256, extension(uploaded.name))
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, uploaded)
+        if saved != name:
+            # Another request stored the same content first
+            default_storage.delete(saved)
+    try:
+        with transaction.atomic():
+            return ResumeBlob.objects.create(
+                sha256=uploaded.sha256,
+                file=name,
+                size=uploaded.size,
+                content_type=uploaded.content_type,
+                original_name=os.path.basename(uploaded.name)[:255],
+            )
+    except IntegrityError:
+        return ResumeBlob.objects.get(sha256=uploaded.sha256)
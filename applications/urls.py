@@ -6,6 +6,7 @@ urlpatterns = [
     path('apply/submit/', views.submit_application, name='submit_application'),
     path('apply/status/', views.check_status, name='check_status'),
     path('apply/status/check/', views.status_lookup, name='status_lookup'),
+    path('apply/status/check.json', views.status_lookup_json, name='status_lookup_json'),
     path('hr/applications/', views.manage_applications, name='manage_applications'),
     path('hr/applications/<int:app_id>/', views.view_application, name='view_application'),
     path('hr/applications/<int:app_id>/update/', views.update_application_status, name='update_application_status'),
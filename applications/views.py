@@ -1,12 +1,22 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.files.storage import default_storage
-from django.http import HttpResponse
+from django.conf import settings
+from django.db.models import Count
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control
 from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from .extraction import schedule_extraction
 from .models import JobApplication
+from .search import search_applications
+from .status import STATUS_CACHE_TIMEOUT, get_status, invalidate_status, lookup_throttle
+from .uploads import ResumeUploadHandler, max_resume_size, store_resume
 from authentication.models import Employee
-import os
+from payroll_system.pagination import KeysetPaginator
+
+APPLICATIONS_PER_PAGE = 25
+APPLICATION_TEXT_FIELDS = ('address', 'work_experience', 'education', 'skills', 'notes')
 
 
 def apply_view(request):
@@ -14,18 +24,33 @@ def apply_view(request):
     return render(request, 'applications/apply.html')
 
 
+@csrf_exempt
 def submit_application(request):
     """Submit a new job application"""
+    # Upload handlers must be swapped before anything reads the body, and
+    # the CSRF check reads request.POST, so it runs inside instead
+    if request.method == 'POST':
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if content_length > max_resume_size() + settings.DATA_UPLOAD_MAX_MEMORY_SIZE:
+            messages.error(request, f'Resume is larger than {max_resume_size() // (1024 * 1024)} MB.')
+            return redirect('apply')
+        request.upload_handlers = [ResumeUploadHandler(request)]
+    return _submit_application(request)
+
+
+@csrf_protect
+def _submit_application(request):
     if request.method == 'POST':
         try:
-            # Handle file upload
-            resume_file = None
-            if 'resume' in request.FILES:
-                file = request.FILES['resume']
-                if file and allowed_file(file.name):
-                    # Generate unique filename
-                    filename = f"resume_{timezone.now().strftime('%Y%m%d_%H%M%S')}_{file.name}"
-                    resume_file = default_storage.save(f'resumes/{filename}', file)
+            handler = request.upload_handlers[0]
+            resume = request.FILES.get('resume')
+            if handler.errors:
+                for error in handler.errors:
+                    messages.error(request, error)
+                return redirect('apply')
+            
+            # Identical files share one stored blob
+            resume_file = store_resume(resume) if resume else None
             
             # Create application
             application = JobApplication.objects.create(
@@ -40,6 +65,8 @@ def submit_application(request):
                 skills=request.POST['skills'],
                 status='Pending'
             )
+            if resume_file:
+                schedule_extraction(resume_file)
             
             return render(request, 'applications/application_success.html', {
                 'application_id': application.application_id
@@ -60,20 +87,43 @@ def check_status(request):
 def status_lookup(request):
     """Look up application status"""
     if request.method == 'POST':
-        app_id = request.POST.get('application_id')
+        # Rate limit before touching the database
+        throttle = lookup_throttle()
+        ip_address = request.META.get('REMOTE_ADDR')
+        if throttle.is_limited(ip_address):
+            messages.error(request, 'Too many status lookups. Please try again in a minute.')
+            return render(request, 'applications/check_status.html', status=429)
+        throttle.hit(ip_address)
         
-        try:
-            application = JobApplication.objects.get(application_id=app_id)
-            return render(request, 'applications/status_result.html', {
-                'application': application
-            })
-        except JobApplication.DoesNotExist:
+        application = get_status(request.POST.get('application_id'))
+        if application is None:
             messages.error(request, 'Application ID not found. Please check your ID and try again.')
             return redirect('check_status')
+        return render(request, 'applications/status_result.html', {
+            'application': application
+        })
     
     return redirect('check_status')
 
 
+def status_lookup_json(request):
+    """Application status as JSON, for fetching without a page render"""
+    throttle = lookup_throttle()
+    ip_address = request.META.get('REMOTE_ADDR')
+    if throttle.is_limited(ip_address):
+        response = JsonResponse({'error': 'Too many status lookups. Please try again in a minute.'}, status=429)
+        response['Retry-After'] = str(throttle.window)
+        return response
+    throttle.hit(ip_address)
+    
+    application = get_status(request.POST.get('application_id') or request.GET.get('application_id'))
+    if application is None:
+        return JsonResponse({'error': 'Application ID not found.'}, status=404)
+    response = JsonResponse({'application': application})
+    patch_cache_control(response, private=True, max_age=STATUS_CACHE_TIMEOUT)
+    return response
+
+
 @login_required
 def manage_applications(request):
     """HR view for managing job applications"""
@@ -81,12 +131,55 @@ def manage_applications(request):
         messages.error(request, 'Access denied. Insufficient permissions.')
         return redirect('home')
     
-    # Order by status priority and date
-    applications = JobApplication.objects.all().order_by('status', '-applied_date')
+    search_query = request.GET.get('q', '').strip()
+    status = request.GET.get('status', '')
+    position = request.GET.get('position', '')
     
-    return render(request, 'applications/manage_applications.html', {
-        'applications': applications
-    })
+    # Per-status and per-position counts from one grouped query
+    status_counts = {value: 0 for value, _ in JobApplication.STATUS_CHOICES}
+    position_counts = {}
+    for row in JobApplication.objects.values('status', 'position_applied').annotate(count=Count('id')).order_by():
+        position_counts[row['position_applied']] = position_counts.get(row['position_applied'], 0) + row['count']
+        if not position or row['position_applied'] == position:
+            status_counts[row['status']] = status_counts.get(row['status'], 0) + row['count']
+    
+    # The list never shows the long free-text fields
+    applications = JobApplication.objects.defer(*APPLICATION_TEXT_FIELDS)
+    if status:
+        applications = applications.filter(status=status)
+    if position:
+        applications = applications.filter(position_applied=position)
+    
+    context = {
+        'search_query': search_query,
+        'status': status,
+        'position': position,
+        'status_counts': [(value, label, status_counts.get(value, 0)) for value, label in JobApplication.STATUS_CHOICES],
+        'position_counts': sorted(position_counts.items()),
+        'total_count': sum(status_counts.values()),
+    }
+    
+    if search_query:
+        # Best matches first, ranked over skills, experience and resume text
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+        offset = (page - 1) * APPLICATIONS_PER_PAGE
+        results, total = search_applications(applications, search_query, APPLICATIONS_PER_PAGE, offset)
+        context.update({
+            'applications': results,
+            'total': total,
+            'page': page,
+            'previous_page': page - 1 if page > 1 else None,
+            'next_page': page + 1 if offset + len(results) < total else None,
+        })
+    else:
+        # Keyset pagination in status priority and date order
+        paginator = KeysetPaginator(applications, ('status', '-applied_date', '-id'), per_page=APPLICATIONS_PER_PAGE)
+        context['applications'] = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
+    
+    return render(request, 'applications/manage_applications.html', context)
 
 
 @login_required
@@ -117,15 +210,11 @@ def update_application_status(request, app_id):
         application.notes = request.POST.get('notes', '')
         application.processed_by = request.user
         application.processed_date = timezone.now()
-        application.save()
+        application.save(update_fields=['status', 'notes', 'processed_by', 'processed_date'])
+        invalidate_status(application.application_id)
         
         messages.success(request, 'Application status updated successfully!')
         return redirect('view_application', app_id=app_id)
     
     return redirect('view_application', app_id=app_id)
 
-
-def allowed_file(filename):
-    """Check if file extension is allowed"""
-    ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
\ No newline at end of file
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:09
+
+from django.db import migrations, models
+
+
+def highest_number(values, prefix):
+    highest = 0
+    for value in values:
+        if value and value.startswith(prefix):
+            try:
+                highest = max(highest, int(value[len(prefix):]))
+            except ValueError:
+                pass
+    return highest
+
+
+def seed_sequences(apps, schema_editor):
+    Employee = apps.get_model('authentication', 'Employee')
+    JobApplication = apps.get_model('applications', 'JobApplication')
+    IdSequence = apps.get_model('authentication', 'IdSequence')
+    IdSequence.objects.bulk_create([
+        IdSequence(name='employee_id', value=highest_number(
+            Employee.objects.values_list('employee_id', flat=True).iterator(), 'EMP'
+        )),
+        IdSequence(name='application_id', value=highest_number(
+            JobApplication.objects.values_list('application_id', flat=True).iterator(), 'APP'
+        )),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_keyset_pagination_indexes'),
+        ('applications', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'id_sequences',
+            },
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_id_sequences'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='securitylog',
+            index=models.Index(fields=['event_type', 'timestamp'], name='security_logs_event_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='securitylog',
+            index=models.Index(fields=['user', 'timestamp'], name='security_logs_user_ts_idx'),
+        ),
+    ]
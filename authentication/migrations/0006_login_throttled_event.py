@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_security_log_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='securitylog',
+            name='event_type',
+            field=models.CharField(choices=[('LOGIN_SUCCESS', 'Successful Login'), ('LOGIN_FAILED', 'Failed Login'), ('LOGIN_THROTTLED', 'Login Throttled'), ('LOGOUT', 'Logout'), ('SESSION_TIMEOUT', 'Session Timeout'), ('PASSWORD_CHANGE', 'Password Change'), ('PROFILE_UPDATE', 'Profile Update'), ('DATA_EXPORT', 'Data Export'), ('MANUAL_BACKUP', 'Manual Backup'), ('SYSTEM_ACCESS', 'System Access')], max_length=50),
+        ),
+    ]
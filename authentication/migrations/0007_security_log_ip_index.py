@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_login_throttled_event'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='securitylog',
+            index=models.Index(fields=['ip_address', 'timestamp'], name='security_logs_ip_ts_idx'),
+        ),
+    ]
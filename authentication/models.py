@@ -1,9 +1,62 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import F
 from django.utils import timezone
 import uuid
 
 
+class IdSequence(models.Model):
+    """Named counters behind human-readable IDs such as EMP001 and APP0001"""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'id_sequences'
+    
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+    
+    @classmethod
+    def next_value(cls, name, count=1):
+        """Atomically advance a counter by `count` and return the new (last reserved) value"""
+        value = cls._increment(name, count)
+        if value is None:
+            cls.objects.get_or_create(name=name)
+            value = cls._increment(name, count)
+        return value
+    
+    @staticmethod
+    def _supports_update_returning():
+        """UPDATE ... RETURNING exists on PostgreSQL and SQLite >= 3.35, not on MySQL or MariaDB"""
+        if connection.vendor == 'postgresql':
+            return True
+        if connection.vendor == 'sqlite':
+            return connection.Database.sqlite_version_info >= (3, 35)
+        return False
+    
+    @classmethod
+    def _increment(cls, name, count):
+        if cls._supports_update_returning():
+            # Single-statement increment-and-fetch
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {cls._meta.db_table} SET value = value + %s WHERE name = %s RETURNING value',
+                    [count, name],
+                )
+                row = cursor.fetchone()
+            return row[0] if row else None
+        with transaction.atomic():
+            if not cls.objects.filter(name=name).update(value=F('value') + count):
+                return None
+            return cls.objects.filter(name=name).values_list('value', flat=True).get()
+    
+    @classmethod
+    def reserve(cls, name, count):
+        """Reserve a contiguous block of `count` values, returned as a range"""
+        last = cls.next_value(name, count)
+        return range(last - count + 1, last + 1)
+
+
 class Employee(AbstractUser):
     """Custom User model representing an Employee"""
     ROLE_CHOICES = [
@@ -39,8 +92,14 @@ class Employee(AbstractUser):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
+    ID_SEQUENCE = 'employee_id'
+    
     class Meta:
         db_table = 'employees'
+        indexes = [
+            # Keyset pagination of the employee directory by (name, id)
+            models.Index(fields=['name', 'id'], name='employees_name_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.employee_id} - {self.name}"
@@ -50,21 +109,13 @@ class Employee(AbstractUser):
             self.employee_id = self.generate_employee_id()
         super().save(*args, **kwargs)
     
+    @staticmethod
+    def format_employee_id(num):
+        return f"EMP{num:03d}"
+    
     def generate_employee_id(self):
         """Generate next employee ID in format EMP001, EMP002, etc."""
-        last_employee = Employee.objects.filter(
-            employee_id__startswith='EMP'
-        ).order_by('employee_id').last()
-        
-        if last_employee and last_employee.employee_id:
-            try:
-                num = int(last_employee.employee_id[3:]) + 1
-            except (ValueError, IndexError):
-                num = 1
-        else:
-            num = 1
-        
-        return f"EMP{num:03d}"
+        return self.format_employee_id(IdSequence.next_value(self.ID_SEQUENCE))
     
     @property
     def is_admin(self):
@@ -128,6 +179,11 @@ class Leave(models.Model):
     
     class Meta:
         db_table = 'leaves'
+        indexes = [
+            # Range-overlap checks for one employee: start_date <= end AND end_date >= start
+            models.Index(fields=['employee', 'start_date', 'end_date'], name='leaves_employee_range_idx'),
+            models.Index(fields=['status', 'applied_at'], name='leaves_status_applied_idx'),
+        ]
     
     def __str__(self):
         return f"{self.employee.name} - {self.type} ({self.start_date} to {self.end_date})"
@@ -157,6 +213,7 @@ class SecurityLog(models.Model):
     EVENT_TYPE_CHOICES = [
         ('LOGIN_SUCCESS', 'Successful Login'),
         ('LOGIN_FAILED', 'Failed Login'),
+        ('LOGIN_THROTTLED', 'Login Throttled'),
         ('LOGOUT', 'Logout'),
         ('SESSION_TIMEOUT', 'Session Timeout'),
         ('PASSWORD_CHANGE', 'Password Change'),
@@ -176,6 +233,13 @@ class SecurityLog(models.Model):
     class Meta:
         db_table = 'security_logs'
         ordering = ['-timestamp']
+        indexes = [
+            # Keyset pagination newest first by (timestamp, id)
+            models.Index(fields=['timestamp', 'id'], name='security_logs_ts_id_idx'),
+            models.Index(fields=['event_type', 'timestamp'], name='security_logs_event_ts_idx'),
+            models.Index(fields=['user', 'timestamp'], name='security_logs_user_ts_idx'),
+            models.Index(fields=['ip_address', 'timestamp'], name='security_logs_ip_ts_idx'),
+        ]
     
     def __str__(self):
         return f"{self.event_type} - {self.user} - {self.timestamp}"
\ No newline at end of file
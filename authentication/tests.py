@@ -1,3 +1,95 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from applications.models import JobApplication
+from .models import Employee, IdSequence
+
+
+class IdSequenceTests(TestCase):
+    def test_ids_keep_numeric_order_past_three_digits(self):
+        IdSequence.objects.update_or_create(name=Employee.ID_SEQUENCE, defaults={'value': 999})
+        first = Employee.objects.create(username='first', name='First')
+        second = Employee.objects.create(username='second', name='Second')
+        self.assertEqual(first.employee_id, 'EMP1000')
+        self.assertEqual(second.employee_id, 'EMP1001')
+
+    def test_application_ids_use_their_own_sequence(self):
+        IdSequence.objects.update_or_create(name=JobApplication.ID_SEQUENCE, defaults={'value': 9999})
+        application = JobApplication(full_name='Applicant')
+        self.assertEqual(application.generate_application_id(), 'APP10000')
+        self.assertEqual(Employee(username='x').generate_employee_id()[:3], 'EMP')
+
+    def test_reserve_returns_contiguous_block(self):
+        block = IdSequence.reserve('test', 50)
+        self.assertEqual(list(block), list(range(1, 51)))
+        self.assertEqual(IdSequence.next_value('test'), 51)
+
+    def test_generation_cost_does_not_grow_with_table_size(self):
+        def queries_for_next_id():
+            with CaptureQueriesContext(connection) as context:
+                Employee(username='probe').generate_employee_id()
+            return context.captured_queries
+
+        Employee.objects.create(username='seed', name='Seed')
+        small = queries_for_next_id()
+        Employee.objects.bulk_create([
+            Employee(username=f'bulk{i}', name=f'Bulk {i}', employee_id=f'EMP{i + 10:03d}') for i in range(500)
+        ])
+        large = queries_for_next_id()
+
+        self.assertEqual(len(small), len(large))
+        for query in large:
+            self.assertNotIn('employees', query['sql'])
+
+
+    def test_fallback_without_update_returning(self):
+        for vendor in ('mysql', 'oracle'):
+            with self.subTest(vendor=vendor), mock.patch.object(connection, 'vendor', vendor):
+                self.assertFalse(IdSequence._supports_update_returning())
+        IdSequence.objects.create(name='fallback', value=7)
+        with mock.patch.object(IdSequence, '_supports_update_returning', return_value=False), \
+                CaptureQueriesContext(connection) as context:
+            self.assertEqual(IdSequence.next_value('fallback', 3), 10)
+            self.assertEqual(IdSequence.next_value('new-counter'), 1)
+        self.assertFalse(any('RETURNING' in query['sql'] for query in context.captured_queries))
+
+    def test_update_returning_depends_on_sqlite_version(self):
+        with mock.patch.object(connection, 'vendor', 'sqlite'):
+            with mock.patch.object(connection.Database, 'sqlite_version_info', (3, 34, 1)):
+                self.assertFalse(IdSequence._supports_update_returning())
+            with mock.patch.object(connection.Database, 'sqlite_version_info', (3, 35, 0)):
+                self.assertTrue(IdSequence._supports_update_returning())
+
+
+class ConcurrentIdGenerationTests(TransactionTestCase):
+    def test_concurrent_inserts_get_unique_ids(self):
+        threads_count = 8
+        per_thread = 10
+        barrier = threading.Barrier(threads_count)
+        errors = []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                for i in range(per_thread):
+                    Employee.objects.create(username=f'user-{index}-{i}', name=f'User {index}-{i}')
+            except Exception as exc:  # Surface failures from the worker threads
+                errors.append(exc)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        ids = list(Employee.objects.values_list('employee_id', flat=True))
+        self.assertEqual(len(ids), threads_count * per_thread)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(IdSequence.objects.get(name=Employee.ID_SEQUENCE).value, threads_count * per_thread)
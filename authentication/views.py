@@ -3,7 +3,10 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
-from .models import Employee, SecurityLog
+from .models import Employee, Leave
+from hr_management.ledger import ACCRUING_LEAVE_TYPES, get_balances
+from security.audit import log_event
+from security.throttle import check_login_throttle, clear_login_failures, record_login_failure
 from django.utils import timezone
 
 
@@ -13,12 +16,18 @@ def login_view(request):
         username = request.POST.get('username')
         password = request.POST.get('password')
         
+        # Reject brute force before spending a password hash on it
+        if check_login_throttle(request, username):
+            messages.error(request, 'Too many failed login attempts. Please try again in a few minutes.')
+            return render(request, 'authentication/login.html', status=429)
+        
         user = authenticate(request, username=username, password=password)
         if user is not None and user.status == 'Active':
             login(request, user)
+            clear_login_failures(username)
             
             # Log successful login
-            SecurityLog.objects.create(
+            log_event(
                 event_type='LOGIN_SUCCESS',
                 user=user,
                 ip_address=request.META.get('REMOTE_ADDR'),
@@ -38,8 +47,10 @@ def login_view(request):
             else:
                 return redirect('home')
         else:
+            record_login_failure(request, username)
+            
             # Log failed login
-            SecurityLog.objects.create(
+            log_event(
                 event_type='LOGIN_FAILED',
                 ip_address=request.META.get('REMOTE_ADDR'),
                 user_agent=request.META.get('HTTP_USER_AGENT'),
@@ -53,7 +64,7 @@ def login_view(request):
 def logout_view(request):
     """Logout view"""
     if request.user.is_authenticated:
-        SecurityLog.objects.create(
+        log_event(
             event_type='LOGOUT',
             user=request.user,
             ip_address=request.META.get('REMOTE_ADDR'),
@@ -116,4 +127,15 @@ def employee_dashboard(request):
         messages.error(request, 'Access denied. Insufficient permissions.')
         return redirect('home')
     
-    return render(request, 'employee/dashboard.html')
\ No newline at end of file
+    leave_balances = get_balances(request.user)
+    
+    context = {
+        'leave_balances': [
+            {'type': label, 'balance': leave_balances[leave_type]}
+            for leave_type, label in Leave.LEAVE_TYPE_CHOICES if leave_type in ACCRUING_LEAVE_TYPES
+        ],
+        'available_leave_days': sum(
+            balance for leave_type, balance in leave_balances.items() if leave_type in ACCRUING_LEAVE_TYPES
+        ),
+    }
+    return render(request, 'employee/dashboard.html', context)
\ No newline at end of file
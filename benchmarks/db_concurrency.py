@@ -0,0 +1,168 @@
+"""
+Concurrent write benchmark for the database connection settings.
+
+Several processes act as app workers: each "request" runs one kiosk-style
+transaction (read the employee's last punch, insert a new one). The
+request opens a connection first and closes it afterwards, unless the mode
+keeps persistent connections. Each mode runs against a fresh database and
+reports throughput, latency percentiles and failed requests ("database is
+locked").
+
+    python benchmarks/db_concurrency.py --processes 8 --seconds 5
+    python benchmarks/db_concurrency.py --modes rollback,wal-immediate --json results.json
+
+SQLite modes:
+  rollback                 the previous settings: rollback journal, full sync, 5 s timeout
+  wal                      WAL, synchronous=NORMAL, mmap, 20 s busy timeout
+  wal-immediate            as wal, with write transactions started IMMEDIATE (the default with SQLITE_WAL)
+  wal-immediate-persistent as wal-immediate, reusing connections (CONN_MAX_AGE)
+
+With DB_ENGINE set to a server database (see payroll_system/database.py),
+these modes are also available and use that database's bench_punches table:
+  server, server-persistent, server-pool
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from payroll_system.database import server_config, sqlite_config  # noqa: E402
+
+SQLITE_MODES = ['rollback', 'wal', 'wal-immediate', 'wal-immediate-persistent']
+SERVER_MODES = ['server', 'server-persistent', 'server-pool']
+EMPLOYEES = 200
+
+CREATE_TABLE = {
+    'sqlite': 'CREATE TABLE bench_punches (id INTEGER PRIMARY KEY, employee_id INTEGER NOT NULL, punched_at REAL NOT NULL)',
+    'postgresql': 'CREATE TABLE bench_punches (id SERIAL PRIMARY KEY, employee_id INTEGER NOT NULL, punched_at DOUBLE PRECISION NOT NULL)',
+    'mysql': 'CREATE TABLE bench_punches (id INTEGER AUTO_INCREMENT PRIMARY KEY, employee_id INTEGER NOT NULL, punched_at DOUBLE NOT NULL)',
+}
+
+
+def mode_config(mode, directory):
+    """(DATABASES['default'], persistent connections?) for a benchmark mode"""
+    if mode in SERVER_MODES:
+        os.environ['DB_POOL'] = '1' if mode == 'server-pool' else '0'
+        config = server_config(os.environ['DB_ENGINE'])
+        return config, mode == 'server-persistent'
+
+    config = sqlite_config(str(Path(directory) / f'{mode}.sqlite3'), wal=mode != 'rollback')
+    if mode == 'rollback':
+        config['OPTIONS'] = {'init_command': 'PRAGMA journal_mode=DELETE;PRAGMA synchronous=FULL', 'timeout': 5}
+    elif mode == 'wal':
+        config['OPTIONS']['transaction_mode'] = None
+    return config, mode.endswith('-persistent')
+
+
+def _setup_django(config):
+    import django
+    from django.conf import settings
+
+    settings.configure(DATABASES={'default': config}, INSTALLED_APPS=[], USE_TZ=True)
+    django.setup()
+
+
+def prepare(config):
+    """Create an empty bench_punches table"""
+    _setup_django(config)
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS bench_punches')
+        cursor.execute(CREATE_TABLE[connection.vendor])
+        cursor.execute('CREATE INDEX bench_punches_employee ON bench_punches (employee_id, punched_at)')
+    connection.close()
+
+
+def worker(config, persistent, seconds, seed):
+    """Run requests until the time is up; returns (latencies in ms, errors)"""
+    _setup_django(config)
+    from django.db import DatabaseError, connection, transaction
+
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        employee_id = rng.randrange(EMPLOYEES)
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT punched_at FROM bench_punches WHERE employee_id = %s ORDER BY punched_at DESC LIMIT 1',
+                        [employee_id],
+                    )
+                    cursor.fetchone()
+                    cursor.execute(
+                        'INSERT INTO bench_punches (employee_id, punched_at) VALUES (%s, %s)', [employee_id, time.time()]
+                    )
+            latencies.append((time.perf_counter() - start) * 1000)
+        except DatabaseError:
+            errors += 1
+        finally:
+            if not persistent:
+                connection.close()
+    connection.close()
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_mode(mode, directory, processes, seconds):
+    config, persistent = mode_config(mode, directory)
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        pool.apply(prepare, (config,))
+    with context.Pool(processes) as pool:
+        results = pool.starmap(worker, [(config, persistent, seconds, seed) for seed in range(processes)])
+    latencies = [latency for result, _ in results for latency in result]
+    errors = sum(error for _, error in results)
+    return {
+        'mode': mode,
+        'processes': processes,
+        'seconds': seconds,
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': round(len(latencies) / seconds, 1),
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+        'max_ms': round(max(latencies), 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--modes', default=','.join(SQLITE_MODES + (SERVER_MODES if os.environ.get('DB_ENGINE', 'sqlite') != 'sqlite' else [])))
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'mode':<26} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+        for mode in args.modes.split(','):
+            result = run_mode(mode.strip(), directory, args.processes, args.seconds)
+            results.append(result)
+            print(f"{result['mode']:<26} {result['throughput']:>9} {result['p50_ms']!s:>9} "
+                  f"{result['p99_ms']!s:>9} {result['max_ms']!s:>9} {result['errors']:>7}")
+    if args.json:
+        with open(args.json, 'w') as fp:
+            json.dump({'benchmark': 'db_concurrency', 'results': results}, fp, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Load benchmark for the busiest views.
+
+Builds a synthetic dataset in a temporary SQLite database with
+`manage.py generate_fake_data` (the same data for the same --employees,
+--days and --seed), then runs each scenario with --clients concurrent
+processes for --seconds. Each client sends requests
+through the full Django stack: the test client calls the WSGI handler
+directly, with every middleware but no server or network in between. It
+reports throughput, latency percentiles, database queries per request and
+failed requests (exceptions or unexpected status codes).
+
+    python benchmarks/load.py --employees 2000 --clients 4 --seconds 10
+    python benchmarks/load.py --scenarios punch,chat_poll --json before.json
+    python benchmarks/load.py --json after.json --compare before.json
+
+Scenarios:
+  punch            kiosk clock-in/out for a random active employee (anonymous POST)
+  chat_poll        chat auto-refresh: a room's messages since the last 20
+  login            password login as a random employee
+  employee_search  HR employee list, searching a name, department or ID prefix
+  reports          HR workforce report
+  security_logs    admin security log list, unfiltered or by event type
+
+The database settings come from payroll_system/database.py as usual
+(SQLITE_* and DB_CONN_MAX_AGE variables), pointed at the temporary file.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SCENARIOS = ['punch', 'chat_poll', 'login', 'employee_search', 'reports', 'security_logs']
+PASSWORD = 'bench-password'
+
+
+def configure_environment(directory):
+    """Point the app at the benchmark database; set before Django starts in any process"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'payroll_system.settings')
+    os.environ['SQLITE_PATH'] = str(Path(directory) / 'load.sqlite3')
+    os.environ.setdefault('SQLITE_WAL', '1')  # As recommended for deployments
+    os.environ['AUDIT_LOG_SPOOL_DIR'] = str(Path(directory) / 'audit_spool')
+    os.environ['PERF_SAMPLE_RATE'] = '0'
+
+
+def _setup_django():
+    import django
+    from django.conf import settings
+
+    django.setup()
+    # Measure as in production: DEBUG keeps every query and adds debug context
+    settings.DEBUG = False
+
+
+def seed(employees, days, seed_value, workers):
+    """Migrate the benchmark database and fill it with `manage.py generate_fake_data`; returns its volumes"""
+    dataset = {
+        'employees': employees, 'days': days, 'messages': employees * 10, 'security_logs': employees * 20,
+        'applications': employees, 'seed': seed_value,
+    }
+    manage = [sys.executable, str(ROOT / 'manage.py')]
+    subprocess.run([*manage, 'migrate', '--verbosity', '0'], check=True)
+    subprocess.run([
+        *manage, 'generate_fake_data', '--password', PASSWORD, '--workers', str(workers),
+        *(f'--{option.replace("_", "-")}={value}' for option, value in dataset.items()),
+    ], check=True, stdout=subprocess.DEVNULL)
+    return dataset
+
+
+def _scenario(name, client, rng):
+    """Log the client in as needed; returns (request function, expected status code)"""
+    from django.db.models import Count
+    from django.urls import reverse
+
+    from authentication.models import Employee, SecurityLog
+    from chat_system.models import ChatMessage, ChatRoom
+    from employees.fake_data import DEPARTMENTS, LAST_NAMES
+
+    admin = Employee.objects.filter(role='Admin').order_by('id').first()
+    hr = Employee.objects.filter(role='HR').order_by('id').first() or admin
+    active = list(Employee.objects.filter(status='Active', role='Employee').values_list('employee_id', 'username'))
+
+    if name == 'punch':
+        url = reverse('kiosk_punch')
+        return lambda: client.post(url, {'employee_id': rng.choice(active)[0]}), 200
+
+    if name == 'chat_poll':
+        client.force_login(admin)
+        polls = []
+        for room in ChatRoom.objects.annotate(messages_count=Count('messages')).filter(messages_count__gte=20):
+            since = ChatMessage.objects.filter(room=room).order_by('-sent_at').values_list('sent_at', flat=True)[19]
+            polls.append((reverse('get_messages', args=[room.id]), {'since': since.isoformat()}))
+        return lambda: client.get(*rng.choice(polls)), 200
+
+    if name == 'login':
+        url = reverse('login')
+
+        def login():
+            client.cookies.clear()
+            return client.post(url, {'username': rng.choice(active)[1], 'password': PASSWORD})
+        return login, 302
+
+    if name == 'employee_search':
+        client.force_login(hr)
+        url = reverse('employee_list')
+        terms = [*LAST_NAMES, *DEPARTMENTS, *(employee_id[:5] for employee_id, _ in active[:50])]
+        return lambda: client.get(url, {'search': rng.choice(terms)}), 200
+
+    if name == 'reports':
+        client.force_login(hr)
+        url = reverse('reports')
+        return lambda: client.get(url), 200
+
+    if name == 'security_logs':
+        client.force_login(admin)
+        url = reverse('security_logs')
+        filters = [{}, *({'event_type': event_type} for event_type, _ in SecurityLog.EVENT_TYPE_CHOICES)]
+        return lambda: client.get(url, rng.choice(filters)), 200
+
+    raise ValueError(f'Unknown scenario {name!r}')
+
+
+def client_process(name, seconds, seed_value, barrier, results):
+    """One concurrent client: run the scenario until the time is up and report the samples"""
+    _setup_django()
+    from contextlib import ExitStack
+
+    from django.db import connections
+    from django.test import Client
+
+    from payroll_system.instrumentation import QueryRecorder
+
+    rng = random.Random(seed_value)
+    client = Client()
+    request, expected = _scenario(name, client, rng)
+    request()  # Warm-up, not measured: connection, caches, templates
+    barrier.wait(timeout=300)
+
+    latencies, queries, duplicates, errors, first_error = [], [], [], 0, None
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(recorder))
+                response = request()
+            status = response.status_code
+        except Exception as exc:
+            status = repr(exc)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(recorder.count)
+        duplicates.append(recorder.duplicates())
+        if status != expected:
+            errors += 1
+            first_error = first_error or f'status {status}'
+    results.put((latencies, queries, duplicates, errors, first_error))
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_scenario(name, clients, seconds, seed_value):
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(clients)
+    results = context.Queue()
+    processes = [
+        context.Process(target=client_process, args=(name, seconds, seed_value * 1000 + index, barrier, results))
+        for index in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get(timeout=seconds + 600) for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = [value for sample in samples for value in sample[0]]
+    queries = [value for sample in samples for value in sample[1]]
+    duplicates = [value for sample in samples for value in sample[2]]
+    return {
+        'scenario': name,
+        'clients': clients,
+        'seconds': seconds,
+        'requests': len(latencies),
+        'errors': sum(sample[3] for sample in samples),
+        'first_error': next((sample[4] for sample in samples if sample[4]), None),
+        'throughput': round(len(latencies) / seconds, 1),
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+        'max_ms': round(max(latencies), 2) if latencies else None,
+        'queries_per_request': round(statistics.mean(queries), 1) if queries else None,
+        'max_queries': max(queries, default=None),
+        'duplicates_per_request': round(statistics.mean(duplicates), 1) if duplicates else None,
+    }
+
+
+def _change(current, previous):
+    if not previous or current is None:
+        return ''
+    return f'{(current - previous) * 100 / previous:+.0f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=30, help='Days of history')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--compare', help='Show the change from a previous --json file')
+    args = parser.parse_args()
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as fp:
+            previous = {result['scenario']: result for result in json.load(fp)['results']}
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(directory)
+        dataset = seed(args.employees, args.days, args.seed, args.clients)
+        print('dataset: ' + ', '.join(f'{option} {value}' for option, value in dataset.items()))
+        print(f"{'scenario':<16} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'queries':>8} {'errors':>7}"
+              + (f" {'req/s chg':>10} {'p99 chg':>8}" if previous else ''))
+        for name in args.scenarios.split(','):
+            result = run_scenario(name.strip(), args.clients, args.seconds, args.seed)
+            results.append(result)
+            line = (f"{result['scenario']:<16} {result['throughput']:>9} {result['p50_ms']!s:>9} "
+                    f"{result['p99_ms']!s:>9} {result['max_ms']!s:>9} {result['queries_per_request']!s:>8} "
+                    f"{result['errors']:>7}")
+            if previous:
+                before = previous.get(result['scenario'], {})
+                line += (f" {_change(result['throughput'], before.get('throughput')):>10}"
+                         f" {_change(result['p99_ms'], before.get('p99_ms')):>8}")
+            print(line)
+            if result['first_error']:
+                print(f"  first error: {result['first_error']}")
+    if args.json:
+        with open(args.json, 'w') as fp:
+            json.dump({'benchmark': 'load', 'dataset': dataset, 'options': vars(args), 'results': results}, fp, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ from django.http import JsonResponse
 from django.db.models import Q, Count
 from django.utils import timezone
 from authentication.models import Employee
+from employees.directory import directory
+from employees.thumbnails import thumbnail_url
 from .models import ChatRoom, ChatMessage, RoomMembership
 import json
 
@@ -13,7 +15,7 @@ import json
 def chat_dashboard(request):
     """Communications Center - Main chat dashboard"""
     # Get all employees for direct messaging
-    all_employees = Employee.objects.filter(status='Active').exclude(id=request.user.id)
+    all_employees = [entry for entry in directory() if entry['id'] != request.user.id]
     
     # Get user's chat rooms with member counts
     user_rooms = ChatRoom.objects.filter(
@@ -219,7 +221,7 @@ def get_messages(request, room_id):
             'message': msg.message,
             'sent_at': msg.sent_at.strftime('%Y-%m-%d %H:%M:%S'),
             'is_own': msg.sender == request.user,
-            'profile_picture': msg.sender.profile_picture.url if msg.sender.profile_picture else None
+            'profile_picture': thumbnail_url(msg.sender.profile_picture, 64)
         })
     
     return JsonResponse(messages_data, safe=False)
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+Version stamp for cached employee-derived data.
+
+Anything computed from the employees table (reports, directory listings) is
+cached under a key that embeds the current version; bumping the version on
+every Employee save or delete invalidates all of them at once without having
+to know which keys exist.
+"""
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY = 'employees:version'
+
+
+def _initial_version():
+    # Never restart from a number that old cache entries or client ETags still
+    # carry (the key can be evicted or the cache cleared)
+    return time.time_ns()
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _initial_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, _initial_version(), timeout=None)
+        return cache.incr(VERSION_KEY)
+
+
+def versioned_key(name):
+    return f'employees:{name}:v{get_version()}'
@@ -0,0 +1,45 @@
+"""
+Compact employee directory shared by the chat pages and the JSON endpoint.
+
+Built from values_list (no model instances, no password hashes) and cached
+under the employee version stamp, which also serves as the HTTP ETag. The
+stamp is seeded from the clock, so an evicted version never hands out an
+ETag a client already holds for older data.
+"""
+from django.core.cache import cache
+
+from authentication.models import Employee
+from .cache import get_version, versioned_key
+from .thumbnails import picture_file, thumbnail_url
+
+DIRECTORY_CACHE_TIMEOUT = 60 * 60
+FIELDS = ('id', 'employee_id', 'name', 'department', 'role', 'profile_picture')
+
+
+def build_directory():
+    rows = Employee.objects.filter(status='Active').order_by('name', 'id').values_list(*FIELDS)
+    return [
+        {
+            'id': pk,
+            'employee_id': employee_id,
+            'name': name,
+            'department': department,
+            'role': role,
+            'avatar_url': thumbnail_url(picture_file(picture), 64),
+        }
+        for pk, employee_id, name, department, role, picture in rows
+    ]
+
+
+def directory():
+    """Active employees as a list of dicts, ordered by name"""
+    key = versioned_key('directory')
+    entries = cache.get(key)
+    if entries is None:
+        entries = build_directory()
+        cache.set(key, entries, DIRECTORY_CACHE_TIMEOUT)
+    return entries
+
+
+def directory_etag(request, *args, **kwargs):
+    return f'"directory-v{get_version()}"'
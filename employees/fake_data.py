@@ -0,0 +1,471 @@
+"""
+Synthetic data at scale, for load and capacity testing.
+
+`generate()` fills every table with consistent fake data. Attendance skips
+weekends and the days an employee is on approved leave. Approved leaves
+have their occupancy rows and ledger consumption, and balances match the
+ledger. Chat messages come from room members. The ID sequences, search
+indexes, report cache and planner statistics are brought up to date at
+the end.
+
+Employees, chat rooms and memberships are written first by the calling
+process. A process pool then generates the bulk tables in independent
+chunks: per block of employees (leaves, attendance, payroll), per time
+slice (security logs, chat messages) or per ID block (applications). Each
+chunk seeds its own random generator from (seed, table, chunk), so the
+same seed and options always produce the same rows, whatever the number
+of workers (only the ids follow the order chunks finish in). Rows are
+written with bulk_create in batches. On SQLite the writes themselves take
+turns, so extra workers mostly overlap building rows with writing them.
+
+Everyone shares one password, hashed once with the configured hasher
+(MD5 under the test settings or with FAST_PASSWORD_HASHER, see settings).
+
+Primary keys must come back from bulk inserts, which rules out MySQL.
+"""
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+
+from applications.models import JobApplication
+from applications.search import rebuild_index as rebuild_application_index
+from authentication.models import Attendance, Employee, IdSequence, Leave, Payroll, SecurityLog
+from chat_system.models import ChatMessage, ChatRoom, RoomMembership
+from hr_management.coverage import expand
+from hr_management.ledger import ACCRUING_LEAVE_TYPES, annual_allowance, consumption_entry
+from hr_management.models import LeaveBalance, LeaveLedgerEntry
+from .cache import bump_version
+from .search import rebuild_index as rebuild_employee_index
+
+DEFAULT_BATCH_SIZE = 5000
+EMPLOYEE_CHUNK = 250  # Employees per leave/attendance/payroll chunk
+ROW_CHUNK = 50000  # Rows per security log, chat message or application chunk
+
+FIRST_NAMES = ['Maria', 'Jose', 'Ana', 'Juan', 'Grace', 'Mark', 'Liza', 'Paolo', 'Carmen', 'Ramon', 'Elena',
+               'Miguel', 'Rosa', 'Daniel', 'Sofia', 'Luis', 'Teresa', 'Carlo', 'Nina', 'Rafael', 'Andrea',
+               'Gabriel', 'Patricia', 'Victor', 'Isabel', 'Marco', 'Angela', 'Adrian', 'Bea', 'Noel']
+LAST_NAMES = ['Santos', 'Reyes', 'Cruz', 'Bautista', 'Garcia', 'Mendoza', 'Torres', 'Flores', 'Ramos', 'Aquino',
+              'Castillo', 'Villanueva', 'Navarro', 'Domingo', 'Salazar', 'Mercado', 'Rivera', 'Gonzales',
+              'Dela Cruz', 'Fernandez', 'Lopez', 'Pascual', 'Valdez', 'Soriano', 'Morales', 'Castro']
+DEPARTMENTS = ['Finance', 'Human Resources', 'Information Technology', 'Operations', 'Legal', 'Procurement',
+               'Records', 'Logistics', 'Public Affairs', 'Internal Audit', 'Planning', 'Training']
+POSITIONS = ['Clerk', 'Analyst', 'Officer', 'Specialist', 'Supervisor', 'Manager', 'Assistant', 'Technician',
+             'Coordinator', 'Engineer']
+LEAVE_TYPES = {'Vacation': 50, 'Sick': 35, 'Emergency': 10, 'Unpaid': 5}
+LEAVE_STATUSES = {'Approved': 85, 'Rejected': 10, 'Pending': 5}
+LEAVE_REASONS = ['Family vacation', 'Medical appointment', 'Flu', 'Personal errand', 'Family emergency',
+                 'Wedding', 'Moving house', 'Child care', 'Rest day']
+APPLICATION_STATUSES = {'Pending': 40, 'Under Review': 25, 'Accepted': 10, 'Rejected': 25}
+SKILLS = ['Excel', 'Accounting', 'Python', 'SQL', 'Records management', 'Customer service', 'Procurement',
+          'Project management', 'Auditing', 'Report writing', 'Networking', 'Payroll', 'Legal research']
+SCHOOLS = ['University of the Philippines', 'Ateneo de Manila University', 'De La Salle University',
+           'University of Santo Tomas', 'Polytechnic University of the Philippines', 'Mapua University']
+CHAT_WORDS = ['the', 'report', 'meeting', 'today', 'tomorrow', 'schedule', 'please', 'check', 'updated', 'file',
+              'thanks', 'deadline', 'budget', 'draft', 'review', 'office', 'approved', 'send', 'team', 'noted']
+EVENT_TYPES = {'LOGIN_SUCCESS': 55, 'LOGOUT': 25, 'LOGIN_FAILED': 8, 'SESSION_TIMEOUT': 5, 'PROFILE_UPDATE': 3,
+               'PASSWORD_CHANGE': 1, 'DATA_EXPORT': 2, 'SYSTEM_ACCESS': 1}
+EVENT_DESCRIPTIONS = {
+    'LOGIN_SUCCESS': 'User {username} logged in successfully',
+    'LOGOUT': 'User {username} logged out',
+    'LOGIN_FAILED': 'Failed login attempt for username: {username}',
+    'SESSION_TIMEOUT': 'Session expired for user {username}',
+    'PROFILE_UPDATE': 'User {username} updated their profile',
+    'PASSWORD_CHANGE': 'User {username} changed their password',
+    'DATA_EXPORT': 'User {username} exported employee data',
+    'SYSTEM_ACCESS': 'User {username} accessed system settings',
+}
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148',
+]
+# Clock times from 07:00 in one-minute steps, built once instead of per row
+CLOCK = [dt_time(7 + minute // 60, minute % 60) for minute in range(12 * 60)]
+
+_context = {}  # Shared by every chunk: employee usernames, approvers, chat rooms
+
+
+def _rng(seed, table, chunk=0):
+    return random.Random(f'{seed}:{table}:{chunk}')
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), list(weights.values()))[0]
+
+
+def _at(day, minutes=0):
+    """Aware UTC datetime `minutes` after midnight of `day`"""
+    return datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc) + timedelta(minutes=minutes)
+
+
+def _sorted_times(rng, start, end, count):
+    """`count` random aware datetimes in [start, end), in order (ids then follow time, as in production)"""
+    span = (end - start).total_seconds()
+    return [start + timedelta(seconds=offset) for offset in sorted(rng.random() * span for _ in range(count))]
+
+
+def _write(model, rows, counts, batch_size):
+    if rows:
+        model.objects.bulk_create(rows, batch_size=batch_size)
+        counts[model._meta.db_table] += len(rows)
+
+
+class BatchWriter:
+    """Buffers unsaved rows per model and writes each full batch with one bulk_create"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.pending = defaultdict(list)
+        self.counts = Counter()
+
+    def add(self, row):
+        rows = self.pending[type(row)]
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush(type(row))
+
+    def flush(self, model=None):
+        for model in [model] if model else list(self.pending):
+            _write(model, self.pending.pop(model, []), self.counts, self.batch_size)
+        return self.counts
+
+
+def _employee_leaves(rng, employee_id, workdays, per_employee):
+    """Non-overlapping leaves within single weeks; their ids are set once written"""
+    booked, leaves = set(), []
+    for _ in range(rng.randint(0, round(2 * per_employee))):
+        start_date = rng.choice(workdays)
+        length = min(rng.choice((1, 1, 1, 2, 2, 3, 5)), 5 - start_date.weekday())
+        days = [start_date + timedelta(days=offset) for offset in range(length)]
+        if booked.intersection(days):
+            continue
+        status = _weighted(rng, LEAVE_STATUSES)
+        applied_at = _at(start_date - timedelta(days=rng.randint(1, 30)), rng.randrange(8 * 60, 17 * 60))
+        processed = status != 'Pending'
+        leave = Leave(
+            employee_id=employee_id,
+            type=_weighted(rng, LEAVE_TYPES),
+            duration='Half' if length == 1 and rng.random() < 0.2 else 'Full',
+            start_date=days[0],
+            end_date=days[-1],
+            reason=rng.choice(LEAVE_REASONS),
+            status=status,
+            applied_at=applied_at,
+            processed_by_id=rng.choice(_context['approvers']) if processed else None,
+            processed_at=applied_at + timedelta(hours=rng.randint(1, 72)) if processed else None,
+        )
+        if status != 'Rejected':
+            booked.update(days)
+        leaves.append(leave)
+    return leaves
+
+
+def _ledger(employee_id, leaves, options):
+    """Yearly accruals plus consumption of approved leaves, with running balances; returns (entries, balances)"""
+    entries = []
+    for year in range(options['start'].year, options['end'].year + 1):
+        accrued_on = max(date(year, 1, 1), options['start'])
+        if accrued_on >= options['end']:
+            continue
+        entries.extend(
+            LeaveLedgerEntry(
+                employee_id=employee_id, leave_type=leave_type, entry_type='Accrual', days=options['allowance'],
+                description=f'Annual allowance {year}', created_at=_at(accrued_on),
+            )
+            for leave_type in ACCRUING_LEAVE_TYPES
+        )
+    entries.extend(consumption_entry(leave, created_at=leave.processed_at) for leave in leaves if leave.status == 'Approved')
+
+    entries.sort(key=lambda entry: (entry.leave_type, entry.created_at))
+    running = defaultdict(Decimal)
+    for entry in entries:
+        running[entry.leave_type] += entry.days
+        entry.balance_after = running[entry.leave_type]
+    balances = [
+        LeaveBalance(employee_id=employee_id, leave_type=leave_type, balance=balance)
+        for leave_type, balance in running.items()
+    ]
+    return entries, balances
+
+
+def _payroll(rng, employee_id, salary_rate, months):
+    for year, month in months:
+        overtime = Decimal(rng.randrange(50, 3000)) if rng.random() < 0.4 else Decimal('0.00')
+        bonuses = Decimal(rng.randrange(500, 5000, 250)) if rng.random() < 0.1 else Decimal('0.00')
+        deductions = (salary_rate * rng.randrange(10, 16) / 100).quantize(Decimal('0.01'))
+        paid_on = date(year + month // 12, month % 12 + 1, 1)
+        yield Payroll(
+            employee_id=employee_id, period=f'{year}-{month:02d}', base_salary=salary_rate, overtime=overtime,
+            deductions=deductions, bonuses=bonuses, net_pay=salary_rate + overtime + bonuses - deductions,
+            created_at=_at(paid_on, 9 * 60),
+        )
+
+
+def employee_chunk(seed, chunk, employees, options):
+    """Leaves (with occupancy and ledger), attendance and payroll for a block of (id, department, salary) employees"""
+    rng = _rng(seed, 'employees', chunk)
+    writer = BatchWriter(options['batch_size'])
+    workdays = options['workdays']
+
+    leaves = {employee_id: _employee_leaves(rng, employee_id, workdays, options['leaves_per_employee'])
+              for employee_id, _, _ in employees}
+    _write(Leave, [leave for rows in leaves.values() for leave in rows], writer.counts, options['batch_size'])
+
+    for employee_id, department, salary_rate in employees:
+        approved = [leave for leave in leaves[employee_id] if leave.status == 'Approved']
+        for leave in approved:
+            for row in expand(leave, department):
+                writer.add(row)
+        entries, balances = _ledger(employee_id, approved, options)
+        for row in entries + balances:
+            writer.add(row)
+
+        on_leave = {
+            leave.start_date + timedelta(days=offset)
+            for leave in approved if leave.duration == 'Full'
+            for offset in range((leave.end_date - leave.start_date).days + 1)
+        }
+        for day in workdays:
+            if day in on_leave or rng.random() < 0.03:
+                continue
+            time_in = rng.randrange(30, 120)
+            writer.add(Attendance(
+                employee_id=employee_id, date=day, time_in=CLOCK[time_in],
+                time_out=CLOCK[time_in + rng.randrange(480, 570)], created_at=_at(day, 7 * 60 + time_in),
+            ))
+
+        for row in _payroll(rng, employee_id, salary_rate, options['payroll_months']):
+            writer.add(row)
+    return writer.flush()
+
+
+def security_log_chunk(seed, chunk, start, end, count, options):
+    rng = _rng(seed, 'security_logs', chunk)
+    writer = BatchWriter(options['batch_size'])
+    users = _context['users']
+    for timestamp in _sorted_times(rng, start, end, count):
+        event_type = _weighted(rng, EVENT_TYPES)
+        user_id, username = rng.choice(users)
+        if event_type == 'LOGIN_FAILED' and rng.random() < 0.5:
+            user_id, username = None, rng.choice(('admin', 'root', 'test', username.upper()))
+        writer.add(SecurityLog(
+            event_type=event_type, user_id=user_id,
+            ip_address=f'10.{rng.randrange(4)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+            user_agent=rng.choice(USER_AGENTS), event_description=EVENT_DESCRIPTIONS[event_type].format(username=username),
+            timestamp=timestamp,
+        ))
+    return writer.flush()
+
+
+def chat_message_chunk(seed, chunk, start, end, count, options):
+    rng = _rng(seed, 'chat_messages', chunk)
+    writer = BatchWriter(options['batch_size'])
+    rooms = _context['rooms']
+    for sent_at in _sorted_times(rng, start, end, count):
+        room_id, members = rng.choice(rooms)
+        words = rng.choices(CHAT_WORDS, k=rng.randint(2, 16))
+        writer.add(ChatMessage(
+            room_id=room_id, sender_id=rng.choice(members), message=' '.join(words).capitalize(), sent_at=sent_at,
+        ))
+    return writer.flush()
+
+
+def application_chunk(seed, chunk, start, end, numbers, options):
+    rng = _rng(seed, 'applications', chunk)
+    writer = BatchWriter(options['batch_size'])
+    for applied_date, number in zip(_sorted_times(rng, start, end, len(numbers)), numbers):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        position = rng.choice(POSITIONS)
+        status = _weighted(rng, APPLICATION_STATUSES)
+        processed = status != 'Pending'
+        writer.add(JobApplication(
+            application_id=JobApplication.format_application_id(number),
+            full_name=f'{first} {last}', email=f'{first}.{last}{number}@mail.example'.lower().replace(' ', ''),
+            phone=f'09{rng.randrange(10 ** 9):09d}', address=f'{rng.randint(1, 999)} Rizal Street, Quezon City',
+            position_applied=position,
+            work_experience=f'{rng.randint(1, 15)} years as {rng.choice(POSITIONS).lower()} in {rng.choice(DEPARTMENTS).lower()}',
+            education=f'BS {rng.choice(DEPARTMENTS)}, {rng.choice(SCHOOLS)}',
+            skills=', '.join(rng.sample(SKILLS, rng.randint(2, 5))),
+            status=status, applied_date=applied_date,
+            processed_by_id=rng.choice(_context['approvers']) if processed else None,
+            processed_date=applied_date + timedelta(days=rng.randint(1, 14)) if processed else None,
+        ))
+    return writer.flush()
+
+
+def _init_worker(context):
+    # Spawned workers (non-fork platforms) need Django configured first
+    import django
+    django.setup()
+    _context.update(context)
+
+
+def _time_slices(start, end, total):
+    """(start, end, count) chunks of at most ROW_CHUNK rows covering [start, end)"""
+    chunks = max(1, math.ceil(total / ROW_CHUNK))
+    step = (end - start) / chunks
+    for index in range(chunks):
+        count = total // chunks + (index < total % chunks)
+        yield index, start + step * index, start + step * (index + 1), count
+
+
+def create_employees(count, seed, hired_before, password, batch_size):
+    """Employees with consecutive IDs from the sequence; the first is an administrator"""
+    rng = _rng(seed, 'employee_rows')
+    password_hash = make_password(password)  # Shared: hashing per employee would dominate the run
+    rows = []
+    for position, number in enumerate(IdSequence.reserve(Employee.ID_SEQUENCE, count)):
+        employee_id = Employee.format_employee_id(number)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        role = 'Admin' if position == 0 else 'HR' if rng.random() < 0.02 else 'Employee'
+        hired = _at(hired_before - timedelta(days=rng.randrange(1, 3650)), 8 * 60)
+        rows.append(Employee(
+            username=employee_id.lower(), password=password_hash, employee_id=employee_id, name=f'{first} {last}',
+            first_name=first, last_name=last, email=f'{employee_id.lower()}@agency.example',
+            phone=f'09{rng.randrange(10 ** 9):09d}', department=rng.choice(DEPARTMENTS),
+            position=rng.choice(POSITIONS), salary_rate=Decimal(rng.randrange(18000, 150000, 250)), role=role,
+            status='Active' if role != 'Employee' or rng.random() < 0.95 else rng.choice(('Inactive', 'Suspended')),
+            date_joined=hired, created_at=hired,
+        ))
+    return Employee.objects.bulk_create(rows, batch_size=batch_size)
+
+
+def create_chat_rooms(employees, extra_rooms, seed, opened, batch_size):
+    """A room per department with all its members, plus smaller group rooms; returns [(room id, member ids)]"""
+    rng = _rng(seed, 'chat_rooms')
+    admin = employees[0]
+    by_department = defaultdict(list)
+    for employee in employees:
+        by_department[employee.department].append(employee.pk)
+
+    memberships = [(f'{department} Team', members) for department, members in sorted(by_department.items())]
+    pool = [employee.pk for employee in employees]
+    memberships.extend(
+        (f'{rng.choice(SKILLS)} Group {index + 1}', rng.sample(pool, min(len(pool), rng.randint(3, 40))))
+        for index in range(extra_rooms)
+    )
+    rooms = ChatRoom.objects.bulk_create([
+        ChatRoom(room_name=name, room_type='group', join_code=f'F{admin.employee_id[3:]}R{index}',
+                 created_by_id=admin.pk, created_at=opened)
+        for index, (name, _) in enumerate(memberships)
+    ], batch_size=batch_size)
+
+    result = []
+    rows = []
+    for room, (_, members) in zip(rooms, memberships):
+        members = sorted({admin.pk, *members})
+        rows.extend(RoomMembership(room_id=room.pk, member_id=member, joined_at=opened) for member in members)
+        result.append((room.pk, members))
+    RoomMembership.objects.bulk_create(rows, batch_size=batch_size)
+    return result, len(rows)
+
+
+def _analyze():
+    """Refresh the query planner statistics for the new row counts"""
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def generate(employees=1000, days=365, leaves_per_year=3, payroll_months=12, chat_rooms=None, messages=20000,
+             security_logs=50000, applications=2000, seed=1, end_date=None, password='password123',
+             workers=1, batch_size=DEFAULT_BATCH_SIZE, report=None):
+    """
+    Generate a dataset covering `days` days up to `end_date` (default today, exclusive).
+
+    Returns a Counter of rows written per table. `report` is called with a
+    progress message after each step and each finished chunk.
+    """
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise ValueError('Generating fake data needs a database that returns ids from bulk inserts.')
+    report = report or (lambda message: None)
+    end = end_date or date.today()
+    start = end - timedelta(days=days)
+    counts = Counter()
+    started = time.monotonic()
+
+    created = create_employees(employees, seed, start, password, batch_size)
+    counts[Employee._meta.db_table] += len(created)
+    report(f'Created {len(created):,} employees.')
+
+    rooms, member_count = create_chat_rooms(
+        created, employees // 50 if chat_rooms is None else chat_rooms, seed, _at(start), batch_size,
+    )
+    counts[ChatRoom._meta.db_table] += len(rooms)
+    counts[RoomMembership._meta.db_table] += member_count
+    report(f'Created {len(rooms):,} chat rooms with {member_count:,} members.')
+
+    months, cursor = [], date(end.year, end.month, 1)
+    for _ in range(payroll_months):
+        cursor = (cursor - timedelta(days=1)).replace(day=1)
+        months.append((cursor.year, cursor.month))
+    options = {
+        'start': start,
+        'end': end,
+        'workdays': [start + timedelta(days=offset) for offset in range(days) if (start + timedelta(days=offset)).weekday() < 5],
+        'leaves_per_employee': leaves_per_year * days / 365,
+        'allowance': annual_allowance(),
+        'payroll_months': sorted(months),
+        'batch_size': batch_size,
+    }
+    context = {
+        'users': [(employee.pk, employee.username) for employee in created],
+        'approvers': [employee.pk for employee in created if employee.role in ('Admin', 'HR')],
+        'rooms': rooms,
+    }
+
+    start_at, end_at = _at(start), _at(end)
+    jobs = [
+        (employee_chunk, seed, index, [(employee.pk, employee.department, employee.salary_rate) for employee in block], options)
+        for index, block in enumerate(created[offset:offset + EMPLOYEE_CHUNK] for offset in range(0, len(created), EMPLOYEE_CHUNK))
+    ]
+    jobs.extend((security_log_chunk, seed, index, first, last, count, options)
+                for index, first, last, count in _time_slices(start_at, end_at, security_logs) if count)
+    if rooms:
+        jobs.extend((chat_message_chunk, seed, index, first, last, count, options)
+                    for index, first, last, count in _time_slices(start_at, end_at, messages) if count)
+    if applications:
+        numbers = list(IdSequence.reserve(JobApplication.ID_SEQUENCE, applications))
+        position = 0
+        for index, first, last, count in _time_slices(start_at, end_at, applications):
+            jobs.append((application_chunk, seed, index, first, last, numbers[position:position + count], options))
+            position += count
+
+    report(f'Generating {len(jobs)} chunks with {workers} worker{"s" if workers != 1 else ""}...')
+    if workers > 1:
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as pool:
+            futures = [pool.submit(*job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), start=1):
+                counts.update(future.result())
+                _report_progress(report, done, len(jobs), counts, started)
+    else:
+        _context.update(context)
+        for done, job in enumerate(jobs, start=1):
+            counts.update(job[0](*job[1:]))
+            _report_progress(report, done, len(jobs), counts, started)
+
+    rebuild_employee_index()
+    if applications:
+        rebuild_application_index()
+    bump_version()
+    _analyze()
+    report(f'Rebuilt search indexes and statistics in {time.monotonic() - started:.0f}s total.')
+    return counts
+
+
+def _report_progress(report, done, total, counts, started):
+    if done != total and done * 50 // total == (done - 1) * 50 // total:
+        return  # About fifty progress lines per run
+    rows = sum(counts.values())
+    elapsed = time.monotonic() - started
+    report(f'[{done}/{total}] {rows:,} rows, {rows / max(elapsed, 0.001):,.0f} rows/s')
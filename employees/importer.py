@@ -0,0 +1,232 @@
+"""
+Bulk employee import from CSV or XLSX.
+
+Rows are validated in a single streaming pass and handled in chunks: each
+chunk's passwords are hashed (PBKDF2 is deliberately slow, so this is where
+the time goes), employee IDs come from one reserved IdSequence block and the
+rows are written with one bulk_create.
+
+Hashing runs in the calling process unless `workers` asks for a process
+pool. Only the management command does: forking a multithreaded web worker
+(the audit log writer runs a thread) is unsafe. The HR upload page therefore
+reads at most EMPLOYEE_IMPORT_MAX_ROWS rows (`limit_rows`) and sends larger
+files to the command.
+
+XLSX files need the optional openpyxl package.
+"""
+import csv
+import importlib.util
+import io
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+
+from authentication.models import Employee, IdSequence
+from .cache import bump_version
+from .search import index_new_employees
+
+REQUIRED_COLUMNS = ['username', 'name', 'password']
+OPTIONAL_COLUMNS = ['email', 'phone', 'department', 'position', 'salary_rate', 'role']
+ROLES = dict(Employee.ROLE_CHOICES)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def default_workers():
+    return min(4, os.cpu_count() or 1)
+
+
+def _init_worker():
+    # Spawned workers (non-fork platforms) need Django configured before hashing
+    import django
+    django.setup()
+
+
+class ImportReport:
+    """Outcome of an import: how many rows were created and why the others were not"""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.created = 0
+        self.errors = []  # (row number, username, [messages])
+
+    def add_error(self, row_number, username, messages):
+        self.errors.append((row_number, username, messages))
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def write_csv(self, fp):
+        writer = csv.writer(fp)
+        writer.writerow(['row', 'username', 'errors'])
+        for row_number, username, messages in self.errors:
+            writer.writerow([row_number, username, '; '.join(messages)])
+
+
+def xlsx_supported():
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+def limit_rows(rows, max_rows):
+    """The rows as a list; ValueError, before anything is imported, if there are more than `max_rows`"""
+    rows = list(itertools.islice(rows, max_rows + 1))
+    if len(rows) > max_rows:
+        raise ValueError(
+            f'The file has more than {max_rows} rows. '
+            'Import large files with the import_employees management command.'
+        )
+    return rows
+
+
+def read_rows(fp, filename):
+    """Yield (row number, {column: value}) from a CSV or XLSX file without loading it whole"""
+    if filename.lower().endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError('XLSX import requires the openpyxl package; upload a CSV file instead.')
+        workbook = load_workbook(fp, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value or '').strip().lower() for value in next(rows, [])]
+        for row_number, values in enumerate(rows, start=2):
+            yield row_number, {
+                column: '' if value is None else str(value).strip()
+                for column, value in zip(header, values)
+            }
+        workbook.close()
+        return
+
+    if isinstance(fp, (str, bytes, os.PathLike)):
+        fp = open(fp, 'rb')
+    text = fp if isinstance(fp, io.TextIOBase) else io.TextIOWrapper(fp, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    for row_number, row in enumerate(reader, start=2):
+        yield row_number, {column: (value or '').strip() for column, value in row.items() if column}
+
+
+def validate_row(row, seen_usernames):
+    """Return (cleaned fields, list of error messages) for one input row"""
+    errors = []
+    for column in REQUIRED_COLUMNS:
+        if not row.get(column):
+            errors.append(f'{column} is required')
+
+    username = row.get('username', '')
+    if len(username) > 150:
+        errors.append('username is longer than 150 characters')
+    elif username and username in seen_usernames:
+        errors.append('username is duplicated in this file')
+
+    email = row.get('email') or None
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append(f'invalid email "{email}"')
+
+    role = row.get('role') or 'Employee'
+    if role not in ROLES:
+        errors.append(f'role must be one of {", ".join(ROLES)}')
+
+    try:
+        salary_rate = Decimal(row.get('salary_rate') or '0').quantize(Decimal('0.01'))
+    except InvalidOperation:
+        errors.append(f'invalid salary_rate "{row.get("salary_rate")}"')
+        salary_rate = Decimal('0.00')
+
+    cleaned = {
+        'username': username,
+        'name': row.get('name', ''),
+        'password': row.get('password', ''),
+        'email': email,
+        'phone': row.get('phone') or None,
+        'department': row.get('department') or None,
+        'position': row.get('position') or None,
+        'salary_rate': salary_rate,
+        'role': role,
+    }
+    return cleaned, errors
+
+
+def import_employees(rows, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, dry_run=False):
+    """
+    Import employees from an iterable of (row number, row dict).
+
+    Returns an ImportReport. Each chunk is written in its own transaction, so
+    a database error only fails the rows of that chunk. Malformed CSV raises
+    csv.Error.
+    """
+    report = ImportReport()
+    seen_usernames = set()
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 and not dry_run else None
+
+    def flush(pending):
+        if not pending:
+            return
+        existing = set(Employee.objects.filter(
+            username__in=[cleaned['username'] for _, cleaned in pending]
+        ).values_list('username', flat=True))
+        valid = []
+        for row_number, cleaned in pending:
+            if cleaned['username'] in existing:
+                report.add_error(row_number, cleaned['username'], ['username already exists'])
+            else:
+                valid.append((row_number, cleaned))
+        if dry_run:
+            # Nothing is written; count the rows that would have been created
+            report.created += len(valid)
+            return
+        if not valid:
+            return
+
+        passwords = [cleaned.pop('password') for _, cleaned in valid]
+        if pool is not None:
+            hashes = list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+        else:
+            hashes = [make_password(password) for password in passwords]
+
+        try:
+            with transaction.atomic():
+                block = IdSequence.reserve(Employee.ID_SEQUENCE, len(valid))
+                employees = [
+                    Employee(employee_id=Employee.format_employee_id(number), password=password_hash, **cleaned)
+                    for (_, cleaned), number, password_hash in zip(valid, block, hashes)
+                ]
+                Employee.objects.bulk_create(employees)
+                index_new_employees(employees)
+        except DatabaseError as exc:
+            for row_number, cleaned in valid:
+                report.add_error(row_number, cleaned['username'], [f'database error: {exc}'])
+            return
+        report.created += len(employees)
+
+    try:
+        pending = []
+        for row_number, row in rows:
+            report.rows_read += 1
+            cleaned, errors = validate_row(row, seen_usernames)
+            if cleaned['username']:
+                seen_usernames.add(cleaned['username'])
+            if errors:
+                report.add_error(row_number, cleaned['username'], errors)
+                continue
+            pending.append((row_number, cleaned))
+            if len(pending) >= chunk_size:
+                flush(pending)
+                pending = []
+        flush(pending)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if report.created and not dry_run:
+            bump_version()
+
+    return report
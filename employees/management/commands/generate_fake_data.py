@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from employees.fake_data import DEFAULT_BATCH_SIZE, generate
+from employees.importer import default_workers
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with consistent synthetic data for load testing, e.g. '
+        '--employees 50000 --days 560 --messages 5000000 --security-logs 10000000 '
+        '(about 20M attendance rows)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000)
+        parser.add_argument('--days', type=int, default=365, help='Days of history (attendance, leaves, logs, messages)')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Last day of history + 1, YYYY-MM-DD (default: today)')
+        parser.add_argument('--leaves-per-year', type=float, default=3, help='Average leave requests per employee and year')
+        parser.add_argument('--payroll-months', type=int, default=12)
+        parser.add_argument('--chat-rooms', type=int, help='Group rooms besides one per department (default: employees / 50)')
+        parser.add_argument('--messages', type=int, default=20000)
+        parser.add_argument('--security-logs', type=int, default=50000)
+        parser.add_argument('--applications', type=int, default=2000)
+        parser.add_argument('--password', default='password123', help='Password of every generated employee')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--workers', type=int, help='Generating processes (default: up to 4)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['employees'] < 1:
+            raise CommandError('--employees must be at least 1.')
+        try:
+            counts = generate(
+                employees=options['employees'],
+                days=options['days'],
+                leaves_per_year=options['leaves_per_year'],
+                payroll_months=options['payroll_months'],
+                chat_rooms=options['chat_rooms'],
+                messages=options['messages'],
+                security_logs=options['security_logs'],
+                applications=options['applications'],
+                seed=options['seed'],
+                end_date=options['end_date'],
+                password=options['password'],
+                workers=options['workers'] or default_workers(),
+                batch_size=options['batch_size'],
+                report=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for table, rows in sorted(counts.items()):
+            self.stdout.write(f'  {table:<20} {rows:>12,}')
+        self.stdout.write(self.style.SUCCESS(f'Generated {sum(counts.values()):,} rows.'))
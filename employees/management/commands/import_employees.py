@@ -0,0 +1,40 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from employees.importer import DEFAULT_CHUNK_SIZE, default_workers, import_employees, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import employees from a CSV or XLSX file (columns: username, name, password, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, help='Password hashing processes (default: up to 4)')
+        parser.add_argument('--report', help='Write the per-row error report to this CSV file')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as fp:
+                report = import_employees(
+                    read_rows(fp, path),
+                    chunk_size=options['chunk_size'],
+                    workers=options['workers'] or default_workers(),
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError, csv.Error) as exc:
+            raise CommandError(str(exc))
+
+        if options['report']:
+            with open(options['report'], 'w', newline='') as fp:
+                report.write_csv(fp)
+        elif report.errors:
+            report.write_csv(sys.stderr)
+
+        verb = 'Validated' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {report.created} of {report.rows_read} rows; {report.failed} rows failed.'
+        ))
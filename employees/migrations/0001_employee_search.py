@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS employee_search USING fts5("
+        "name, employee_id, department, position, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO employee_search (rowid, name, employee_id, department, position) "
+        "SELECT id, COALESCE(name, ''), COALESCE(employee_id, ''), COALESCE(department, ''), "
+        "COALESCE(position, '') FROM employees"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS employee_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_leave_leaves_employee_range_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
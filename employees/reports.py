@@ -0,0 +1,65 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+
+from authentication.models import Employee
+from .cache import versioned_key
+
+REPORT_CACHE_TIMEOUT = 60 * 60
+
+
+def build_workforce_report():
+    """Headcount and salary figures from a single GROUP BY department, role, status"""
+    rows = Employee.objects.order_by().values('department', 'role', 'status').annotate(
+        count=Count('id'),
+        salary_total=Sum('salary_rate'),
+    )
+
+    departments = set()
+    dept_counts = defaultdict(int)
+    dept_salaries = defaultdict(Decimal)
+    role_counts = defaultdict(int)
+    total_employees = 0
+
+    for row in rows:
+        departments.add(row['department'])
+        if row['status'] != 'Active':
+            continue
+        total_employees += row['count']
+        role_counts[row['role']] += row['count']
+        if row['department']:
+            dept_counts[row['department']] += row['count']
+            dept_salaries[row['department']] += row['salary_total'] or Decimal('0')
+
+    dept_stats = []
+    for name in sorted(department for department in departments if department):
+        count = dept_counts[name]
+        dept_stats.append({
+            'name': name,
+            'count': count,
+            'salary_total': dept_salaries[name],
+            'salary_average': (dept_salaries[name] / count).quantize(Decimal('0.01')) if count else Decimal('0.00'),
+        })
+
+    return {
+        'total_employees': total_employees,
+        'total_departments': len(departments),
+        'dept_stats': dept_stats,
+        'role_stats': [
+            {'name': label, 'count': role_counts[role]}
+            for role, label in Employee.ROLE_CHOICES
+        ],
+        'salary_total': sum((dept['salary_total'] for dept in dept_stats), Decimal('0')),
+    }
+
+
+def workforce_report():
+    """Cached report; invalidated whenever an employee is saved or deleted"""
+    key = versioned_key('workforce_report')
+    report = cache.get(key)
+    if report is None:
+        report = build_workforce_report()
+        cache.set(key, report, REPORT_CACHE_TIMEOUT)
+    return report
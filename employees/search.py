@@ -0,0 +1,97 @@
+"""
+Employee search backed by an FTS5 index over name, employee ID, department
+and position, plus an index range scan for employee ID prefixes.
+
+The index matches word prefixes ("cru" finds "Cruz"). Queries shorter than
+MIN_INDEXED_LENGTH, and queries the index finds nothing for (such as the
+infix "ruz"), fall back to a substring scan of the same fields.
+"""
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from authentication.models import Employee
+from payroll_system.fts import FTSIndex, match_expression
+
+SEARCH_FIELDS = ['name', 'employee_id', 'department', 'position']
+MIN_INDEXED_LENGTH = 3
+
+employee_index = FTSIndex('employee_search', SEARCH_FIELDS)
+
+
+def index_employee(employee):
+    employee_index.upsert(employee.pk, {field: getattr(employee, field) for field in SEARCH_FIELDS})
+
+
+def index_new_employees(employees):
+    """Index freshly bulk-created employees (bulk_create does not send post_save)"""
+    employee_index.insert_many(
+        (employee.pk, {field: getattr(employee, field) for field in SEARCH_FIELDS}) for employee in employees
+    )
+
+
+def unindex_employee(employee_pk):
+    employee_index.delete(employee_pk)
+
+
+def rebuild_index(batch_size=1000):
+    rows = (
+        (row['id'], row)
+        for row in Employee.objects.values('id', *SEARCH_FIELDS).iterator(chunk_size=batch_size)
+    )
+    return employee_index.rebuild(rows, batch_size=batch_size)
+
+
+def employee_id_prefix(query):
+    """
+    Q for employee IDs starting with the query.
+
+    Written as a range so SQLite can use the unique employee_id index
+    (LIKE 'x%' cannot use a case-sensitive index).
+    """
+    prefix = query.strip().upper()
+    return Q(employee_id__gte=prefix, employee_id__lt=prefix + '\U0010ffff')
+
+
+def substring_match(query):
+    """Q for employees with the query anywhere in a search field (full scan)"""
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__icontains': query})
+    return condition
+
+
+def _uses_index(query):
+    return employee_index.available() and len(query) >= MIN_INDEXED_LENGTH and bool(match_expression(query))
+
+
+def search_employees(queryset, query):
+    """Filter a queryset to employees matching the search text"""
+    query = (query or '').strip()
+    if not query:
+        return queryset
+    if not _uses_index(query):
+        return queryset.filter(substring_match(query))
+    sql, params = employee_index.match_subquery(query)
+    matches = queryset.filter(employee_id_prefix(query) | Q(id__in=RawSQL(sql, params)))
+    if matches.exists():
+        return matches
+    return queryset.filter(substring_match(query))
+
+
+def autocomplete(query, limit=10):
+    """Best matches for a partial query: employee ID prefix hits first, then ranked text hits"""
+    query = (query or '').strip()
+    if not query:
+        return []
+    fields = ('id', 'employee_id', 'name', 'department', 'position')
+    results = list(Employee.objects.filter(employee_id_prefix(query)).order_by('employee_id').values(*fields)[:limit])
+    seen = {row['id'] for row in results}
+
+    if _uses_index(query):
+        ranked_ids = [pk for pk in employee_index.ranked_ids(query, limit=limit * 2) if pk not in seen]
+        rows = {row['id']: row for row in Employee.objects.filter(id__in=ranked_ids).values(*fields)}
+        results.extend(rows[pk] for pk in ranked_ids if pk in rows)
+    if not results:
+        matches = Employee.objects.filter(substring_match(query)).exclude(id__in=seen)
+        results.extend(matches.order_by('name').values(*fields)[:limit])
+    return results[:limit]
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from authentication.models import Employee
+from .cache import bump_version
+from .search import index_employee, unindex_employee
+
+
+def _is_login_touch(update_fields):
+    """Logins only write last_login, which no cached or indexed data depends on"""
+    return update_fields is not None and set(update_fields) <= {'last_login'}
+
+
+@receiver(post_save, sender=Employee)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if _is_login_touch(update_fields):
+        return
+    index_employee(instance)
+
+
+@receiver(post_delete, sender=Employee)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_employee(instance.pk)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee_caches(sender, update_fields=None, **kwargs):
+    if _is_login_touch(update_fields):
+        return
+    bump_version()
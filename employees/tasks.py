@@ -0,0 +1,22 @@
+from PIL import Image
+
+from task_queue.queue import task
+
+from .cache import bump_version
+from .thumbnails import finish_pending, generate_thumbnails, picture_file, remember_failure
+
+
+@task(priority=10)
+def render_thumbnails(name):
+    """Generate the renditions of a profile picture (new upload, or first shown without them)"""
+    picture = picture_file(name)
+    try:
+        generate_thumbnails(picture)
+    except (OSError, Image.DecompressionBombError):
+        # Not a readable image; thumbnail_url keeps serving the original
+        remember_failure(picture)
+    else:
+        # Cached pages such as the directory embed the avatar URL
+        bump_version()
+    finally:
+        finish_pending(picture)
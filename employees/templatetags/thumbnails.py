@@ -0,0 +1,10 @@
+from django import template
+from employees.thumbnails import thumbnail_url
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail(picture, size=64):
+    """Usage: {{ employee.profile_picture|thumbnail:64 }}"""
+    return thumbnail_url(picture, int(size))
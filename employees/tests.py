@@ -1,3 +1,354 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from authentication.models import Attendance, Employee, Leave
+from hr_management.models import LeaveBalance, LeaveLedgerEntry
+from task_queue.models import Task
+from .cache import VERSION_KEY, bump_version, get_version
+from .directory import build_directory, directory
+from .fake_data import generate
+from .importer import import_employees, read_rows
+from .reports import workforce_report
+from .search import autocomplete, search_employees
+from .tasks import render_thumbnails
+from .thumbnails import EXTENSION, picture_file, thumbnail_url
+
+
+class EmployeeSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hr = Employee.objects.create(
+            username='hr', name='Helen Ross', role='HR', department='Human Resources', position='Manager',
+        )
+        self.cruz = Employee.objects.create(
+            username='cruz', name='María Cruz', department='Information Technology', position='Engineer',
+        )
+        self.dev = Employee.objects.create(
+            username='dev', name='José Dev', department='Information Technology', position='Engineer',
+        )
+
+    def search(self, query):
+        return set(search_employees(Employee.objects.all(), query).values_list('username', flat=True))
+
+    def test_word_prefixes_use_the_index(self):
+        self.assertEqual(self.search('cru'), {'cruz'})
+        self.assertEqual(self.search('info eng'), {'cruz', 'dev'})
+        self.assertEqual(self.search('jose'), {'dev'})
+
+    def test_employee_id_prefix(self):
+        self.assertEqual(self.search(self.dev.employee_id), {'dev'})
+        self.assertEqual(self.search(self.dev.employee_id.lower()), {'dev'})
+
+    def test_infix_query_falls_back_to_substring(self):
+        self.assertEqual(self.search('ruz'), {'cruz'})
+        self.assertEqual(self.search('formation'), {'cruz', 'dev'})
+
+    def test_short_query_matches_substring(self):
+        self.assertEqual(self.search('uz'), {'cruz'})
+        self.assertEqual(self.search('ro'), {'hr'})
+
+    def test_no_match_and_syntax_characters(self):
+        self.assertEqual(self.search('nobody'), set())
+        self.assertEqual(self.search('"*'), set())
+        self.assertEqual(self.search(''), {'hr', 'cruz', 'dev'})
+
+    def test_index_follows_updates_and_deletes(self):
+        self.dev.name = 'Zed Quux'
+        self.dev.save()
+        self.cruz.delete()
+        self.assertEqual(self.search('quu'), {'dev'})
+        self.assertEqual(self.search('jose'), set())
+        self.assertEqual(self.search('cruz'), set())
+
+    def test_autocomplete(self):
+        self.assertEqual([row['id'] for row in autocomplete(self.cruz.employee_id)], [self.cruz.id])
+        self.assertEqual([row['id'] for row in autocomplete('hel')], [self.hr.id])
+        self.assertEqual([row['id'] for row in autocomplete('ruz')], [self.cruz.id])
+
+    def test_list_view_search(self):
+        self.client.force_login(self.hr)
+        response = self.client.get('/employees/', {'search': 'ruz'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([employee.id for employee in response.context['employees']], [self.cruz.id])
+
+    def test_list_page_title(self):
+        self.client.force_login(self.hr)
+        response = self.client.get('/employees/')
+        self.assertContains(response, '<title>Employee Management - Federal Agency</title>')
+        self.assertContains(response, '/employees/autocomplete/', count=1)  # The suggestion script, once
+
+
+class WorkforceReportTests(TestCase):
+    def setUp(self):
+        Employee.objects.create(username='a', name='A', department='IT', salary_rate=100)
+        Employee.objects.create(username='b', name='B', department='IT', salary_rate=300, role='HR')
+        self.sales = Employee.objects.create(username='c', name='C', department='Sales', salary_rate=50)
+        cache.clear()
+
+    def test_report_is_one_query_then_cached(self):
+        with self.assertNumQueries(1):
+            report = workforce_report()
+        with self.assertNumQueries(0):
+            self.assertEqual(workforce_report(), report)
+        self.assertEqual(report['total_employees'], 3)
+        self.assertEqual([(dept['name'], dept['count'], dept['salary_average']) for dept in report['dept_stats']],
+                         [('IT', 2, Decimal('200.00')), ('Sales', 1, Decimal('50.00'))])
+
+    def test_save_and_delete_invalidate(self):
+        workforce_report()
+        self.sales.status = 'Inactive'
+        self.sales.save()
+        self.assertEqual(workforce_report()['total_employees'], 2)
+        Employee.objects.filter(username='a').delete()
+        self.assertEqual(workforce_report()['total_employees'], 1)
+
+    def test_login_touch_keeps_the_cache(self):
+        version = get_version()
+        self.sales.save(update_fields=['last_login'])
+        self.assertEqual(get_version(), version)
+
+    def test_evicted_version_does_not_revive_old_entries(self):
+        bump_version()
+        version = get_version()
+        workforce_report()
+        cache.delete(VERSION_KEY)
+        Employee.objects.create(username='d', name='D', department='Sales')
+        self.assertNotEqual(get_version(), version)
+        self.assertEqual(workforce_report()['total_employees'], 4)
+
+
+class EmployeeDirectoryTests(TestCase):
+    def setUp(self):
+        self.user = Employee.objects.create(username='zoe', name='Zoe', department='IT', role='HR')
+        self.other = Employee.objects.create(username='al', name='Al', department='Sales')
+        Employee.objects.create(username='gone', name='Gone', status='Inactive')
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get(self, **headers):
+        return self.client.get('/employees/directory/', headers=headers)
+
+    def test_projection_has_only_public_fields(self):
+        with self.assertNumQueries(1):
+            entries = directory()
+        self.assertEqual([entry['name'] for entry in entries], ['Al', 'Zoe'])
+        self.assertEqual(set(entries[0]), {'id', 'employee_id', 'name', 'department', 'role', 'avatar_url'})
+        with self.assertNumQueries(0):
+            directory()
+
+    def test_etag_and_not_modified(self):
+        response = self.get()
+        etag = response['ETag']
+        self.assertRegex(etag, r'^"directory-v\d+"$')
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+
+    def test_edit_changes_the_etag(self):
+        etag = self.get()['ETag']
+        self.other.name = 'Albert'
+        self.other.save()
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Albert', [entry['name'] for entry in response.json()['results']])
+
+    def test_evicted_version_does_not_match_old_etags(self):
+        bump_version()
+        etag = self.get()['ETag']
+        cache.delete(VERSION_KEY)
+        self.other.name = 'Albert'
+        self.other.save()
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+
+class EmployeeImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hr = Employee.objects.create(username='hr', name='HR', role='HR')
+
+    def run_import(self, data, **options):
+        return import_employees(read_rows(io.BytesIO(data), 'employees.csv'), **options)
+
+    def test_valid_rows_are_created(self):
+        report = self.run_import(
+            b'Username,Name,Password,Email,Department,Salary_Rate,Role\n'
+            b'alice,Alice A,pw1,alice@example.com,IT,100,Employee\n'
+            b'dave,Dave D,pw4,,Finance,,HR\n'
+        )
+        self.assertEqual((report.rows_read, report.created, report.errors), (2, 2, []))
+        alice = Employee.objects.get(username='alice')
+        self.assertTrue(alice.check_password('pw1'))
+        self.assertTrue(alice.employee_id.startswith('EMP'))
+        self.assertEqual(str(alice.salary_rate), '100.00')
+        self.assertEqual(Employee.objects.get(username='dave').role, 'HR')
+        self.assertEqual(list(search_employees(Employee.objects.all(), 'dave')), [Employee.objects.get(username='dave')])
+
+    def test_bad_rows_are_reported_not_created(self):
+        report = self.run_import(
+            b'username,name,password,email,salary_rate,role\n'
+            b'bob,Bob,pw,not-an-email,1,Employee\n'
+            b'carl,Carl,pw,,lots,Employee\n'
+            b'erin,Erin,pw,,,Boss\n'
+            b',,,,,\n'
+            b'fay,Fay,pw,,,\n'
+        )
+        self.assertEqual(report.created, 1)
+        self.assertEqual(
+            [(row_number, username) for row_number, username, _ in report.errors],
+            [(2, 'bob'), (3, 'carl'), (4, 'erin'), (5, '')],
+        )
+        self.assertIn('invalid email "not-an-email"', report.errors[0][2])
+        self.assertIn('name is required', report.errors[3][2])
+        self.assertEqual(set(Employee.objects.values_list('username', flat=True)), {'hr', 'fay'})
+
+    def test_duplicates_in_file_and_database(self):
+        report = self.run_import(
+            b'username,name,password\nhr,Existing,pw\nnew,New,pw\nnew,Again,pw\n', chunk_size=1,
+        )
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors, [
+            (2, 'hr', ['username already exists']),
+            (4, 'new', ['username is duplicated in this file']),
+        ])
+        self.assertEqual(Employee.objects.get(username='new').name, 'New')
+        self.assertEqual(Employee.objects.get(username='hr').name, 'HR')
+
+    def test_dry_run_writes_nothing(self):
+        report = self.run_import(b'username,name,password\nhr,HR,pw\nzed,Zed,pw\n', dry_run=True)
+        self.assertEqual((report.created, report.failed), (1, 1))
+        self.assertFalse(Employee.objects.filter(username='zed').exists())
+
+    def test_view_reports_row_errors(self):
+        self.client.force_login(self.hr)
+        upload = io.BytesIO(b'username,name,password\nzed,Zed,pw\n,,\n')
+        upload.name = 'employees.csv'
+        response = self.client.post('/employees/import/', {'file': upload})
+        self.assertContains(response, 'name is required')
+        self.assertTrue(Employee.objects.filter(username='zed').exists())
+
+    def test_view_rejects_malformed_csv(self):
+        self.client.force_login(self.hr)
+        upload = io.BytesIO(b'username,name,password\nzed,' + b'x' * 200000 + b',pw\n')
+        upload.name = 'employees.csv'
+        response = self.client.post('/employees/import/', {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Error importing employees')
+        self.assertFalse(Employee.objects.filter(username='zed').exists())
+
+    @override_settings(EMPLOYEE_IMPORT_MAX_ROWS=2)
+    def test_view_sends_large_files_to_the_command(self):
+        self.client.force_login(self.hr)
+        upload = io.BytesIO(b'username,name,password\nx1,X,pw\nx2,X,pw\nx3,X,pw\n')
+        upload.name = 'employees.csv'
+        response = self.client.post('/employees/import/', {'file': upload})
+        self.assertContains(response, 'more than 2 rows')
+        self.assertContains(response, 'import_employees')
+        self.assertFalse(Employee.objects.filter(username__startswith='x').exists())
+
+        upload = io.BytesIO(b'username,name,password\nx1,X,pw\nx2,X,pw\n')
+        upload.name = 'employees.csv'
+        self.client.post('/employees/import/', {'file': upload})
+        self.assertEqual(Employee.objects.filter(username__startswith='x').count(), 2)
+
+    def test_view_rejects_xlsx_without_openpyxl(self):
+        self.client.force_login(self.hr)
+        upload = io.BytesIO(b'PK\x03\x04')
+        upload.name = 'employees.xlsx'
+        with mock.patch('employees.views.xlsx_supported', return_value=False):
+            response = self.client.post('/employees/import/', {'file': upload}, follow=True)
+        self.assertContains(response, 'XLSX import is not available')
+        self.assertContains(response, 'accept=".csv"')
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, TASKS_SYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def store(self, name, content):
+        return picture_file(default_storage.save(f'profile_pictures/{name}', ContentFile(content)))
+
+    def jpeg(self):
+        output = io.BytesIO()
+        Image.new('RGB', (400, 300), 'red').save(output, 'JPEG')
+        return output.getvalue()
+
+    def test_miss_serves_original_and_queues_one_render(self):
+        picture = self.store('photo.jpg', self.jpeg())
+        self.assertEqual(thumbnail_url(picture, 40), picture.url)
+        self.assertEqual(thumbnail_url(picture, 40), picture.url)
+        self.assertEqual(list(Task.objects.values_list('name', 'kwargs')),
+                         [('employees.render_thumbnails', {'name': picture.name})])
+        self.assertFalse(default_storage.exists('thumbnails'))
+
+        render_thumbnails(name=picture.name)
+        url = thumbnail_url(picture, 40)
+        self.assertTrue(url.endswith(f'_64.{EXTENSION}'))
+        with Image.open(default_storage.path(url[len('/media/'):])) as image:
+            self.assertEqual(image.size, (64, 64))
+
+    def test_synchronous_tasks_render_on_first_use(self):
+        picture = self.store('photo.jpg', self.jpeg())
+        with override_settings(TASKS_SYNC=True):
+            self.assertTrue(thumbnail_url(picture, 128).endswith(f'_128.{EXTENSION}'))
+
+    def test_unreadable_picture_failure_is_cached(self):
+        picture = self.store('broken.jpg', b'not an image')
+        thumbnail_url(picture)
+        render_thumbnails(name=picture.name)
+        Task.objects.all().delete()
+
+        self.assertEqual(thumbnail_url(picture), picture.url)
+        self.assertFalse(Task.objects.exists())
+
+    def test_directory_does_not_render_inline(self):
+        picture = self.store('photo.jpg', self.jpeg())
+        Employee.objects.create(username='pic', name='Pic', profile_picture=picture.name)
+        self.assertEqual([entry['avatar_url'] for entry in build_directory()], [picture.url])
+        self.assertEqual(Task.objects.count(), 1)
+
+
+class FakeDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.counts = generate(
+            employees=20, days=60, leaves_per_year=30, payroll_months=2, messages=50, security_logs=50,
+            applications=5, end_date=date(2025, 6, 2), password='secret',
+        )
+
+    def test_rows_are_written(self):
+        self.assertEqual(Employee.objects.count(), 20)
+        self.assertEqual(self.counts[Attendance._meta.db_table], Attendance.objects.count())
+        self.assertTrue(Leave.objects.filter(status='Approved', duration='Full').exists())
+        self.assertTrue(Employee.objects.get(role='Admin').check_password('secret'))
+
+    def test_no_attendance_on_approved_full_day_leave(self):
+        for leave in Leave.objects.filter(status='Approved', duration='Full'):
+            days = [leave.start_date + timedelta(days=offset) for offset in range((leave.end_date - leave.start_date).days + 1)]
+            with self.subTest(leave=leave.pk):
+                self.assertFalse(Attendance.objects.filter(employee_id=leave.employee_id, date__in=days).exists())
+
+    def test_balances_match_the_ledger(self):
+        balances = LeaveBalance.objects.all()
+        self.assertTrue(balances.exists())
+        for balance in balances:
+            entries = LeaveLedgerEntry.objects.filter(employee_id=balance.employee_id, leave_type=balance.leave_type)
+            with self.subTest(employee=balance.employee_id, leave_type=balance.leave_type):
+                self.assertEqual(entries.aggregate(total=Sum('days'))['total'], balance.balance)
+                self.assertEqual(entries.order_by('-id').first().balance_after, balance.balance)
@@ -0,0 +1,136 @@
+"""
+Profile picture renditions.
+
+Avatars are shown at 35-100px but uploads are often multi-megabyte photos, so
+every picture gets square renditions at a few fixed sizes (WebP when Pillow
+supports it, JPEG otherwise). Renditions are named after a hash of the
+original's content, so re-uploading the same image reuses them and a new
+image can never be served a stale thumbnail. They are generated by a
+background task, queued on upload and the first time a picture without them
+is displayed; until the task has run (or when the picture cannot be
+rendered) the original is shown. The mapping from an original to its
+renditions, or the fact that it failed, is kept in the cache.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from task_queue.queue import enqueue
+
+SIZES = (32, 64, 128)
+THUMBNAIL_DIR = 'thumbnails'
+PENDING_TIMEOUT = 10 * 60  # Do not queue the same picture again while its task waits
+FAILURE_TIMEOUT = 60 * 60  # Retry unreadable originals this often
+
+if features.check('webp'):
+    FORMAT, EXTENSION, SAVE_OPTIONS = 'WEBP', 'webp', {'quality': 80, 'method': 4}
+else:
+    FORMAT, EXTENSION, SAVE_OPTIONS = 'JPEG', 'jpg', {'quality': 85, 'optimize': True}
+
+
+def _cache_key(picture):
+    return f'thumbnails:{picture.name}'
+
+
+def _pending_key(picture):
+    return f'thumbnails-pending:{picture.name}'
+
+
+def snap_size(size):
+    """Smallest rendition size that is at least `size` pixels"""
+    for candidate in SIZES:
+        if candidate >= size:
+            return candidate
+    return SIZES[-1]
+
+
+def content_digest(picture):
+    digest = hashlib.sha256()
+    picture.open('rb')
+    try:
+        for chunk in picture.chunks():
+            digest.update(chunk)
+    finally:
+        picture.close()
+    return digest.hexdigest()[:32]
+
+
+def rendition_name(digest, size):
+    return f'{THUMBNAIL_DIR}/{digest[:2]}/{digest}_{size}.{EXTENSION}'
+
+
+def _render(image, size):
+    thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    if FORMAT == 'JPEG' and thumb.mode != 'RGB':
+        thumb = thumb.convert('RGB')
+    elif thumb.mode not in ('RGB', 'RGBA'):
+        thumb = thumb.convert('RGBA')
+    output = ContentFile(b'')
+    thumb.save(output, FORMAT, **SAVE_OPTIONS)
+    return output
+
+
+def generate_thumbnails(picture):
+    """Create any missing renditions of a picture; returns {size: storage name}"""
+    digest = content_digest(picture)
+    names = {size: rendition_name(digest, size) for size in SIZES}
+    missing = [size for size, name in names.items() if not default_storage.exists(name)]
+    if missing:
+        picture.open('rb')
+        try:
+            with Image.open(picture) as image:
+                # Let the JPEG decoder downscale while decoding instead of inflating the full photo
+                image.draft('RGB', (max(missing) * 2, max(missing) * 2))
+                image = ImageOps.exif_transpose(image)
+                for size in missing:
+                    default_storage.save(names[size], _render(image, size))
+        finally:
+            picture.close()
+    cache.set(_cache_key(picture), names, timeout=None)
+    return names
+
+
+def picture_file(name):
+    """Profile picture file for a stored name, e.g. one fetched with values_list"""
+    from authentication.models import Employee
+    field = Employee._meta.get_field('profile_picture')
+    return field.attr_class(None, field, name) if name else None
+
+
+def remember_failure(picture):
+    """Cache that a picture cannot be rendered, so it is shown as is without retrying on every view"""
+    cache.set(_cache_key(picture), {}, FAILURE_TIMEOUT)
+
+
+def finish_pending(picture):
+    cache.delete(_pending_key(picture))
+
+
+def thumbnail_url(picture, size=64):
+    """URL of a picture's rendition closest to `size`; the original until renditions exist or if they cannot"""
+    if not picture:
+        return None
+    names = cache.get(_cache_key(picture))
+    if names is None:
+        if cache.add(_pending_key(picture), True, PENDING_TIMEOUT):
+            _queue_render(picture)
+            names = cache.get(_cache_key(picture))  # Already rendered when tasks run synchronously
+    if not names:
+        return picture.url
+    return default_storage.url(names[snap_size(size)])
+
+
+def _queue_render(picture):
+    from .tasks import render_thumbnails
+
+    enqueue(render_thumbnails, name=picture.name)
+
+
+def refresh_thumbnails(picture):
+    """Queue regeneration of renditions after an upload (the upload may reuse an old file name)"""
+    cache.delete(_cache_key(picture))
+    cache.set(_pending_key(picture), True, PENDING_TIMEOUT)
+    _queue_render(picture)
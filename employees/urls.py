@@ -4,6 +4,9 @@ from . import views
 urlpatterns = [
     path('', views.employee_list, name='employee_list'),
     path('add/', views.employee_add, name='employee_add'),
+    path('import/', views.employee_import, name='employee_import'),
+    path('directory/', views.employee_directory, name='employee_directory'),
+    path('autocomplete/', views.employee_autocomplete, name='employee_autocomplete'),
     path('edit/<int:employee_id>/', views.employee_edit, name='employee_edit'),
     path('delete/<int:employee_id>/', views.employee_delete, name='employee_delete'),
     path('reports/', views.reports_view, name='reports'),
@@ -1,10 +1,23 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
-from django.core.paginator import Paginator
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 from authentication.models import Employee, SecurityLog
+from payroll_system.pagination import KeysetPaginator, estimate_count
+from security.audit import log_event
+from security.reports import apply_filters, log_summary, parse_filters
 from django.contrib.auth.hashers import make_password
+from .directory import directory, directory_etag
+from .importer import (
+    OPTIONAL_COLUMNS, REQUIRED_COLUMNS, import_employees, limit_rows, read_rows, xlsx_supported,
+)
+from .reports import workforce_report
+from .search import autocomplete, search_employees
+from .thumbnails import refresh_thumbnails
+import csv
 import os
 
 
@@ -16,29 +29,47 @@ def employee_list(request):
         return redirect('home')
     
     search_query = request.GET.get('search', '')
-    employees = Employee.objects.all().order_by('name')
+    employees = search_employees(Employee.objects.all(), search_query)
     
-    if search_query:
-        employees = employees.filter(
-            Q(name__icontains=search_query) |
-            Q(employee_id__icontains=search_query) |
-            Q(department__icontains=search_query) |
-            Q(position__icontains=search_query)
-        ).order_by('name')
+    # Keyset pagination on (name, id); exact totals only on request
+    paginator = KeysetPaginator(employees, ('name', 'id'), per_page=10)
+    page_obj = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
     
-    # Pagination
-    paginator = Paginator(employees, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    exact_count = request.GET.get('count') == 'exact'
+    if exact_count:
+        total_employees = employees.count()
+    elif search_query:
+        total_employees = None
+    else:
+        total_employees = estimate_count(Employee)
     
     context = {
         'employees': page_obj,
         'search_query': search_query,
-        'total_employees': employees.count()
+        'total_employees': total_employees,
+        'exact_count': exact_count,
     }
     return render(request, 'employees/list.html', context)
 
 
+@login_required
+def employee_autocomplete(request):
+    """JSON suggestions for the employee search box"""
+    if not request.user.is_hr:
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    return JsonResponse({'results': autocomplete(request.GET.get('q', ''))})
+
+
+@login_required
+@condition(etag_func=directory_etag)
+def employee_directory(request):
+    """Active employee directory as JSON; clients revalidate with If-None-Match"""
+    response = JsonResponse({'results': directory()})
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 @login_required
 def employee_add(request):
     """Add new employee"""
@@ -81,9 +112,10 @@ def employee_add(request):
             if profile_picture:
                 employee.profile_picture = profile_picture
                 employee.save()
+                refresh_thumbnails(employee.profile_picture)
             
             # Log security event
-            SecurityLog.objects.create(
+            log_event(
                 event_type='SYSTEM_ACCESS',
                 user=request.user,
                 ip_address=request.META.get('REMOTE_ADDR'),
@@ -100,6 +132,50 @@ def employee_add(request):
     return render(request, 'employees/add.html')
 
 
+@login_required
+def employee_import(request):
+    """Bulk import employees from an uploaded CSV/XLSX file"""
+    if not request.user.is_hr:
+        messages.error(request, 'Access denied. Insufficient permissions.')
+        return redirect('home')
+    
+    extensions = ('.csv', '.xlsx') if xlsx_supported() else ('.csv',)
+    max_rows = getattr(settings, 'EMPLOYEE_IMPORT_MAX_ROWS', 50)
+    report = None
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload and upload.name.lower().endswith('.xlsx') and '.xlsx' not in extensions:
+            messages.error(request, 'XLSX import is not available on this server. Save the file as CSV and upload that.')
+        elif not upload or not upload.name.lower().endswith(extensions):
+            messages.error(request, f'Please upload a {" or ".join(extensions)} file.')
+        else:
+            try:
+                # Hashing runs in this request, one password at a time: keep it short
+                report = import_employees(limit_rows(read_rows(upload, upload.name), max_rows))
+            except (ValueError, csv.Error) as e:
+                messages.error(request, f'Error importing employees: {str(e)}')
+            else:
+                log_event(
+                    event_type='SYSTEM_ACCESS',
+                    user=request.user,
+                    ip_address=request.META.get('REMOTE_ADDR'),
+                    user_agent=request.META.get('HTTP_USER_AGENT'),
+                    event_description=f"Bulk import of {report.created} employees from {upload.name} by {request.user.name}"
+                )
+                if report.created:
+                    messages.success(request, f'{report.created} employees imported successfully.')
+                if report.errors:
+                    messages.warning(request, f'{report.failed} rows could not be imported. See the report below.')
+    
+    context = {
+        'report': report,
+        'columns': REQUIRED_COLUMNS + OPTIONAL_COLUMNS,
+        'extensions': extensions,
+        'max_rows': max_rows,
+    }
+    return render(request, 'employees/import.html', context)
+
+
 @login_required
 def employee_edit(request, employee_id):
     """Edit existing employee"""
@@ -134,9 +210,11 @@ def employee_edit(request, employee_id):
                 employee.profile_picture = request.FILES['profile_picture']
             
             employee.save()
+            if 'profile_picture' in request.FILES:
+                refresh_thumbnails(employee.profile_picture)
             
             # Log security event
-            SecurityLog.objects.create(
+            log_event(
                 event_type='PROFILE_UPDATE',
                 user=request.user,
                 ip_address=request.META.get('REMOTE_ADDR'),
@@ -177,7 +255,7 @@ def employee_delete(request, employee_id):
             employee.delete()
             
             # Log security event
-            SecurityLog.objects.create(
+            log_event(
                 event_type='SYSTEM_ACCESS',
                 user=request.user,
                 ip_address=request.META.get('REMOTE_ADDR'),
@@ -202,36 +280,7 @@ def reports_view(request):
         messages.error(request, 'Access denied. Insufficient permissions.')
         return redirect('home')
     
-    # Calculate statistics
-    total_employees = Employee.objects.filter(status='Active').count()
-    total_departments = Employee.objects.values('department').distinct().count()
-    
-    # Department-wise breakdown
-    departments = Employee.objects.values('department').distinct()
-    dept_stats = []
-    for dept in departments:
-        if dept['department']:
-            count = Employee.objects.filter(department=dept['department'], status='Active').count()
-            dept_stats.append({
-                'name': dept['department'],
-                'count': count
-            })
-    
-    # Role-wise breakdown
-    role_stats = []
-    for role_choice in Employee.ROLE_CHOICES:
-        count = Employee.objects.filter(role=role_choice[0], status='Active').count()
-        role_stats.append({
-            'name': role_choice[1],
-            'count': count
-        })
-    
-    context = {
-        'total_employees': total_employees,
-        'total_departments': total_departments,
-        'dept_stats': dept_stats,
-        'role_stats': role_stats,
-    }
+    context = workforce_report()
     return render(request, 'employees/reports.html', context)
 
 
@@ -242,15 +291,27 @@ def security_logs_view(request):
         messages.error(request, 'Access denied. Only administrators can view security logs.')
         return redirect('home')
     
-    logs = SecurityLog.objects.all().order_by('-timestamp')
+    filters = parse_filters(request.GET)
+    logs = apply_filters(SecurityLog.objects.select_related('user'), filters)
+    filtered = any(filters.values())
+    
+    # Keyset pagination newest first; exact totals only on request
+    paginator = KeysetPaginator(logs, ('-timestamp', '-id'), per_page=20)
+    page_obj = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
     
-    # Pagination
-    paginator = Paginator(logs, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    exact_count = request.GET.get('count') == 'exact'
+    if exact_count:
+        total_logs = logs.count()
+    else:
+        total_logs = None if filtered else estimate_count(SecurityLog)
     
     context = {
         'logs': page_obj,
-        'total_logs': logs.count()
+        'total_logs': total_logs,
+        'exact_count': exact_count,
+        'filters': request.GET,
+        'filtered': filtered,
+        'event_types': SecurityLog.EVENT_TYPE_CHOICES,
+        'summary': log_summary(filters),
     }
     return render(request, 'employees/security_logs.html', context)
@@ -0,0 +1,113 @@
+"""
+Leave overlap detection and department coverage.
+
+Overlap checks run against the leaves table through the
+(employee, start_date, end_date) index. Coverage questions ("who is out on
+date X in department Y") read the per-day LeaveDay occupancy table, which is
+filled when a leave is approved.
+"""
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from authentication.models import Leave
+from .models import LeaveDay
+
+
+def find_overlaps(employee, start_date, end_date, exclude_id=None):
+    """Pending or approved leaves of an employee that intersect [start_date, end_date]"""
+    overlaps = Leave.objects.filter(
+        employee=employee,
+        start_date__lte=end_date,
+        end_date__gte=start_date,
+        status__in=['Pending', 'Approved'],
+    )
+    if exclude_id is not None:
+        overlaps = overlaps.exclude(id=exclude_id)
+    return overlaps.order_by('start_date')
+
+
+def expand(leave, department):
+    """Unsaved LeaveDay rows for every calendar day of a leave"""
+    days = (leave.end_date - leave.start_date).days + 1
+    return [
+        LeaveDay(
+            leave_id=leave.id,
+            employee_id=leave.employee_id,
+            department=department,
+            leave_type=leave.type,
+            date=leave.start_date + timedelta(days=offset),
+        )
+        for offset in range(days)
+    ]
+
+
+def record_occupancy(leaves, batch_size=1000):
+    """Write occupancy rows for approved leaves (leaves need employee loaded or selectable)"""
+    rows = []
+    for leave in leaves:
+        rows.extend(expand(leave, leave.employee.department))
+    LeaveDay.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+    return len(rows)
+
+
+def rebuild_occupancy(batch_size=1000):
+    """Recreate the occupancy table from approved leaves"""
+    with transaction.atomic():
+        LeaveDay.objects.all().delete()
+        leaves = Leave.objects.filter(status='Approved').select_related('employee').only(
+            'id', 'employee_id', 'employee__department', 'type', 'start_date', 'end_date'
+        )
+        return record_occupancy(leaves.iterator(chunk_size=batch_size), batch_size=batch_size)
+
+
+def who_is_out(day, department=None):
+    """Employees on approved leave on a given date"""
+    rows = LeaveDay.objects.filter(date=day)
+    if department:
+        rows = rows.filter(department=department)
+    return rows.select_related('employee').order_by('employee__name')
+
+
+def department_month(department, year, month):
+    """
+    Coverage calendar for one department and month.
+
+    Returns a list of weeks, each a list of
+    {'date', 'in_month', 'absences': [{'name', 'employee_id', 'leave_type'}]}.
+    """
+    weeks = calendar.Calendar(firstweekday=6).monthdatescalendar(year, month)
+    first, last = weeks[0][0], weeks[-1][-1]
+
+    absences = defaultdict(list)
+    for day, name, employee_id, leave_type in LeaveDay.objects.filter(
+        department=department, date__range=(first, last)
+    ).order_by('date', 'employee__name').values_list(
+        'date', 'employee__name', 'employee__employee_id', 'leave_type'
+    ):
+        absences[day].append({'name': name, 'employee_id': employee_id, 'leave_type': leave_type})
+
+    return [
+        [{'date': day, 'in_month': day.month == month, 'absences': absences.get(day, [])} for day in week]
+        for week in weeks
+    ]
+
+
+def parse_month(value, default=None):
+    """
+    Parse 'YYYY-MM' into (year, month), falling back to the current month.
+
+    The first and last years the date type supports are refused too: the
+    calendar grid and the previous/next links run past them.
+    """
+    try:
+        year, month = (int(part) for part in value.split('-'))
+        if not date.min.year < year < date.max.year:
+            raise ValueError(f"Year {year} is out of range")
+        date(year, month, 1)
+        return year, month
+    except (AttributeError, ValueError):
+        today = default or date.today()
+        return today.year, today.month
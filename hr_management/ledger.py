@@ -0,0 +1,323 @@
+"""
+Leave ledger: append-only accrual/consumption entries plus one precomputed
+balance row per employee and leave type.
+
+An employee without a balance row for an accruing leave type (everyone who
+predates the ledger, and every new hire) is credited the annual allowance
+as an opening balance the first time that balance is read or drawn on.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from authentication.models import Employee, Leave, SecurityLog
+from settings_app.conf import get_setting
+from .coverage import record_occupancy
+from .models import LeaveBalance, LeaveLedgerEntry
+
+# Unpaid leave is tracked in the ledger but never accrues an allowance
+ACCRUING_LEAVE_TYPES = [choice[0] for choice in Leave.LEAVE_TYPE_CHOICES if choice[0] != 'Unpaid']
+
+
+class InsufficientBalance(Exception):
+    """Approving the leave would take its balance below zero"""
+
+
+def annual_allowance():
+    """Days granted per accruing leave type, from the max_leave_days setting"""
+    return get_setting('max_leave_days')
+
+
+def leave_days(leave):
+    """Number of days a leave consumes (half days count as 0.5 per day)"""
+    days = Decimal((leave.end_date - leave.start_date).days + 1)
+    if leave.duration == 'Half':
+        days = days / 2
+    return days
+
+
+def get_balance(employee, leave_type):
+    """Current balance for an employee and leave type (single indexed row read)"""
+    balance = LeaveBalance.objects.filter(
+        employee=employee, leave_type=leave_type
+    ).values_list('balance', flat=True).first()
+    if balance is None and leave_type in ACCRUING_LEAVE_TYPES:
+        open_balances([(employee.id, leave_type)])
+        return get_balance(employee, leave_type)
+    return balance if balance is not None else Decimal('0')
+
+
+def get_balances(employee):
+    """All current balances for an employee as {leave_type: balance}"""
+    balances = {leave_type: Decimal('0') for leave_type, _ in Leave.LEAVE_TYPE_CHOICES}
+    stored = dict(LeaveBalance.objects.filter(employee=employee).values_list('leave_type', 'balance'))
+    missing = [(employee.id, leave_type) for leave_type in ACCRUING_LEAVE_TYPES if leave_type not in stored]
+    if missing:
+        open_balances(missing)
+        stored = dict(LeaveBalance.objects.filter(employee=employee).values_list('leave_type', 'balance'))
+    balances.update(stored)
+    return balances
+
+
+def post_entries(entries):
+    """
+    Append unsaved ledger entries and move the matching balances.
+
+    Entries are applied in list order; each one gets its running balance_after.
+    All writes happen in one transaction with the balance rows locked.
+    """
+    if not entries:
+        return []
+
+    with transaction.atomic():
+        employee_ids = {entry.employee_id for entry in entries}
+        leave_types = {entry.leave_type for entry in entries}
+        balances = {
+            (balance.employee_id, balance.leave_type): balance
+            for balance in LeaveBalance.objects.select_for_update().filter(
+                employee_id__in=employee_ids, leave_type__in=leave_types
+            )
+        }
+
+        new_balances = {}
+        for entry in entries:
+            key = (entry.employee_id, entry.leave_type)
+            balance = balances.get(key)
+            if balance is None:
+                balance = LeaveBalance(employee_id=entry.employee_id, leave_type=entry.leave_type, balance=Decimal('0'))
+                balances[key] = balance
+                new_balances[key] = balance
+            balance.balance += entry.days
+            entry.balance_after = balance.balance
+
+        LeaveLedgerEntry.objects.bulk_create(entries)
+        now = timezone.now()
+        changed = [balance for key, balance in balances.items() if key not in new_balances]
+        for balance in changed:
+            balance.updated_at = now
+        LeaveBalance.objects.bulk_update(changed, ['balance', 'updated_at'])
+        LeaveBalance.objects.bulk_create(new_balances.values())
+
+    return entries
+
+
+def consumption_entry(leave, created_at=None):
+    """Build the unsaved consumption entry for an approved leave"""
+    return LeaveLedgerEntry(
+        employee_id=leave.employee_id,
+        leave_type=leave.type,
+        entry_type='Consumption',
+        days=-leave_days(leave),
+        leave_id=leave.id,
+        description=f"{leave.type} leave {leave.start_date} to {leave.end_date}",
+        created_at=created_at or timezone.now(),
+    )
+
+
+def consume(leaves):
+    """Post consumption entries for approved leaves that are not yet in the ledger"""
+    leaves = list(leaves)
+    already_posted = set(LeaveLedgerEntry.objects.filter(
+        leave_id__in=[leave.id for leave in leaves], entry_type='Consumption'
+    ).values_list('leave_id', flat=True))
+    return post_entries([
+        consumption_entry(leave) for leave in leaves if leave.id not in already_posted
+    ])
+
+
+def accrue(employee, leave_type, days, description=''):
+    """Credit days to an employee's balance"""
+    return post_entries([LeaveLedgerEntry(
+        employee_id=employee.id,
+        leave_type=leave_type,
+        entry_type='Accrual',
+        days=Decimal(days),
+        description=description,
+    )])[0]
+
+
+def grant_annual_allowance(employees=None, days=None, description=''):
+    """Accrue the yearly allowance for every accruing leave type"""
+    if employees is None:
+        employees = Employee.objects.filter(status='Active')
+    days = annual_allowance() if days is None else Decimal(days)
+    description = description or f"Annual allowance {timezone.now().year}"
+    return post_entries([
+        LeaveLedgerEntry(
+            employee_id=employee_id,
+            leave_type=leave_type,
+            entry_type='Accrual',
+            days=days,
+            description=description,
+        )
+        for employee_id in employees.values_list('id', flat=True).order_by('id')
+        for leave_type in ACCRUING_LEAVE_TYPES
+    ])
+
+
+def open_balances(keys):
+    """
+    Credit the annual allowance as an opening balance for (employee id, leave type)
+    pairs that have no balance row yet.
+
+    A concurrent request opening the same balance makes this one a no-op:
+    the balance rows are unique per employee and leave type.
+    """
+    days = annual_allowance()
+    try:
+        with transaction.atomic():
+            return post_entries([
+                LeaveLedgerEntry(
+                    employee_id=employee_id,
+                    leave_type=leave_type,
+                    entry_type='Accrual',
+                    days=days,
+                    description='Opening balance',
+                )
+                for employee_id, leave_type in sorted(set(keys))
+            ])
+    except IntegrityError:
+        return []
+
+
+def split_by_balance(leaves):
+    """
+    Split leaves into those the current balances cover and those they do not.
+
+    Leaves are taken in the order given, each drawing down what is left for
+    the next one. Unpaid leave is always covered. Call inside a transaction:
+    the balance rows are locked.
+    """
+    leaves = list(leaves)
+
+    def locked_balances():
+        return {
+            (balance.employee_id, balance.leave_type): balance.balance
+            for balance in LeaveBalance.objects.select_for_update().filter(
+                employee_id__in={leave.employee_id for leave in leaves}, leave_type__in=ACCRUING_LEAVE_TYPES
+            )
+        }
+
+    available = locked_balances()
+    missing = {
+        (leave.employee_id, leave.type) for leave in leaves
+        if leave.type in ACCRUING_LEAVE_TYPES and (leave.employee_id, leave.type) not in available
+    }
+    if missing:
+        open_balances(missing)
+        available = locked_balances()
+    covered, short = [], []
+    for leave in leaves:
+        if leave.type not in ACCRUING_LEAVE_TYPES:
+            covered.append(leave)
+            continue
+        key = (leave.employee_id, leave.type)
+        remaining = available.get(key, Decimal('0')) - leave_days(leave)
+        if remaining < 0:
+            short.append(leave)
+        else:
+            available[key] = remaining
+            covered.append(leave)
+    return covered, short
+
+
+def approve_leave(leave, processed_by):
+    """Approve a single leave, posting its consumption and occupancy in the same transaction"""
+    with transaction.atomic():
+        if split_by_balance([leave])[1]:
+            raise InsufficientBalance(f"Not enough {leave.type} leave balance for leave #{leave.id}")
+        leave.status = 'Approved'
+        leave.processed_by = processed_by
+        leave.processed_at = timezone.now()
+        leave.save(update_fields=['status', 'processed_by', 'processed_at'])
+        consume([leave])
+        record_occupancy([leave])
+    return leave
+
+
+def process_leaves(leave_ids, status, processed_by, ip_address=None, user_agent=None):
+    """
+    Approve or reject many pending leaves at once.
+
+    One UPDATE moves every row, one bulk_create writes the audit trail and
+    approved leaves are posted to the ledger and the occupancy table, all in
+    a single transaction. Leaves the balance cannot cover (oldest requests
+    are served first) stay pending.
+    Returns (number of leaves processed, leaves left pending for lack of balance).
+    """
+    with transaction.atomic():
+        leaves = list(Leave.objects.select_for_update(of=('self',)).filter(
+            id__in=leave_ids, status='Pending'
+        ).select_related('employee').only(
+            'id', 'employee_id', 'employee__name', 'employee__department',
+            'type', 'duration', 'start_date', 'end_date', 'applied_at',
+        ).order_by('applied_at', 'id'))
+        short = []
+        if status == 'Approved':
+            leaves, short = split_by_balance(leaves)
+        if not leaves:
+            return 0, short
+
+        now = timezone.now()
+        Leave.objects.filter(id__in=[leave.id for leave in leaves]).update(
+            status=status, processed_by=processed_by, processed_at=now
+        )
+
+        SecurityLog.objects.bulk_create([
+            SecurityLog(
+                event_type='SYSTEM_ACCESS',
+                user=processed_by,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                event_description=(
+                    f"{leave.type} leave #{leave.id} for {leave.employee.name} "
+                    f"({leave.start_date} to {leave.end_date}) {status.lower()} by {processed_by.name}"
+                ),
+                timestamp=now,
+            )
+            for leave in leaves
+        ])
+
+        if status == 'Approved':
+            post_entries([consumption_entry(leave, created_at=now) for leave in leaves])
+            record_occupancy(leaves)
+
+    return len(leaves), short
+
+
+def rebuild_ledger(batch_size=1000):
+    """
+    Reconstruct the ledger and balances from history.
+
+    Accrual and adjustment entries are the source of truth for credits;
+    consumption entries are regenerated from approved leaves. Running
+    balances are recomputed in chronological order.
+    """
+    with transaction.atomic():
+        credits = list(LeaveLedgerEntry.objects.exclude(entry_type='Consumption').values(
+            'employee_id', 'leave_type', 'entry_type', 'days', 'leave_id', 'description', 'created_at'
+        ))
+        entries = [LeaveLedgerEntry(**credit) for credit in credits]
+        for leave in Leave.objects.filter(status='Approved').only(
+            'id', 'employee_id', 'type', 'duration', 'start_date', 'end_date', 'applied_at', 'processed_at'
+        ).iterator(chunk_size=batch_size):
+            entries.append(consumption_entry(leave, created_at=leave.processed_at or leave.applied_at))
+
+        entries.sort(key=lambda entry: (entry.employee_id, entry.leave_type, entry.created_at))
+        running = defaultdict(Decimal)
+        for entry in entries:
+            key = (entry.employee_id, entry.leave_type)
+            running[key] += entry.days
+            entry.balance_after = running[key]
+
+        LeaveLedgerEntry.objects.all().delete()
+        LeaveBalance.objects.all().delete()
+        LeaveLedgerEntry.objects.bulk_create(entries, batch_size=batch_size)
+        LeaveBalance.objects.bulk_create([
+            LeaveBalance(employee_id=employee_id, leave_type=leave_type, balance=balance)
+            for (employee_id, leave_type), balance in running.items()
+        ], batch_size=batch_size)
+
+    return len(entries), len(running)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from hr_management.ledger import grant_annual_allowance
+
+
+class Command(BaseCommand):
+    help = 'Accrue the annual leave allowance (max_leave_days) for all active employees'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', help='Override the max_leave_days setting')
+        parser.add_argument('--description', default='')
+
+    def handle(self, *args, **options):
+        entries = grant_annual_allowance(days=options['days'], description=options['description'])
+        self.stdout.write(self.style.SUCCESS(f'Posted {len(entries)} accrual entries.'))
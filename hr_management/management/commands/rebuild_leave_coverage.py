@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from hr_management.coverage import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-day leave occupancy table from approved leaves'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rebuild_occupancy(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} leave day rows.'))
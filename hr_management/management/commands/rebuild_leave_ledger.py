@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from hr_management.ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the leave ledger and balances from accruals and approved leaves'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        entries, balances = rebuild_ledger(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {entries} ledger entries across {balances} balances.'
+        ))
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(choices=[('Sick', 'Sick Leave'), ('Vacation', 'Vacation Leave'), ('Emergency', 'Emergency Leave'), ('Unpaid', 'Unpaid Leave')], max_length=20)),
+                ('balance', models.DecimalField(decimal_places=1, default=0, max_digits=7)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_balances', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'leave_balances',
+                'unique_together': {('employee', 'leave_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaveLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(choices=[('Sick', 'Sick Leave'), ('Vacation', 'Vacation Leave'), ('Emergency', 'Emergency Leave'), ('Unpaid', 'Unpaid Leave')], max_length=20)),
+                ('entry_type', models.CharField(choices=[('Accrual', 'Accrual'), ('Consumption', 'Consumption'), ('Adjustment', 'Adjustment')], max_length=20)),
+                ('days', models.DecimalField(decimal_places=1, max_digits=7)),
+                ('balance_after', models.DecimalField(decimal_places=1, max_digits=7)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_ledger_entries', to=settings.AUTH_USER_MODEL)),
+                ('leave', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='authentication.leave')),
+            ],
+            options={
+                'db_table': 'leave_ledger',
+                'indexes': [models.Index(fields=['employee', 'leave_type', 'created_at'], name='leave_ledge_employe_2c813e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:05
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_leave_days(apps, schema_editor):
+    Leave = apps.get_model('authentication', 'Leave')
+    LeaveDay = apps.get_model('hr_management', 'LeaveDay')
+    rows = []
+    for leave in Leave.objects.filter(status='Approved').select_related('employee').iterator():
+        for offset in range((leave.end_date - leave.start_date).days + 1):
+            rows.append(LeaveDay(
+                leave_id=leave.id,
+                employee_id=leave.employee_id,
+                department=leave.employee.department,
+                leave_type=leave.type,
+                date=leave.start_date + timedelta(days=offset),
+            ))
+    LeaveDay.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_leave_leaves_employee_range_idx_and_more'),
+        ('hr_management', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(blank=True, max_length=100, null=True)),
+                ('leave_type', models.CharField(choices=[('Sick', 'Sick Leave'), ('Vacation', 'Vacation Leave'), ('Emergency', 'Emergency Leave'), ('Unpaid', 'Unpaid Leave')], max_length=20)),
+                ('date', models.DateField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_days', to=settings.AUTH_USER_MODEL)),
+                ('leave', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='days', to='authentication.leave')),
+            ],
+            options={
+                'db_table': 'leave_days',
+                'indexes': [models.Index(fields=['department', 'date'], name='leave_days_departm_b1933e_idx'), models.Index(fields=['employee', 'date'], name='leave_days_employe_90a4c3_idx'), models.Index(fields=['date'], name='leave_days_date_f901c9_idx')],
+                'unique_together': {('leave', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_leave_days, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,66 @@
 from django.db import models
+from django.utils import timezone
+from authentication.models import Employee, Leave
 
-# Create your models here.
+
+class LeaveBalance(models.Model):
+    """Current leave balance per employee and leave type"""
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_balances')
+    leave_type = models.CharField(max_length=20, choices=Leave.LEAVE_TYPE_CHOICES)
+    balance = models.DecimalField(max_digits=7, decimal_places=1, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'leave_balances'
+        unique_together = ['employee', 'leave_type']
+
+    def __str__(self):
+        return f"{self.employee.name} - {self.leave_type}: {self.balance}"
+
+
+class LeaveLedgerEntry(models.Model):
+    """Accrual and consumption entries with the running balance after each one"""
+    ENTRY_TYPE_CHOICES = [
+        ('Accrual', 'Accrual'),
+        ('Consumption', 'Consumption'),
+        ('Adjustment', 'Adjustment'),
+    ]
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_ledger_entries')
+    leave_type = models.CharField(max_length=20, choices=Leave.LEAVE_TYPE_CHOICES)
+    entry_type = models.CharField(max_length=20, choices=ENTRY_TYPE_CHOICES)
+    days = models.DecimalField(max_digits=7, decimal_places=1)  # Positive for accruals, negative for consumption
+    balance_after = models.DecimalField(max_digits=7, decimal_places=1)
+    leave = models.ForeignKey(Leave, on_delete=models.SET_NULL, null=True, blank=True, related_name='ledger_entries')
+    description = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'leave_ledger'
+        indexes = [
+            models.Index(fields=['employee', 'leave_type', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.name} - {self.leave_type} {self.entry_type} {self.days}"
+
+
+class LeaveDay(models.Model):
+    """One row per calendar day covered by an approved leave (occupancy table)"""
+    leave = models.ForeignKey(Leave, on_delete=models.CASCADE, related_name='days')
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_days')
+    department = models.CharField(max_length=100, blank=True, null=True)  # Copied from the employee for indexed lookups
+    leave_type = models.CharField(max_length=20, choices=Leave.LEAVE_TYPE_CHOICES)
+    date = models.DateField()
+
+    class Meta:
+        db_table = 'leave_days'
+        unique_together = ['leave', 'date']
+        indexes = [
+            models.Index(fields=['department', 'date']),
+            models.Index(fields=['employee', 'date']),
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.name} - {self.date}"
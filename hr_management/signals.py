@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from authentication.models import Employee
+from .models import LeaveDay
+
+
+@receiver(post_save, sender=Employee)
+def sync_leave_day_department(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the denormalized department on occupancy rows in step with the employee"""
+    if created or (update_fields is not None and 'department' not in update_fields):
+        return
+    LeaveDay.objects.filter(employee=instance).exclude(
+        department=instance.department
+    ).update(department=instance.department)
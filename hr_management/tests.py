@@ -1,3 +1,306 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from authentication.models import Employee, Leave, SecurityLog
+from .coverage import find_overlaps, parse_month
+from .ledger import (
+    InsufficientBalance, accrue, approve_leave, get_balance, get_balances, process_leaves, rebuild_ledger,
+)
+from .models import LeaveBalance, LeaveDay, LeaveLedgerEntry
+
+
+class LeaveLedgerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create(username='emp', name='Emp', department='Sales')
+        self.hr = Employee.objects.create(username='hr', name='HR', role='HR')
+        accrue(self.employee, 'Sick', 5, 'Opening balance')
+
+    def leave(self, start, end, leave_type='Sick', duration='Full'):
+        return Leave.objects.create(
+            employee=self.employee, type=leave_type, duration=duration,
+            start_date=start, end_date=end, reason='test',
+        )
+
+    def test_approval_posts_consumption_entry(self):
+        leave = self.leave(date(2025, 3, 3), date(2025, 3, 5))
+        processed, short = process_leaves([leave.id], 'Approved', self.hr)
+
+        self.assertEqual((processed, short), (1, []))
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, 'Approved')
+        self.assertEqual(leave.processed_by, self.hr)
+        entry = LeaveLedgerEntry.objects.get(leave=leave)
+        self.assertEqual(entry.entry_type, 'Consumption')
+        self.assertEqual(entry.days, Decimal('-3'))
+        self.assertEqual(get_balance(self.employee, 'Sick'), Decimal('2'))
+        self.assertEqual(SecurityLog.objects.filter(user=self.hr).count(), 1)
+
+    def test_balance_after_is_the_running_balance(self):
+        first = self.leave(date(2025, 3, 3), date(2025, 3, 4))
+        half = self.leave(date(2025, 3, 10), date(2025, 3, 10), duration='Half')
+        process_leaves([first.id, half.id], 'Approved', self.hr)
+
+        self.assertEqual(
+            list(LeaveLedgerEntry.objects.filter(employee=self.employee).order_by('id').values_list(
+                'days', 'balance_after'
+            )),
+            [(Decimal('5'), Decimal('5')), (Decimal('-2'), Decimal('3')), (Decimal('-0.5'), Decimal('2.5'))],
+        )
+        self.assertEqual(LeaveBalance.objects.get(employee=self.employee, leave_type='Sick').balance, Decimal('2.5'))
+
+    def test_insufficient_balance_leaves_request_pending(self):
+        covered = self.leave(date(2025, 3, 3), date(2025, 3, 5))
+        too_long = self.leave(date(2025, 4, 1), date(2025, 4, 3))
+        processed, short = process_leaves([covered.id, too_long.id], 'Approved', self.hr)
+
+        self.assertEqual(processed, 1)
+        self.assertEqual(short, [too_long])
+        too_long.refresh_from_db()
+        self.assertEqual(too_long.status, 'Pending')
+        self.assertFalse(LeaveLedgerEntry.objects.filter(leave=too_long).exists())
+        self.assertEqual(get_balance(self.employee, 'Sick'), Decimal('2'))
+
+    def test_approve_leave_raises_on_insufficient_balance(self):
+        leave = self.leave(date(2025, 3, 3), date(2025, 3, 9))
+        with self.assertRaises(InsufficientBalance):
+            approve_leave(leave, self.hr)
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, 'Pending')
+        self.assertEqual(get_balance(self.employee, 'Sick'), Decimal('5'))
+
+    def test_unpaid_leave_needs_no_balance(self):
+        leave = self.leave(date(2025, 3, 3), date(2025, 3, 12), leave_type='Unpaid')
+        self.assertEqual(process_leaves([leave.id], 'Approved', self.hr), (1, []))
+        self.assertEqual(get_balance(self.employee, 'Unpaid'), Decimal('-10'))
+
+    def test_non_pending_leave_is_not_processed_again(self):
+        leave = self.leave(date(2025, 3, 3), date(2025, 3, 3))
+        process_leaves([leave.id], 'Approved', self.hr)
+
+        self.assertEqual(process_leaves([leave.id], 'Rejected', self.hr), (0, []))
+        self.assertEqual(process_leaves([leave.id], 'Approved', self.hr), (0, []))
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, 'Approved')
+        self.assertEqual(LeaveLedgerEntry.objects.filter(leave=leave).count(), 1)
+        self.assertEqual(get_balance(self.employee, 'Sick'), Decimal('4'))
+
+    def test_rejection_posts_nothing(self):
+        leave = self.leave(date(2025, 3, 3), date(2025, 3, 3))
+        self.assertEqual(process_leaves([leave.id], 'Rejected', self.hr), (1, []))
+        self.assertFalse(LeaveLedgerEntry.objects.filter(leave=leave).exists())
+        self.assertEqual(get_balance(self.employee, 'Sick'), Decimal('5'))
+
+    def test_missing_balances_open_with_the_annual_allowance(self):
+        newcomer = Employee.objects.create(username='new', name='New')
+        balances = get_balances(newcomer)
+        self.assertEqual(balances, {'Sick': Decimal('30'), 'Vacation': Decimal('30'), 'Emergency': Decimal('30'),
+                                    'Unpaid': Decimal('0')})
+        self.assertEqual(get_balances(newcomer), balances)
+        self.assertEqual(LeaveLedgerEntry.objects.filter(employee=newcomer, description='Opening balance').count(), 3)
+        self.assertEqual(get_balances(self.employee)['Sick'], Decimal('5'))  # Existing balances are kept
+
+    def test_approval_opens_a_missing_balance(self):
+        leave = self.leave(date(2025, 3, 3), date(2025, 3, 5), leave_type='Vacation')
+        self.assertEqual(process_leaves([leave.id], 'Approved', self.hr), (1, []))
+        self.assertEqual(get_balance(self.employee, 'Vacation'), Decimal('27'))
+        self.assertEqual(LeaveLedgerEntry.objects.filter(employee=self.employee, leave_type='Vacation').count(), 2)
+
+    def test_balance_lists_leave_out_unpaid_leave(self):
+        leave = self.leave(date(2025, 3, 3), date(2025, 3, 12), leave_type='Unpaid')
+        process_leaves([leave.id], 'Approved', self.hr)
+        self.client.force_login(self.employee)
+        for url in ('/employee/dashboard/', '/hr/leaves/request/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual([item['type'] for item in response.context['leave_balances']],
+                                 ['Sick Leave', 'Vacation Leave', 'Emergency Leave'])
+                self.assertNotContains(response, '-10 days')
+        self.assertEqual(self.client.get('/employee/dashboard/').context['available_leave_days'], Decimal('65'))
+
+    def test_rebuild_matches_posted_ledger(self):
+        leave = self.leave(date(2025, 3, 3), date(2025, 3, 4))
+        process_leaves([leave.id], 'Approved', self.hr)
+        before = list(LeaveLedgerEntry.objects.order_by('id').values_list('days', 'balance_after'))
+
+        self.assertEqual(rebuild_ledger(), (2, 1))
+        self.assertEqual(list(LeaveLedgerEntry.objects.order_by('id').values_list('days', 'balance_after')), before)
+        self.assertEqual(get_balance(self.employee, 'Sick'), Decimal('3'))
+
+
+class LeaveQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create(username='emp', name='Emp', department='Sales')
+        self.hr = Employee.objects.create(username='hr', name='HR', role='HR')
+        accrue(self.employee, 'Sick', 5, 'Opening balance')
+        self.leaves = [self.leave(date(2025, 3, 3 + day), date(2025, 3, 3 + day)) for day in range(3)]
+
+    def leave(self, start, end, **fields):
+        fields = {'employee': self.employee, 'type': 'Sick', 'reason': 'test', **fields}
+        return Leave.objects.create(start_date=start, end_date=end, **fields)
+
+    def bulk(self, action, leaves, headers=None, **data):
+        data = {'action': action, 'leave_ids': [leave.id for leave in leaves], **data}
+        return self.client.post('/hr/leaves/bulk/', data, headers=headers)
+
+    def statuses(self):
+        return list(Leave.objects.order_by('id').values_list('status', flat=True))
+
+    def test_non_hr_users_are_redirected(self):
+        self.client.force_login(self.employee)
+        self.assertRedirects(self.client.get('/hr/leaves/'), '/', fetch_redirect_response=False)
+        self.assertRedirects(self.bulk('approve', self.leaves), '/', fetch_redirect_response=False)
+        self.assertEqual(self.statuses(), ['Pending'] * 3)
+
+    def test_queue_walks_pages_oldest_first(self):
+        start = timezone.now()
+        for offset in range(27):
+            self.leave(date(2025, 5, 1), date(2025, 5, 1), type='Unpaid', applied_at=start + timedelta(minutes=offset))
+        Leave.objects.filter(pk__in=[leave.pk for leave in self.leaves]).update(applied_at=start - timedelta(days=1))
+        self.client.force_login(self.hr)
+
+        first = self.client.get('/hr/leaves/').context['leaves']
+        second = self.client.get('/hr/leaves/', {'after': first.next_cursor}).context['leaves']
+        ids = [leave.id for leave in first] + [leave.id for leave in second]
+        self.assertEqual(ids, list(Leave.objects.order_by('applied_at', 'id').values_list('id', flat=True)))
+        self.assertFalse(second.has_next)
+
+        response = self.client.get('/hr/leaves/', {'type': 'Sick', 'department': 'Sales'})
+        self.assertEqual([leave.id for leave in response.context['leaves']], [leave.id for leave in self.leaves])
+
+    def test_bulk_approve_updates_only_selected_pending_rows(self):
+        first, second, untouched = self.leaves
+        rejected = self.leave(date(2025, 4, 1), date(2025, 4, 1), status='Rejected')
+        self.client.force_login(self.hr)
+        response = self.bulk('approve', [first, second, rejected], next='/hr/leaves/?type=Sick')
+
+        self.assertRedirects(response, '/hr/leaves/?type=Sick', fetch_redirect_response=False)
+        self.assertEqual(self.statuses(), ['Approved', 'Approved', 'Pending', 'Rejected'])
+        self.assertEqual(get_balance(self.employee, 'Sick'), Decimal('3'))
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            ['2 leave request(s) approved.', '1 request(s) were already processed and were skipped.'],
+        )
+
+    def test_bulk_reject_writes_audit_entries(self):
+        self.client.force_login(self.hr)
+        self.bulk('reject', self.leaves[:2], headers={'user-agent': 'tests'})
+
+        self.assertEqual(self.statuses(), ['Rejected', 'Rejected', 'Pending'])
+        logs = SecurityLog.objects.filter(user=self.hr, event_type='SYSTEM_ACCESS')
+        self.assertEqual(sorted(log.event_description for log in logs), sorted(
+            f'Sick leave #{leave.id} for Emp ({leave.start_date} to {leave.end_date}) rejected by HR'
+            for leave in self.leaves[:2]
+        ))
+        self.assertEqual({log.user_agent for log in logs}, {'tests'})
+        self.assertFalse(LeaveLedgerEntry.objects.filter(entry_type='Consumption').exists())
+
+    def test_approval_exceeding_the_balance_is_refused(self):
+        too_long = self.leave(date(2025, 4, 1), date(2025, 4, 10))
+        self.client.force_login(self.hr)
+        response = self.bulk('approve', [too_long])
+
+        too_long.refresh_from_db()
+        self.assertEqual(too_long.status, 'Pending')
+        self.assertIn('1 request(s) exceed the remaining leave balance and were left pending.',
+                      [str(message) for message in get_messages(response.wsgi_request)])
+        self.assertEqual(get_balance(self.employee, 'Sick'), Decimal('5'))
+
+    def test_unsafe_next_url_is_ignored(self):
+        self.client.force_login(self.hr)
+        response = self.bulk('reject', self.leaves[:1], next='https://evil.example/')
+        self.assertRedirects(response, '/hr/leaves/', fetch_redirect_response=False)
+
+
+class LeaveCoverageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create(username='emp', name='Emp', department='Sales')
+        self.hr = Employee.objects.create(username='hr', name='HR', role='HR')
+        leave = Leave.objects.create(
+            employee=self.employee, type='Unpaid', start_date=date(2025, 3, 3), end_date=date(2025, 3, 4), reason='test',
+        )
+        process_leaves([leave.id], 'Approved', self.hr)
+
+    def overlaps(self, start, end):
+        return list(find_overlaps(self.employee, start, end).values_list('start_date', flat=True))
+
+    def test_find_overlaps(self):
+        Leave.objects.create(employee=self.employee, type='Sick', start_date=date(2025, 3, 10),
+                             end_date=date(2025, 3, 12), reason='test', status='Rejected')
+        self.assertEqual(self.overlaps(date(2025, 3, 5), date(2025, 3, 6)), [])  # Adjacent after
+        self.assertEqual(self.overlaps(date(2025, 3, 1), date(2025, 3, 2)), [])  # Adjacent before
+        self.assertEqual(self.overlaps(date(2025, 3, 4), date(2025, 3, 6)), [date(2025, 3, 3)])  # Partial
+        self.assertEqual(self.overlaps(date(2025, 3, 1), date(2025, 3, 9)), [date(2025, 3, 3)])  # Covers it
+        self.assertEqual(self.overlaps(date(2025, 3, 3), date(2025, 3, 3)), [date(2025, 3, 3)])  # Inside it
+        self.assertEqual(self.overlaps(date(2025, 3, 11), date(2025, 3, 11)), [])  # Rejected leaves do not count
+        leave_id = Leave.objects.get(status='Approved').id
+        self.assertFalse(find_overlaps(self.employee, date(2025, 3, 3), date(2025, 3, 4), exclude_id=leave_id).exists())
+
+    def test_leave_request_rejects_overlaps(self):
+        self.client.force_login(self.employee)
+
+        def request(start, end):
+            return self.client.post('/hr/leaves/request/', {
+                'type': 'Unpaid', 'duration': 'Full', 'start_date': start, 'end_date': end, 'reason': 'test',
+            }, follow=True)
+
+        self.assertContains(request('2025-03-04', '2025-03-06'), 'overlaps your approved Unpaid leave')
+        self.assertContains(request('2025-03-01', '2025-03-31'), 'overlaps your approved Unpaid leave')
+        self.assertEqual(Leave.objects.count(), 1)
+        self.assertContains(request('2025-03-05', '2025-03-06'), 'submitted successfully')
+        self.assertContains(request('2025-03-06', '2025-03-06'), 'overlaps your pending Unpaid leave')
+        self.assertEqual(Leave.objects.count(), 2)
+
+    def test_coverage_calendar(self):
+        Employee.objects.create(username='other', name='Other', department='Finance')
+        self.client.force_login(self.hr)
+        response = self.client.get('/hr/leaves/coverage/', {'department': 'Sales', 'month': '2025-03'})
+
+        days = {day['date']: day for week in response.context['weeks'] for day in week}
+        self.assertEqual(days[date(2025, 3, 3)]['absences'],
+                         [{'name': 'Emp', 'employee_id': self.employee.employee_id, 'leave_type': 'Unpaid'}])
+        self.assertEqual([day for day, entry in days.items() if entry['absences']], [date(2025, 3, 3), date(2025, 3, 4)])
+        self.assertFalse(days[date(2025, 2, 23)]['in_month'])
+        self.assertEqual((response.context['previous_month'], response.context['next_month']), ('2025-02', '2025-04'))
+        self.assertContains(response, 'Emp (Unpaid)', count=2)
+
+        response = self.client.get('/hr/leaves/coverage/', {'department': 'Finance', 'month': '2025-03'})
+        self.assertFalse(any(day['absences'] for week in response.context['weeks'] for day in week))
+
+        self.client.force_login(self.employee)
+        self.assertRedirects(self.client.get('/hr/leaves/coverage/'), '/', fetch_redirect_response=False)
+
+    def test_department_change_moves_occupancy_rows(self):
+        self.employee.department = 'Finance'
+        self.employee.save()
+        self.assertEqual(set(LeaveDay.objects.values_list('department', flat=True)), {'Finance'})
+
+    def test_unrelated_update_skips_occupancy_rows(self):
+        self.employee.department = 'Finance'  # Not saved: only last_login is written
+        with self.assertNumQueries(1):
+            self.employee.save(update_fields=['last_login'])
+        self.assertEqual(set(LeaveDay.objects.values_list('department', flat=True)), {'Sales'})
+
+        self.employee.save(update_fields=['department'])
+        self.assertEqual(set(LeaveDay.objects.values_list('department', flat=True)), {'Finance'})
+
+    def test_parse_month(self):
+        today = date(2025, 6, 15)
+        self.assertEqual(parse_month('2025-02', today), (2025, 2))
+        for value in (None, '', '2025', '2025-13', 'abc-01', '9999-12', '0001-01', '10000-01'):
+            with self.subTest(value=value):
+                self.assertEqual(parse_month(value, today), (2025, 6))
 
-# Create your tests here.
+    def test_coverage_view_rejects_out_of_range_month(self):
+        self.client.force_login(self.hr)
+        response = self.client.get('/hr/leaves/coverage/', {'department': 'Sales', 'month': '9999-12'})
+        self.assertEqual(response.status_code, 200)
+        today = date.today()
+        self.assertEqual(response.context['month_start'], date(today.year, today.month, 1))
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('leaves/', views.leave_queue, name='leave_queue'),
+    path('leaves/bulk/', views.leave_bulk_action, name='leave_bulk_action'),
+    path('leaves/request/', views.leave_request, name='leave_request'),
+    path('leaves/coverage/', views.leave_coverage, name='leave_coverage'),
+]
@@ -1,3 +1,171 @@
-from django.shortcuts import render
+from datetime import date
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.utils.http import url_has_allowed_host_and_scheme
+from authentication.models import Employee, Leave
+from payroll_system.pagination import KeysetPaginator
+from .coverage import department_month, find_overlaps, parse_month
+from .ledger import ACCRUING_LEAVE_TYPES, get_balances, process_leaves
 
-# Create your views here.
+
+@login_required
+def leave_request(request):
+    """Submit a leave request, rejecting ranges that overlap existing leaves"""
+    if request.method == 'POST':
+        leave_type = request.POST.get('type')
+        duration = request.POST.get('duration', 'Full')
+        reason = request.POST.get('reason', '').strip()
+        try:
+            start_date = date.fromisoformat(request.POST.get('start_date', ''))
+            end_date = date.fromisoformat(request.POST.get('end_date', ''))
+        except ValueError:
+            start_date = end_date = None
+        
+        if leave_type not in dict(Leave.LEAVE_TYPE_CHOICES) or duration not in dict(Leave.DURATION_CHOICES):
+            messages.error(request, 'Please choose a valid leave type and duration.')
+        elif start_date is None or end_date is None or end_date < start_date:
+            messages.error(request, 'Please enter a valid date range.')
+        elif not reason:
+            messages.error(request, 'A reason is required.')
+        else:
+            overlap = find_overlaps(request.user, start_date, end_date).first()
+            if overlap:
+                messages.error(
+                    request,
+                    f'This request overlaps your {overlap.status.lower()} {overlap.type} leave '
+                    f'from {overlap.start_date} to {overlap.end_date}.'
+                )
+            else:
+                Leave.objects.create(
+                    employee=request.user,
+                    type=leave_type,
+                    duration=duration,
+                    start_date=start_date,
+                    end_date=end_date,
+                    reason=reason,
+                )
+                messages.success(request, 'Leave request submitted successfully.')
+                return redirect('leave_request')
+    
+    balances = get_balances(request.user)
+    
+    context = {
+        'type_choices': Leave.LEAVE_TYPE_CHOICES,
+        'duration_choices': Leave.DURATION_CHOICES,
+        'leave_balances': [
+            {'type': label, 'balance': balances[leave_type]}
+            for leave_type, label in Leave.LEAVE_TYPE_CHOICES if leave_type in ACCRUING_LEAVE_TYPES
+        ],
+        'recent_leaves': request.user.leaves.order_by('-start_date')[:10],
+    }
+    return render(request, 'employee/leave_request.html', context)
+
+
+@login_required
+def leave_queue(request):
+    """HR queue of leave requests with filters and keyset pagination"""
+    if not request.user.is_hr:
+        messages.error(request, 'Access denied. Insufficient permissions.')
+        return redirect('home')
+    
+    status = request.GET.get('status', 'Pending')
+    leave_type = request.GET.get('type', '')
+    department = request.GET.get('department', '')
+    
+    leaves = Leave.objects.select_related('employee').only(
+        'id', 'type', 'duration', 'start_date', 'end_date', 'reason', 'status', 'applied_at',
+        'employee__id', 'employee__employee_id', 'employee__name', 'employee__department',
+    )
+    if status:
+        leaves = leaves.filter(status=status)
+    if leave_type:
+        leaves = leaves.filter(type=leave_type)
+    if department:
+        leaves = leaves.filter(employee__department=department)
+    
+    # Oldest requests first so the queue is worked in arrival order
+    paginator = KeysetPaginator(leaves, ('applied_at', 'id'), per_page=25)
+    page = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
+    
+    departments = Employee.objects.exclude(department__isnull=True).exclude(department='').values_list(
+        'department', flat=True
+    ).distinct().order_by('department')
+    
+    context = {
+        'leaves': page,
+        'status': status,
+        'leave_type': leave_type,
+        'department': department,
+        'status_choices': Leave.STATUS_CHOICES,
+        'type_choices': Leave.LEAVE_TYPE_CHOICES,
+        'departments': departments,
+    }
+    return render(request, 'hr/leave_queue.html', context)
+
+
+@login_required
+def leave_bulk_action(request):
+    """Approve or reject the selected leave requests in one transaction"""
+    if not request.user.is_hr:
+        messages.error(request, 'Access denied. Insufficient permissions.')
+        return redirect('home')
+    
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        leave_ids = [int(value) for value in request.POST.getlist('leave_ids') if value.isdigit()]
+        statuses = {'approve': 'Approved', 'reject': 'Rejected'}
+        
+        if action not in statuses:
+            messages.error(request, 'Invalid action.')
+        elif not leave_ids:
+            messages.error(request, 'Select at least one leave request.')
+        else:
+            processed, short = process_leaves(
+                leave_ids,
+                statuses[action],
+                request.user,
+                ip_address=request.META.get('REMOTE_ADDR'),
+                user_agent=request.META.get('HTTP_USER_AGENT'),
+            )
+            skipped = len(leave_ids) - processed - len(short)
+            messages.success(request, f'{processed} leave request(s) {statuses[action].lower()}.')
+            if short:
+                messages.warning(
+                    request,
+                    f'{len(short)} request(s) exceed the remaining leave balance and were left pending.'
+                )
+            if skipped:
+                messages.warning(request, f'{skipped} request(s) were already processed and were skipped.')
+    
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('leave_queue')
+
+
+@login_required
+def leave_coverage(request):
+    """Month calendar of who is out in a department"""
+    if not request.user.is_hr:
+        messages.error(request, 'Access denied. Insufficient permissions.')
+        return redirect('home')
+    
+    departments = list(Employee.objects.exclude(department__isnull=True).exclude(department='').values_list(
+        'department', flat=True
+    ).distinct().order_by('department'))
+    department = request.GET.get('department') or (departments[0] if departments else '')
+    year, month = parse_month(request.GET.get('month'))
+    
+    previous_month = (year - 1, 12) if month == 1 else (year, month - 1)
+    next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    
+    context = {
+        'departments': departments,
+        'department': department,
+        'month_start': date(year, month, 1),
+        'weeks': department_month(department, year, month) if department else [],
+        'previous_month': '%04d-%02d' % previous_month,
+        'next_month': '%04d-%02d' % next_month,
+    }
+    return render(request, 'hr/leave_coverage.html', context)
@@ -0,0 +1,111 @@
+"""
+DATABASES configuration from the environment.
+
+SQLite (the default) is tuned for many short concurrent writers: kiosk
+punches, chat messages and session saves.
+
+- WAL journal, with SQLITE_WAL set (recommended for deployments): readers
+  no longer block on a writer, nor a writer on readers. WAL is a property
+  of the database file that persists once set, so it is opt-in: otherwise
+  any connecting command, even `makemigrations --check`, would convert the
+  development db.sqlite3 checked into the repository.
+- synchronous=NORMAL with WAL: fsync only at checkpoints. This is safe with
+  WAL; a power cut can lose the last commits but cannot corrupt the file.
+  Without WAL it stays FULL.
+- Busy timeout: a writer waits for the lock instead of failing at once with
+  "database is locked".
+- Memory-mapped reads.
+- Transactions BEGIN IMMEDIATE: a transaction that reads and then writes
+  takes the write lock up front. Otherwise it can fail when upgrading its
+  lock, which the busy timeout does not cover.
+
+Connections are kept open between requests for DB_CONN_MAX_AGE seconds and
+health-checked before reuse, so the PRAGMAs run once per connection rather
+than once per request.
+
+Setting DB_ENGINE to postgresql or mysql switches to a server database,
+configured by DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and DB_PORT, with the
+same persistent connections. With DB_POOL on PostgreSQL, a psycopg
+connection pool of up to DB_POOL_MAX_SIZE connections is used instead.
+"""
+import os
+
+SERVER_ENGINES = {
+    'postgresql': 'django.db.backends.postgresql',
+    'mysql': 'django.db.backends.mysql',
+}
+
+
+def _env(name, default):
+    return os.environ.get(name, default)
+
+
+def _env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_pragmas(wal=None):
+    """PRAGMAs run on every new SQLite connection; `wal` defaults to the SQLITE_WAL flag"""
+    if wal is None:
+        wal = _env_flag('SQLITE_WAL')
+    pragmas = {'journal_mode': 'WAL'} if wal else {}  # Without it the file keeps its journal mode
+    pragmas.update({
+        'synchronous': _env('SQLITE_SYNCHRONOUS', 'NORMAL' if wal else 'FULL'),
+        'mmap_size': int(_env('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': int(_env('SQLITE_CACHE_SIZE', -20000)),  # Negative: KiB, i.e. 20 MB
+        'temp_store': 'MEMORY',
+    })
+    return pragmas
+
+
+def sqlite_config(name, test_name=None, wal=None):
+    pragmas = sqlite_pragmas(wal)
+    config = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': int(_env('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {pragma}={value}' for pragma, value in pragmas.items()),
+            'timeout': float(_env('SQLITE_BUSY_TIMEOUT', 20)),  # seconds
+            'transaction_mode': _env('SQLITE_TRANSACTION_MODE', 'IMMEDIATE') or None,
+        },
+    }
+    if test_name:
+        config['TEST'] = {'NAME': test_name}
+    return config
+
+
+def server_config(engine):
+    config = {
+        'ENGINE': SERVER_ENGINES.get(engine, engine),
+        'NAME': _env('DB_NAME', 'payroll_system'),
+        'USER': _env('DB_USER', ''),
+        'PASSWORD': _env('DB_PASSWORD', ''),
+        'HOST': _env('DB_HOST', 'localhost'),
+        'PORT': _env('DB_PORT', ''),
+        'CONN_MAX_AGE': int(_env('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if _env_flag('DB_POOL') and config['ENGINE'] == SERVER_ENGINES['postgresql']:
+        # The pool keeps connections open itself; persistent connections must be off
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': int(_env('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(_env('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(_env('DB_POOL_TIMEOUT', 10)),
+        }
+    return config
+
+
+def database_config(base_dir):
+    """The 'default' database settings for the configured engine"""
+    engine = _env('DB_ENGINE', 'sqlite')
+    if engine in ('sqlite', 'sqlite3', 'django.db.backends.sqlite3'):
+        # File-backed test database so concurrency tests can open real parallel connections
+        return sqlite_config(_env('SQLITE_PATH', base_dir / 'db.sqlite3'), test_name=base_dir / 'test_db.sqlite3')
+    return server_config(engine)
@@ -0,0 +1,135 @@
+"""
+Thin wrapper around SQLite FTS5 virtual tables used as search indexes.
+
+Each index is a standalone FTS5 table whose rowid is the primary key of the
+model it indexes; callers keep it in sync (normally from signals). On other
+database backends `available()` is False and callers fall back to plain
+ORM filtering.
+"""
+import re
+
+from django.db import connection
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def match_expression(query):
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and all terms must match, so
+    user input can never inject FTS query syntax.
+    """
+    words = WORD_RE.findall(query or '')
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class FTSIndex:
+    """An FTS5 table whose rowid mirrors a model primary key"""
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = list(columns)
+
+    def available(self):
+        return connection.vendor == 'sqlite'
+
+    def create_sql(self):
+        columns = ', '.join(self.columns)
+        return (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"{columns}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+
+    def drop_sql(self):
+        return f'DROP TABLE IF EXISTS {self.table}'
+
+    def upsert(self, rowid, values):
+        """Replace the indexed text for one row"""
+        if not self.available():
+            return
+        placeholders = ', '.join(['%s'] * (len(self.columns) + 1))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [rowid])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) VALUES ({placeholders})",
+                [rowid] + [values.get(column) or '' for column in self.columns],
+            )
+
+    def delete(self, rowid):
+        if not self.available():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [rowid])
+
+    def insert_many(self, rows):
+        """Index rows that are not in the index yet, from an iterable of (rowid, {column: text})"""
+        if not self.available():
+            return
+        placeholders = ', '.join(['%s'] * (len(self.columns) + 1))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) VALUES ({placeholders})",
+                [[rowid] + [values.get(column) or '' for column in self.columns] for rowid, values in rows],
+            )
+
+    def rebuild(self, rows, batch_size=1000):
+        """Replace the whole index from an iterable of (rowid, {column: text})"""
+        if not self.available():
+            return 0
+        placeholders = ', '.join(['%s'] * (len(self.columns) + 1))
+        sql = f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) VALUES ({placeholders})"
+        count = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            batch = []
+            for rowid, values in rows:
+                batch.append([rowid] + [values.get(column) or '' for column in self.columns])
+                if len(batch) >= batch_size:
+                    cursor.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def match_subquery(self, query):
+        """(sql, params) selecting matching rowids, for use with RawSQL in id__in filters"""
+        return f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [match_expression(query)]
+
+    def _within(self, within):
+        """SQL restricting rowids to a queryset's primary keys, so filters apply before ranking"""
+        if within is None:
+            return '', []
+        sql, params = within.order_by().values('pk').query.sql_with_params()
+        # The unary + keeps the constraint away from FTS5, which would otherwise
+        # run the whole MATCH once per rowid in the list
+        return f' AND +rowid IN ({sql})', list(params)
+
+    def ranked_ids(self, query, limit=20, offset=0, within=None):
+        """Matching rowids, best BM25 rank first, optionally limited to the pks of a queryset"""
+        expression = match_expression(query)
+        if not self.available() or not expression:
+            return []
+        within_sql, within_params = self._within(within)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s{within_sql} '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                [expression] + within_params + [limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def count(self, query, within=None):
+        """Number of matching rows, optionally limited to the pks of a queryset"""
+        expression = match_expression(query)
+        if not self.available() or not expression:
+            return 0
+        within_sql, within_params = self._within(within)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {self.table} WHERE {self.table} MATCH %s{within_sql}',
+                [expression] + within_params,
+            )
+            return cursor.fetchone()[0]
@@ -0,0 +1,230 @@
+"""
+Per-request performance instrumentation.
+
+PerformanceMiddleware times a sample of requests (PERF_SAMPLE_RATE) and
+wraps the database connections while they run to count queries, add up
+their time and spot repeats: the same statement with the same parameters
+(a duplicate), or the same statement run PERF_REPEAT_THRESHOLD or more times
+with different parameters (the N+1 pattern). Results are aggregated in
+memory per view into latency histograms; nothing is written per request.
+Unsampled requests only pay for one random() call.
+
+The numbers are per process; the admin stats page (security app) shows the
+process that serves it. Sampled responses to administrators carry a
+Server-Timing header, so the figures also show up in the browser dev tools;
+PERF_SERVER_TIMING sends it to every client, which should only be done
+outside production since it tells anyone how many queries a page runs.
+"""
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open-ended
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+DEFAULT_SAMPLE_RATE = 0.01
+TOP_REPEATS = 20
+
+WHITESPACE_RE = re.compile(r'\s+')
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def normalize_sql(sql):
+    """Statement text with whitespace and IN-list lengths folded, for grouping"""
+    return IN_LIST_RE.sub('IN (...)', WHITESPACE_RE.sub(' ', sql).strip())
+
+
+class QueryRecorder:
+    """Execute wrapper counting one request's queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.executions = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+            try:
+                self.executions[(sql, repr(params))] += 1
+            except Exception:  # Unprintable parameters: count the statement only
+                pass
+
+    def duplicates(self):
+        """Number of executions that repeated an earlier identical query"""
+        return sum(count - 1 for count in self.executions.values() if count > 1)
+
+    def repeated(self, threshold):
+        """{statement: executions} for statements run at least `threshold` times"""
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+
+def _bucket_label(index):
+    if BUCKETS[index] == float('inf'):
+        return f'> {BUCKETS[index - 1]} ms'
+    return f'<= {BUCKETS[index]} ms'
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * len(BUCKETS)
+        self.queries = 0
+        self.max_queries = 0
+        self.query_time = 0.0
+        self.with_duplicates = 0
+        self.with_repeats = 0
+
+    def add(self, elapsed, recorder, repeats):
+        self.requests += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        milliseconds = elapsed * 1000
+        for index, bound in enumerate(BUCKETS):
+            if milliseconds <= bound:
+                self.histogram[index] += 1
+                break
+        self.queries += recorder.count
+        self.max_queries = max(self.max_queries, recorder.count)
+        self.query_time += recorder.duration
+        self.with_duplicates += recorder.duplicates() > 0
+        self.with_repeats += bool(repeats)
+
+    def percentile(self, fraction):
+        """Upper bound (ms) of the bucket holding the given fraction of requests"""
+        target = self.requests * fraction
+        seen = 0
+        for bound, count in zip(BUCKETS, self.histogram):
+            seen += count
+            if count and seen >= target:
+                return bound if bound != float('inf') else round(self.max_time * 1000)
+        return None
+
+    def summary(self, view):
+        requests = self.requests or 1
+        peak = max(self.histogram) or 1
+        return {
+            'view': view,
+            'requests': self.requests,
+            'avg_ms': round(self.total_time * 1000 / requests, 1),
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_time * 1000, 1),
+            'avg_queries': round(self.queries / requests, 1),
+            'max_queries': self.max_queries,
+            'avg_query_ms': round(self.query_time * 1000 / requests, 1),
+            'duplicate_percent': round(self.with_duplicates * 100 / requests),
+            'repeat_percent': round(self.with_repeats * 100 / requests),
+            'histogram': [
+                {'label': _bucket_label(index), 'count': count, 'percent': count * 100 // peak}
+                for index, count in enumerate(self.histogram)
+            ],
+            'total_ms': round(self.total_time * 1000),
+        }
+
+
+class PerformanceStats:
+    """Thread-safe in-memory aggregate of sampled requests, per view"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.views = {}
+            self.repeats = {}  # normalized statement -> {'executions', 'requests', 'views'}
+            self.since = time.time()
+
+    def record(self, view, elapsed, recorder, repeats):
+        with self._lock:
+            self.views.setdefault(view, ViewStats()).add(elapsed, recorder, repeats)
+            for sql, count in repeats.items():
+                entry = self.repeats.get(sql)
+                if entry is None:
+                    if len(self.repeats) >= TOP_REPEATS * 5:
+                        continue  # Bounded memory: keep the statements already tracked
+                    entry = self.repeats[sql] = {'executions': 0, 'requests': 0, 'max_per_request': 0, 'views': set()}
+                entry['executions'] += count
+                entry['requests'] += 1
+                entry['max_per_request'] = max(entry['max_per_request'], count)
+                entry['views'].add(view)
+
+    def snapshot(self):
+        """Per-view summaries (slowest total first) and the most repeated statements"""
+        with self._lock:
+            views = [stats.summary(view) for view, stats in self.views.items()]
+            repeats = [
+                {'sql': sql, **{key: value for key, value in entry.items() if key != 'views'},
+                 'views': sorted(entry['views'])}
+                for sql, entry in self.repeats.items()
+            ]
+            since = self.since
+        views.sort(key=lambda row: -row['total_ms'])
+        repeats.sort(key=lambda row: -row['executions'])
+        return {'views': views, 'repeats': repeats[:TOP_REPEATS], 'since': since}
+
+
+stats = PerformanceStats()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '(unresolved)'
+    return match.view_name or match._func_path
+
+
+def _sends_server_timing(request):
+    if _setting('PERF_SERVER_TIMING', False):
+        return True
+    user = getattr(request, 'user', None)  # Unset when a middleware answered before authentication
+    return bool(user is not None and user.is_authenticated and user.is_admin)
+
+
+class PerformanceMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= _setting('PERF_SAMPLE_RATE', DEFAULT_SAMPLE_RATE):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        repeats = Counter()
+        for sql, count in recorder.repeated(_setting('PERF_REPEAT_THRESHOLD', 5)).items():
+            repeats[normalize_sql(sql)] += count
+        stats.record(_view_name(request), elapsed, recorder, repeats)
+
+        if _sends_server_timing(request):
+            response['Server-Timing'] = (
+                f'app;dur={elapsed * 1000:.1f}, '
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries, '
+                f'{recorder.duplicates()} duplicate"'
+            )
+        return response
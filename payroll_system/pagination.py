@@ -0,0 +1,171 @@
+"""
+Keyset (seek) pagination.
+
+Pages are addressed by an opaque cursor holding the sort key of the row at the
+page boundary, so fetching page N costs the same as fetching page 1: an
+indexed range scan with LIMIT, no OFFSET and no COUNT(*). The last ordering
+field must be unique (normally 'id') and none of the fields may be NULL.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Max, Min, Q
+
+
+def encode_cursor(values):
+    """Encode sort key values as a URL-safe token"""
+    def convert(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    payload = json.dumps([convert(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token, returning None when it is missing or malformed"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def estimate_count(model):
+    """
+    Cheap row count estimate for large, append-mostly tables.
+
+    Uses the planner statistics on PostgreSQL and the primary key span
+    elsewhere; both avoid a full table scan.
+    """
+    connection = connections['default']
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return 0
+    return bounds['high'] - bounds['low'] + 1
+
+
+class KeysetPage:
+    """One page of results plus the cursors needed to move around it"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking past the sort key of the boundary row"""
+
+    def __init__(self, queryset, ordering, per_page=20):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.descending = [field.startswith('-') for field in self.ordering]
+
+    def _model_field(self, name):
+        """Model field behind an ordering name, following relations for 'a__b'"""
+        model = self.queryset.model
+        for part in name.split('__')[:-1]:
+            model = model._meta.get_field(part).related_model
+        return model._meta.get_field(name.split('__')[-1])
+
+    def _parse(self, values):
+        """Cursor values converted to the sort fields' Python types, or None if any does not fit"""
+        if values is None or len(values) != len(self.fields):
+            return None
+        parsed = []
+        for field, value in zip(self.fields, values):
+            model_field = self._model_field(field)
+            try:
+                value = model_field.to_python(value)
+                if value is None:
+                    return None
+                model_field.run_validators(value)
+            except (ValidationError, TypeError, ValueError):
+                return None
+            parsed.append(value)
+        return parsed
+
+    def _key(self, obj):
+        if isinstance(obj, dict):
+            return [obj[field] for field in self.fields]
+        return [getattr(obj, field) for field in self.fields]
+
+    def _seek(self, values, forward):
+        """Q matching rows strictly after (or before) the given sort key"""
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            after = self.descending[i] != forward
+            lookup = f"{field}__{'gt' if after else 'lt'}"
+            term = Q(**{lookup: values[i]})
+            for j in range(i):
+                term &= Q(**{self.fields[j]: values[j]})
+            condition |= term
+        return condition
+
+    def get_page(self, after=None, before=None):
+        """Fetch the page after the `after` cursor, or before the `before` cursor"""
+        after_values = self._parse(decode_cursor(after))
+        before_values = self._parse(decode_cursor(before))
+        if (after and after_values is None) or (before and before_values is None):
+            after_values = before_values = None
+
+        if before_values is not None:
+            reverse = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+            rows = list(self.queryset.filter(self._seek(before_values, forward=False))
+                        .order_by(*reverse)[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            next_cursor = encode_cursor(self._key(rows[-1])) if rows else None
+            previous_cursor = encode_cursor(self._key(rows[0])) if rows and has_more else None
+            return KeysetPage(rows, next_cursor, previous_cursor)
+
+        queryset = self.queryset
+        if after_values is not None:
+            queryset = queryset.filter(self._seek(after_values, forward=True))
+        rows = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        next_cursor = encode_cursor(self._key(rows[-1])) if rows and has_more else None
+        previous_cursor = encode_cursor(self._key(rows[0])) if rows and after_values is not None else None
+        return KeysetPage(rows, next_cursor, previous_cursor)
@@ -0,0 +1,70 @@
+"""
+Session backend that refreshes expiry without writing the database on every request.
+
+With SESSION_SAVE_EVERY_REQUEST the middleware saves the session on every
+response just to push the expiry forward. This store (cached_db underneath)
+records that activity in the cache only, and writes the django_session row
+when the session data actually changed or when the last row write is older
+than SESSION_WRITE_INTERVAL seconds.
+
+The idle timeout is still SESSION_COOKIE_AGE after the last request: the
+time of the last request is kept in the session data and checked on load.
+Rows are written with an expire_date SESSION_WRITE_INTERVAL past the usual
+one, so a row never expires before its session does; if the cached copy is
+lost, the row's last-activity time is at most one interval old.
+
+Expired rows are removed by `manage.py clearsessions`, in batches.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+ACTIVITY_KEY = '_last_activity'
+WRITTEN_KEY = '_last_written'
+CLEAR_BATCH_SIZE = 1000
+
+
+def write_interval():
+    return getattr(settings, 'SESSION_WRITE_INTERVAL', 300)
+
+
+class SessionStore(CachedDBStore):
+    def load(self):
+        data = super().load()
+        last_activity = data.get(ACTIVITY_KEY)
+        if last_activity is not None and time.time() - last_activity > self.get_session_cookie_age():
+            # Idle longer than the session age, even if the row has not expired yet
+            self._session_key = None
+            return {}
+        return data
+
+    def create_model_instance(self, data):
+        instance = super().create_model_instance(data)
+        instance.expire_date += timedelta(seconds=write_interval())
+        return instance
+
+    def save(self, must_create=False):
+        now = time.time()
+        data = self._get_session(no_load=must_create)
+        data[ACTIVITY_KEY] = now
+        if must_create or self.session_key is None or self.modified or now - data.get(WRITTEN_KEY, 0) >= write_interval():
+            data[WRITTEN_KEY] = now
+            super().save(must_create=must_create)
+        else:
+            # Only the activity time changed: refresh the cached copy, skip the row
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+
+    @classmethod
+    def clear_expired(cls):
+        """Delete expired rows a batch at a time instead of in one long write transaction"""
+        model = cls.get_model_class()
+        while True:
+            expired = list(
+                model.objects.filter(expire_date__lt=timezone.now()).values_list('pk', flat=True)[:CLEAR_BATCH_SIZE]
+            )
+            if not expired:
+                break
+            model.objects.filter(pk__in=expired).delete()
@@ -13,6 +13,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
+from django.conf import global_settings
+
+from .database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -58,9 +62,11 @@ INSTALLED_APPS = [
     'kiosk',
     'security',
     'settings_app',
+    'task_queue',
 ]
 
 MIDDLEWARE = [
+    'payroll_system.instrumentation.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +76,14 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request timing and query statistics (payroll_system.instrumentation), shown on
+# the admin performance page; only a sample of requests is measured. Sampled
+# responses carry a Server-Timing header for administrators, and for everyone
+# with PERF_SERVER_TIMING (it reveals query counts, so keep it off in production)
+PERF_SAMPLE_RATE = float(os.environ.get('PERF_SAMPLE_RATE', 0.01))
+PERF_REPEAT_THRESHOLD = int(os.environ.get('PERF_REPEAT_THRESHOLD', 5))  # Same statement this often in one request: N+1
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+
 ROOT_URLCONF = 'payroll_system.urls'
 
 TEMPLATES = [
@@ -96,14 +110,44 @@ WSGI_APPLICATION = 'payroll_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite with a busy timeout by default (set SQLITE_WAL=1 in deployments);
+# DB_ENGINE=postgresql (or mysql) selects a server database. See
+# payroll_system/database.py for the variables.
 DATABASES = {
+    'default': database_config(BASE_DIR),
+}
+
+
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+# (e.g. django.core.cache.backends.redis.RedisCache) when running several processes
+# so versioned cache invalidation is seen by all of them.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'payroll-system'),
     }
 }
 
 
+# Audit log
+# SecurityLog events are buffered and bulk-inserted from a background thread
+# (security.audit); the spool directory holds events not yet in the database.
+# The test settings (payroll_system.test_settings) write synchronously so tests
+# can assert on the log.
+
+AUDIT_LOG_SYNC = os.environ.get('AUDIT_LOG_SYNC', '').lower() in ('1', 'true', 'yes')
+AUDIT_LOG_BATCH_SIZE = int(os.environ.get('AUDIT_LOG_BATCH_SIZE', 100))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.environ.get('AUDIT_LOG_FLUSH_INTERVAL', 2.0))
+AUDIT_LOG_SPOOL_DIR = Path(os.environ.get('AUDIT_LOG_SPOOL_DIR', BASE_DIR / 'var' / 'audit_spool'))
+
+# Security logs older than this many whole months are moved to compressed
+# monthly segments by `manage.py archive_security_logs`
+SECURITY_LOG_RETENTION_MONTHS = int(os.environ.get('SECURITY_LOG_RETENTION_MONTHS', 6))
+SECURITY_LOG_ARCHIVE_DIR = Path(os.environ.get('SECURITY_LOG_ARCHIVE_DIR', BASE_DIR / 'var' / 'security_archive'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -156,6 +200,13 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.Employee'
 
+# PBKDF2 is deliberately slow. Throwaway load-test databases with
+# FAST_PASSWORD_HASHER set hash new passwords with MD5 instead (the test
+# settings do too); the default hashers stay listed so existing passwords
+# still verify. Passwords saved that way only verify while it stays set.
+if os.environ.get('FAST_PASSWORD_HASHER', '').lower() in ('1', 'true', 'yes'):
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher', *global_settings.PASSWORD_HASHERS]
+
 # Crispy Forms
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
@@ -165,9 +216,47 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_COOKIE_AGE = 28800  # 8 hours
 SESSION_SAVE_EVERY_REQUEST = True
 
+# With a shared cache (see CACHES) sessions live in the cache, with the database
+# row written at most once per SESSION_WRITE_INTERVAL seconds unless the session
+# data changes (payroll_system.sessions). A process-local cache would keep
+# serving sessions that another process has logged out or changed, so without
+# one every request writes straight to the database. Expired rows are removed
+# by `manage.py clearsessions`.
+SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'payroll_system.sessions' if SHARED_CACHE else 'django.contrib.sessions.backends.db'
+)
+SESSION_WRITE_INTERVAL = int(os.environ.get('SESSION_WRITE_INTERVAL', 300))
+
+# Background tasks are rows in the task_queue table, run by `manage.py run_tasks`;
+# with TASKS_SYNC they run inline when queued
+TASKS_SYNC = os.environ.get('TASKS_SYNC', '').lower() in ('1', 'true', 'yes')
+TASK_WORKER_CONCURRENCY = int(os.environ.get('TASK_WORKER_CONCURRENCY', 2))
+TASK_POLL_INTERVAL = float(os.environ.get('TASK_POLL_INTERVAL', 1.0))  # seconds
+TASK_LOCK_TIMEOUT = int(os.environ.get('TASK_LOCK_TIMEOUT', 600))  # seconds before a running task is presumed lost
+TASK_RETENTION_DAYS = int(os.environ.get('TASK_RETENTION_DAYS', 7))
+
+# Failed login attempts allowed per sliding window before further attempts are
+# rejected without checking the password (security.throttle)
+LOGIN_THROTTLE_WINDOW = int(os.environ.get('LOGIN_THROTTLE_WINDOW', 300))  # seconds
+LOGIN_THROTTLE_IP_LIMIT = int(os.environ.get('LOGIN_THROTTLE_IP_LIMIT', 20))
+LOGIN_THROTTLE_USERNAME_LIMIT = int(os.environ.get('LOGIN_THROTTLE_USERNAME_LIMIT', 5))
+
+# Public application status lookups allowed per client IP and window (applications.status)
+STATUS_LOOKUP_WINDOW = int(os.environ.get('STATUS_LOOKUP_WINDOW', 60))  # seconds
+STATUS_LOOKUP_LIMIT = int(os.environ.get('STATUS_LOOKUP_LIMIT', 10))
+
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
+# Resumes stream to disk and are rejected once they pass this size (applications.uploads)
+RESUME_MAX_SIZE = int(os.environ.get('RESUME_MAX_SIZE', 5242880))  # 5MB
+# Rows an HR upload may import within the request; each password hash takes a
+# fraction of a second, so larger files go through `manage.py import_employees`
+EMPLOYEE_IMPORT_MAX_ROWS = int(os.environ.get('EMPLOYEE_IMPORT_MAX_ROWS', 50))
 
 # Security Headers
 SECURE_BROWSER_XSS_FILTER = True
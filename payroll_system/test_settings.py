@@ -0,0 +1,14 @@
+"""
+Settings for the test suite.
+
+`manage.py test` uses this module unless DJANGO_SETTINGS_MODULE is set; point
+other runners (e.g. pytest-django) at it explicitly.
+"""
+from .settings import *  # noqa: F401,F403
+
+# Write audit events and run queued tasks inline so tests can assert on them
+AUDIT_LOG_SYNC = True
+TASKS_SYNC = True
+
+# PBKDF2 is deliberately slow and tests create many users
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
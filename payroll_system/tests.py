@@ -0,0 +1,225 @@
+import os
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from authentication.models import Employee, SecurityLog
+from .database import database_config
+from .instrumentation import normalize_sql, stats
+from .pagination import KeysetPaginator, decode_cursor, encode_cursor
+from .sessions import SessionStore, write_interval
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = Employee.objects.create(username='admin', name='Admin', role='Admin')
+        start = timezone.now()
+        SecurityLog.objects.bulk_create([
+            SecurityLog(event_type='LOGIN_SUCCESS', user=user, event_description=f'event {i}',
+                        timestamp=start - timedelta(minutes=i // 2))
+            for i in range(25)
+        ])
+        self.paginator = KeysetPaginator(SecurityLog.objects.all(), ('-timestamp', '-id'), per_page=10)
+        self.ordered = list(SecurityLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+
+    def ids(self, page):
+        return [log.id for log in page]
+
+    def test_pages_forward_and_back(self):
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(after=first.next_cursor)
+        third = self.paginator.get_page(after=second.next_cursor)
+
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(third), self.ordered)
+        self.assertFalse(first.has_previous)
+        self.assertFalse(third.has_next)
+        self.assertEqual(self.ids(self.paginator.get_page(before=second.previous_cursor)), self.ordered[:10])
+
+    def test_cursor_round_trip(self):
+        log = SecurityLog.objects.get(pk=self.ordered[0])
+        self.assertEqual(decode_cursor(encode_cursor([log.timestamp, log.id])), [log.timestamp.isoformat(), log.id])
+        self.assertIsNone(decode_cursor('not base64!'))
+        self.assertIsNone(decode_cursor(''))
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        valid = self.paginator.get_page().next_cursor
+        for values in (['abc', 1], ['2025-01-01T00:00:00+00:00', 'abc'], [None, 1], [[1], {}],
+                       ['2025-01-01T00:00:00+00:00', 10 ** 30], [1]):
+            with self.subTest(values=values):
+                cursor = encode_cursor(values)
+                self.assertEqual(self.ids(self.paginator.get_page(after=cursor)), self.ordered[:10])
+                self.assertEqual(self.ids(self.paginator.get_page(before=cursor)), self.ordered[:10])
+                self.assertEqual(self.ids(self.paginator.get_page(after=valid, before=cursor)), self.ordered[:10])
+
+    def test_malformed_cursor_in_view(self):
+        self.client.force_login(Employee.objects.get(username='admin'))
+        response = self.client.get('/employees/security-logs/', {'after': encode_cursor(['abc', 1])})
+        self.assertEqual(response.status_code, 200)
+
+
+class CoalescingSessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1_000_000.0
+        clock = mock.patch('payroll_system.sessions.time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.session = SessionStore()
+        self.session['user'] = 'alice'
+        self.session.save()
+
+    def row_written_at(self):
+        return SessionStore().decode(Session.objects.get(pk=self.session.session_key).session_data)['_last_written']
+
+    def test_expiry_refresh_skips_the_row_within_the_interval(self):
+        self.now += write_interval() - 1
+        session = SessionStore(self.session.session_key)
+        session.load()
+        with self.assertNumQueries(0):
+            session.save()
+        self.assertEqual(self.row_written_at(), 1_000_000.0)
+
+    def test_row_is_rewritten_after_the_interval(self):
+        self.now += write_interval()
+        session = SessionStore(self.session.session_key)
+        session.load()
+        session.save()
+        self.assertEqual(self.row_written_at(), self.now)
+
+    def test_changed_data_is_written_immediately(self):
+        self.now += 1
+        session = SessionStore(self.session.session_key)
+        session['user'] = 'bob'
+        session.save()
+        cache.clear()
+        self.assertEqual(SessionStore(self.session.session_key)['user'], 'bob')
+
+    def test_idle_session_is_dropped(self):
+        self.now += settings.SESSION_COOKIE_AGE - 1
+        session = SessionStore(self.session.session_key)
+        self.assertEqual(session['user'], 'alice')
+        session.save()
+
+        self.now += settings.SESSION_COOKIE_AGE + 1
+        session = SessionStore(self.session.session_key)
+        self.assertEqual(session.load(), {})
+        self.assertIsNone(session.session_key)
+
+    def test_row_outlives_the_session_by_one_interval(self):
+        expire_date = Session.objects.get(pk=self.session.session_key).expire_date
+        expected = timezone.now() + timedelta(seconds=settings.SESSION_COOKIE_AGE + write_interval())
+        self.assertAlmostEqual(expire_date.timestamp(), expected.timestamp(), delta=5)
+
+    def test_clear_expired_deletes_in_batches(self):
+        Session.objects.filter(pk=self.session.session_key).update(expire_date=timezone.now() - timedelta(days=1))
+        with mock.patch('payroll_system.sessions.CLEAR_BATCH_SIZE', 1):
+            SessionStore.clear_expired()
+        self.assertFalse(Session.objects.exists())
+
+
+@override_settings(PERF_SAMPLE_RATE=1.0, PERF_SERVER_TIMING=False)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        stats.reset()
+        self.addCleanup(stats.reset)
+
+    def views(self):
+        return {row['view']: row['requests'] for row in stats.snapshot()['views']}
+
+    def test_sampled_request_is_recorded_without_header_for_anonymous_users(self):
+        response = self.client.get('/auth/login/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.views(), {'login': 1})
+
+    def test_administrators_get_server_timing(self):
+        self.client.force_login(Employee.objects.create(username='admin', name='Admin', role='Admin'))
+        response = self.client.get('/auth/login/')
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries, \d+ duplicate"$')
+
+        self.client.force_login(Employee.objects.create(username='emp', name='Emp'))
+        self.assertNotIn('Server-Timing', self.client.get('/auth/login/'))
+
+    @override_settings(PERF_SERVER_TIMING=True)
+    def test_server_timing_setting_sends_header_to_everyone(self):
+        self.assertIn('Server-Timing', self.client.get('/auth/login/'))
+
+    @override_settings(PERF_SAMPLE_RATE=0.01)
+    def test_unsampled_request_is_not_measured(self):
+        self.client.force_login(Employee.objects.create(username='admin', name='Admin', role='Admin'))
+        with mock.patch('payroll_system.instrumentation.random.random', return_value=0.5):
+            response = self.client.get('/auth/login/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.views(), {})
+
+    def test_normalize_sql(self):
+        self.assertEqual(normalize_sql(' SELECT  *\n FROM t WHERE id IN (%s, %s, %s) '), 'SELECT * FROM t WHERE id IN (...)')
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    def config(self, **env):
+        with mock.patch.dict(os.environ, env, clear=True):
+            return database_config(Path('/app'))
+
+    def test_sqlite_defaults(self):
+        config = self.config()
+        self.assertEqual((config['ENGINE'], config['NAME'], config['TEST']['NAME']),
+                         ('django.db.backends.sqlite3', Path('/app/db.sqlite3'), Path('/app/test_db.sqlite3')))
+        self.assertEqual((config['CONN_MAX_AGE'], config['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertEqual(config['OPTIONS'], {
+            'init_command': 'PRAGMA synchronous=FULL;PRAGMA mmap_size=268435456;PRAGMA cache_size=-20000;'
+                            'PRAGMA temp_store=MEMORY',
+            'timeout': 20.0,
+            'transaction_mode': 'IMMEDIATE',
+        })
+
+    def test_wal_is_opt_in(self):
+        init_command = self.config(SQLITE_WAL='1')['OPTIONS']['init_command']
+        self.assertTrue(init_command.startswith('PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;'))
+        self.assertNotIn('journal_mode', self.config(SQLITE_WAL='no')['OPTIONS']['init_command'])
+
+    def test_sqlite_overrides(self):
+        config = self.config(
+            SQLITE_PATH='/data/app.sqlite3', SQLITE_WAL='true', SQLITE_SYNCHRONOUS='FULL', SQLITE_MMAP_SIZE='0',
+            SQLITE_CACHE_SIZE='-1000', SQLITE_BUSY_TIMEOUT='5', SQLITE_TRANSACTION_MODE='', DB_CONN_MAX_AGE='0',
+        )
+        self.assertEqual(config['NAME'], '/data/app.sqlite3')
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(config['OPTIONS'], {
+            'init_command': 'PRAGMA journal_mode=WAL;PRAGMA synchronous=FULL;PRAGMA mmap_size=0;'
+                            'PRAGMA cache_size=-1000;PRAGMA temp_store=MEMORY',
+            'timeout': 5.0,
+            'transaction_mode': None,
+        })
+        self.assertEqual(self.config(SQLITE_TRANSACTION_MODE='EXCLUSIVE')['OPTIONS']['transaction_mode'], 'EXCLUSIVE')
+
+    def test_server_databases(self):
+        config = self.config(DB_ENGINE='postgresql', DB_NAME='payroll', DB_HOST='db', DB_CONN_MAX_AGE='120')
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((config['NAME'], config['HOST'], config['CONN_MAX_AGE'], config['OPTIONS']),
+                         ('payroll', 'db', 120, {}))
+        self.assertNotIn('TEST', config)
+
+        pooled = self.config(DB_ENGINE='postgresql', DB_POOL='1', DB_POOL_MAX_SIZE='4')
+        self.assertEqual(pooled['CONN_MAX_AGE'], 0)
+        self.assertEqual(pooled['OPTIONS']['pool'], {'min_size': 2, 'max_size': 4, 'timeout': 10.0})
+
+        mysql = self.config(DB_ENGINE='mysql', DB_POOL='1')
+        self.assertEqual((mysql['ENGINE'], mysql['CONN_MAX_AGE'], mysql['OPTIONS']), ('django.db.backends.mysql', 60, {}))
+
+
+class DatabaseConnectionTests(TestCase):
+    def test_journal_mode_follows_the_wal_flag(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        wal = 'journal_mode=WAL' in settings.DATABASES['default']['OPTIONS']['init_command']
+        self.assertEqual(journal_mode == 'wal', wal)
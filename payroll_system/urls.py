@@ -28,11 +28,13 @@ urlpatterns = [
     path('admin/dashboard/', admin_dashboard, name='admin_dashboard'),
     path('hr/dashboard/', hr_dashboard, name='hr_dashboard'),
     path('employee/dashboard/', employee_dashboard, name='employee_dashboard'),
+    path('hr/', include('hr_management.urls')),
     path('kiosk/', include('kiosk.urls')),
     path('applications/', include('applications.urls')),
     path('chat/', include('chat_system.urls')),
     path('settings/', include('settings_app.urls')),
     path('employees/', include('employees.urls')),
+    path('security/', include('security.urls')),
 ]
 
 # Serve media files in development
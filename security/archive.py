@@ -0,0 +1,211 @@
+"""
+Two-tier security log storage.
+
+The hot `security_logs` table only keeps the last SECURITY_LOG_RETENTION_MONTHS
+whole months. Older entries are rolled into gzip-compressed JSON-lines segments,
+one or more per calendar month, catalogued by SecurityLogArchive, and removed
+from the table. `search_logs` queries both tiers: the hot table through its
+indexes and the archive by scanning only the segments whose time range
+overlaps the search.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from authentication.models import SecurityLog
+from .models import SecurityLogArchive
+
+EVENT_LABELS = dict(SecurityLog.EVENT_TYPE_CHOICES)
+
+
+def archive_dir():
+    return settings.SECURITY_LOG_ARCHIVE_DIR
+
+
+def month_start(value):
+    return value.replace(day=1)
+
+
+def add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return day.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def _aware(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def retention_cutoff(months=None, today=None):
+    """Start of the oldest month that stays in the hot table"""
+    months = settings.SECURITY_LOG_RETENTION_MONTHS if months is None else months
+    today = today or timezone.localdate()
+    return _aware(add_months(month_start(today), -months))
+
+
+def _record(log):
+    return {
+        'id': log.id,
+        'timestamp': log.timestamp.isoformat(),
+        'event_type': log.event_type,
+        'user_id': log.user_id,
+        'username': log.user.username if log.user else None,
+        'user_name': log.user.name if log.user else None,
+        'ip_address': log.ip_address,
+        'user_agent': log.user_agent,
+        'event_description': log.event_description,
+    }
+
+
+def archive_month(month, batch_size=2000):
+    """
+    Move one month of hot entries into a new archive segment.
+
+    Only rows that existed when the run started (id <= the month's max id) are
+    moved, so entries inserted meanwhile stay for the next run. The segment is
+    written before the rows are deleted; if the delete fails the file is
+    removed again.
+    """
+    start, end = _aware(month), _aware(add_months(month, 1))
+    rows = SecurityLog.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    bounds = rows.aggregate(max_id=Max('id'), first=Min('timestamp'), last=Max('timestamp'))
+    if bounds['max_id'] is None:
+        return None
+    rows = rows.filter(id__lte=bounds['max_id'])
+
+    part = (SecurityLogArchive.objects.filter(month=month).aggregate(part=Max('part'))['part'] or 0) + 1
+    relative_path = f'{month:%Y}/security-logs-{month:%Y-%m}-{part}.jsonl.gz'
+    path = archive_dir() / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    temp_path = path.with_name(path.name + '.tmp')
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as fp:
+        for log in rows.select_related('user').order_by('timestamp', 'id').iterator(chunk_size=batch_size):
+            fp.write(json.dumps(_record(log)) + '\n')
+            count += 1
+    os.replace(temp_path, path)
+
+    try:
+        with transaction.atomic():
+            archive = SecurityLogArchive.objects.create(
+                month=month,
+                part=part,
+                path=relative_path,
+                row_count=count,
+                first_timestamp=bounds['first'],
+                last_timestamp=bounds['last'],
+            )
+            rows.delete()
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    return archive
+
+
+def archive_expired(months=None, today=None):
+    """Archive every whole month older than the retention window; returns the new segments"""
+    cutoff = retention_cutoff(months, today)
+    oldest = SecurityLog.objects.filter(timestamp__lt=cutoff).aggregate(oldest=Min('timestamp'))['oldest']
+    if oldest is None:
+        return []
+    archives = []
+    month = month_start(timezone.localtime(oldest).date())
+    while _aware(month) < cutoff:
+        archive = archive_month(month)
+        if archive:
+            archives.append(archive)
+        month = add_months(month, 1)
+    return archives
+
+
+def _hot_results(q, event_type, username, ip_address, start, end, limit):
+    logs = SecurityLog.objects.select_related('user')
+    if event_type:
+        logs = logs.filter(event_type=event_type)
+    if username:
+        logs = logs.filter(user__username=username)
+    if ip_address:
+        logs = logs.filter(ip_address=ip_address)
+    if start:
+        logs = logs.filter(timestamp__gte=start)
+    if end:
+        logs = logs.filter(timestamp__lt=end)
+    if q:
+        logs = logs.filter(
+            Q(event_description__icontains=q) | Q(ip_address__contains=q) | Q(user__username__icontains=q)
+        )
+    return [
+        {
+            'timestamp': log.timestamp,
+            'event_type': log.event_type,
+            'event_label': log.get_event_type_display(),
+            'user_name': log.user.name if log.user else None,
+            'username': log.user.username if log.user else None,
+            'ip_address': log.ip_address,
+            'user_agent': log.user_agent,
+            'event_description': log.event_description,
+            'tier': 'hot',
+        }
+        for log in logs.order_by('-timestamp', '-id')[:limit]
+    ]
+
+
+def _archive_matches(record, q, event_type, username, ip_address, start, end):
+    if event_type and record['event_type'] != event_type:
+        return False
+    if username and record['username'] != username:
+        return False
+    if ip_address and record['ip_address'] != ip_address:
+        return False
+    if start and record['timestamp'] < start:
+        return False
+    if end and record['timestamp'] >= end:
+        return False
+    if q:
+        haystack = ' '.join(
+            str(record.get(field) or '') for field in ('event_description', 'ip_address', 'username')
+        ).lower()
+        return q.lower() in haystack
+    return True
+
+
+def _archive_results(q, event_type, username, ip_address, start, end, limit):
+    segments = SecurityLogArchive.objects.order_by('-last_timestamp', '-part')
+    if start:
+        segments = segments.filter(last_timestamp__gte=start)
+    if end:
+        segments = segments.filter(first_timestamp__lt=end)
+
+    results = []
+    for segment in segments:
+        # Parts of one month can overlap, so stop only once no later segment can beat the oldest kept match
+        if len(results) >= limit and segment.last_timestamp < results[-1]['timestamp']:
+            break
+        with gzip.open(archive_dir() / segment.path, 'rt', encoding='utf-8') as fp:
+            for line in fp:
+                record = json.loads(line)
+                record['timestamp'] = parse_datetime(record['timestamp'])
+                if _archive_matches(record, q, event_type, username, ip_address, start, end):
+                    record['event_label'] = EVENT_LABELS.get(record['event_type'], record['event_type'])
+                    record['tier'] = 'archive'
+                    results.append(record)
+        results.sort(key=lambda result: result['timestamp'], reverse=True)
+        del results[limit:]
+    return results
+
+
+def search_logs(q='', event_type='', username='', ip_address='', start_date=None, end_date=None, limit=200):
+    """Newest-first matches from the hot table and the archive segments combined"""
+    start = _aware(start_date) if start_date else None
+    end = _aware(end_date + timedelta(days=1)) if end_date else None
+    results = _hot_results(q, event_type, username, ip_address, start, end, limit)
+    results += _archive_results(q, event_type, username, ip_address, start, end, limit)
+    results.sort(key=lambda result: result['timestamp'], reverse=True)
+    return results[:limit]
@@ -0,0 +1,280 @@
+"""
+Buffered SecurityLog writer.
+
+Requests hand audit events to `log_event` instead of inserting them one
+transaction at a time. Events are buffered in memory and written with a
+single bulk_create when the buffer reaches AUDIT_LOG_BATCH_SIZE or every
+AUDIT_LOG_FLUSH_INTERVAL seconds, from a background thread.
+
+Every event is first appended to a per-process spool segment (JSON lines) in
+AUDIT_LOG_SPOOL_DIR. A segment is deleted once its events are in the
+database, so segments left behind by a crashed process or a failed flush are
+replayed later (on the next writer start or with `replay_audit_spool`).
+A replaying process first claims a segment by renaming it, so concurrent
+replays never insert it twice; a claim older than ORPHAN_AGE belongs to a
+replay that died and is taken over. When a segment's insert fails because of
+its content, its records are retried one at a time and the ones that still
+fail are set aside in rejected.jsonl. Delivery is at-least-once: a crash
+between the insert and the delete can replay a segment twice.
+
+With AUDIT_LOG_SYNC (set by the test settings) events are written
+immediately, so tests can assert on them.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DataError, DatabaseError, IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from authentication.models import SecurityLog
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('event_type', 'user_id', 'ip_address', 'user_agent', 'event_description', 'timestamp')
+
+# Segments untouched for this long belong to no live writer (writers rotate every flush)
+ORPHAN_AGE = 300
+
+# Failures caused by a record itself, as opposed to the database being unavailable
+RECORD_ERRORS = (IntegrityError, DataError, AttributeError, KeyError, TypeError, ValueError)
+
+REJECTED_FILE = 'rejected.jsonl'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def default_spool_dir():
+    return Path(_setting('AUDIT_LOG_SPOOL_DIR', settings.BASE_DIR / 'var' / 'audit_spool'))
+
+
+def _to_record(event_type, user=None, ip_address=None, user_agent=None, event_description='', timestamp=None):
+    return {
+        'event_type': event_type,
+        'user_id': getattr(user, 'pk', user),
+        'ip_address': ip_address or None,
+        'user_agent': user_agent,
+        'event_description': event_description,
+        'timestamp': (timestamp or timezone.now()).isoformat(),
+    }
+
+
+def _to_instance(record):
+    values = {field: record.get(field) for field in FIELDS}
+    values['timestamp'] = parse_datetime(values['timestamp'])
+    return SecurityLog(**values)
+
+
+def write_records(records, batch_size=500):
+    SecurityLog.objects.bulk_create([_to_instance(record) for record in records], batch_size=batch_size)
+
+
+class AuditWriter:
+    """In-memory event buffer drained by a daemon thread, backed by spool segments"""
+
+    def __init__(self, spool_dir, batch_size=100, flush_interval=2.0):
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._buffer = []
+        self._segment = None
+        self._segment_path = None
+        self._sequence = 0
+        self._thread = None
+
+    def _open_segment(self):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        self._segment_path = self.spool_dir / f'audit-{os.getpid()}-{self._sequence}.jsonl'
+        self._segment = open(self._segment_path, 'a', encoding='utf-8')
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def log(self, record):
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            if self._segment is None:
+                self._open_segment()
+            self._segment.write(json.dumps(record) + '\n')
+            self._segment.flush()
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _run(self):
+        last_replay = 0
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                # Pick up segments from crashed processes and earlier failed flushes
+                if time.monotonic() - last_replay >= ORPHAN_AGE:
+                    last_replay = time.monotonic()
+                    replay_spool(self.spool_dir, min_age=ORPHAN_AGE)
+            except Exception:  # Never let the writer thread die
+                logger.exception('Audit log flush failed')
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write buffered events; the flushed segment is kept for replay if the insert fails"""
+        with self._flush_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+                segment, path = self._segment, self._segment_path
+                self._segment = self._segment_path = None
+            if segment is None:
+                return 0
+            segment.close()
+            try:
+                write_records(records)
+            except DatabaseError:
+                logger.exception('Could not write %d audit events; kept in %s', len(records), path)
+                return 0
+            path.unlink(missing_ok=True)
+            return len(records)
+
+
+def _claim(path):
+    """Rename a segment so no other process replays it; returns the new path, or None if another got it first"""
+    claimed = path.with_name(f"{path.name.split('.')[0]}.{os.getpid()}-{threading.get_ident()}.claimed")
+    try:
+        os.rename(path, claimed)
+        os.utime(claimed)  # The claim's age starts now
+    except FileNotFoundError:
+        return None
+    return claimed
+
+
+def _release(claimed, records):
+    """Put unwritten records back as a plain segment for a later replay"""
+    with open(claimed, 'w', encoding='utf-8') as fp:
+        fp.writelines(json.dumps(record) + '\n' for record in records)
+    os.rename(claimed, claimed.with_name(f"{claimed.name.split('.')[0]}.jsonl"))
+
+
+def _read_segment(path):
+    records = []
+    with open(path, encoding='utf-8') as fp:
+        for line in fp:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass  # Torn last line from a crash mid-write
+    return records
+
+
+def _reject(spool_dir, record, error):
+    logger.error('Dropping audit event that cannot be stored (%s); kept in %s', error, spool_dir / REJECTED_FILE)
+    with open(spool_dir / REJECTED_FILE, 'a', encoding='utf-8') as fp:
+        fp.write(json.dumps({'record': record, 'error': str(error)}) + '\n')
+
+
+def _write_segment(claimed, records):
+    """
+    Insert a claimed segment's records; returns how many were written.
+
+    A batch rejected for its content is retried record by record. If the
+    database itself fails, the records not yet written are released and the
+    error propagates.
+    """
+    try:
+        with transaction.atomic():
+            write_records(records)
+        return len(records)
+    except RECORD_ERRORS:
+        pass
+    except DatabaseError:
+        _release(claimed, records)
+        raise
+
+    written = 0
+    for index, record in enumerate(records):
+        try:
+            with transaction.atomic():
+                write_records([record])
+        except RECORD_ERRORS as exc:
+            _reject(claimed.parent, record, exc)
+            continue
+        except DatabaseError:
+            _release(claimed, records[index:])
+            raise
+        written += 1
+    return written
+
+
+def replay_spool(spool_dir=None, min_age=0):
+    """Insert events from leftover spool segments and delete them; returns the event count"""
+    spool_dir = Path(spool_dir or default_spool_dir())
+    if not spool_dir.is_dir():
+        return 0
+    replayed = 0
+    now = time.time()
+    for path in sorted(spool_dir.glob('audit-*')):
+        # A fresh claim is a replay in progress in another process
+        age = max(min_age, ORPHAN_AGE) if path.suffix == '.claimed' else min_age
+        try:
+            if path.stat().st_mtime > now - age:
+                continue
+        except FileNotFoundError:
+            continue  # Another process replayed it first
+        claimed = _claim(path)
+        if claimed is None:
+            continue
+        try:
+            replayed += _write_segment(claimed, _read_segment(claimed))
+        except DatabaseError:
+            logger.exception('Could not replay audit spool segment %s', path)
+            continue
+        claimed.unlink(missing_ok=True)
+    return replayed
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter(
+                    spool_dir=default_spool_dir(),
+                    batch_size=_setting('AUDIT_LOG_BATCH_SIZE', 100),
+                    flush_interval=_setting('AUDIT_LOG_FLUSH_INTERVAL', 2.0),
+                )
+    return _writer
+
+
+def log_event(event_type, user=None, ip_address=None, user_agent=None, event_description='', timestamp=None):
+    """Record a security event (same fields as SecurityLog)"""
+    record = _to_record(event_type, user, ip_address, user_agent, event_description, timestamp)
+    if _setting('AUDIT_LOG_SYNC', False):
+        write_records([record])
+    else:
+        get_writer().log(record)
+
+
+def flush():
+    """Write any buffered events now (no-op in synchronous mode)"""
+    if _writer is not None:
+        return _writer.flush()
+    return 0
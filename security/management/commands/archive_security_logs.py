@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from security.archive import archive_expired, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Move security logs older than the retention window into compressed monthly archives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=settings.SECURITY_LOG_RETENTION_MONTHS,
+            help='Whole months to keep in the security_logs table',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options['months'])
+        archives = archive_expired(options['months'])
+        for archive in archives:
+            self.stdout.write(f'Archived {archive.row_count} entries to {archive.path}')
+        total = sum(archive.row_count for archive in archives)
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} entries older than {cutoff:%Y-%m-%d}.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from security.audit import ORPHAN_AGE, replay_spool
+
+
+class Command(BaseCommand):
+    help = 'Insert audit events left in the spool directory by crashed processes or failed flushes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=ORPHAN_AGE,
+            help='Only replay segments untouched for this many seconds (0 replays everything; '
+                 'only safe when no server process is running)',
+        )
+
+    def handle(self, *args, **options):
+        count = replay_spool(min_age=options['min_age'])
+        self.stdout.write(self.style.SUCCESS(f'Replayed {count} audit events.'))
@@ -1,3 +1,21 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class SecurityLogArchive(models.Model):
+    """Catalog of compressed JSONL segments holding security logs moved out of the hot table"""
+    month = models.DateField()  # First day of the month the segment covers
+    part = models.PositiveIntegerField(default=1)  # Later runs for the same month add parts
+    path = models.CharField(max_length=255)  # Relative to SECURITY_LOG_ARCHIVE_DIR
+    row_count = models.PositiveIntegerField()
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'security_log_archives'
+        unique_together = ['month', 'part']
+        ordering = ['-month', '-part']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} part {self.part} ({self.row_count} entries)"
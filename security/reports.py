@@ -0,0 +1,172 @@
+"""
+Filters and summary panels for the security log explorer.
+
+Every filter maps onto a composite index on security_logs (event_type, user
+and ip_address each paired with timestamp), so a filtered, time-ordered page
+is an index range scan however much history the table holds. Summary panels
+are GROUP BY aggregates over the selected range, cached briefly.
+"""
+import hashlib
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import Substr, TruncDay, TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from authentication.models import SecurityLog
+
+SUMMARY_CACHE_TIMEOUT = 60
+DEFAULT_SUMMARY_HOURS = 24
+HOURLY_MAX_DAYS = 3
+MAX_BUCKETS = 366  # Longer ranges chart only their most recent periods
+TOP_IP_LIMIT = 10
+
+# One day of slack at each end keeps day arithmetic and time zone conversion inside the datetime range
+MIN_DATE = date.min + timedelta(days=1)
+MAX_DATE = date.max - timedelta(days=1)
+
+
+def _date_param(params, name):
+    try:
+        return parse_date(params.get(name) or '')
+    except ValueError:
+        return None
+
+
+def parse_filters(params):
+    """Filter values from request.GET; invalid dates are ignored"""
+    return {
+        'event_type': params.get('event_type', ''),
+        'username': params.get('username', '').strip(),
+        'ip_address': params.get('ip_address', '').strip(),
+        'start_date': _date_param(params, 'start_date'),
+        'end_date': _date_param(params, 'end_date'),
+    }
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _clamp(day):
+    return min(max(day, MIN_DATE), MAX_DATE)
+
+
+def date_range(filters):
+    """(start, end) datetimes for the filters; end is exclusive. Dates are clamped to MIN_DATE..MAX_DATE."""
+    start = _day_start(_clamp(filters['start_date'])) if filters.get('start_date') else None
+    end = _day_start(_clamp(filters['end_date']) + timedelta(days=1)) if filters.get('end_date') else None
+    return start, end
+
+
+def apply_filters(logs, filters, event_type=True):
+    if event_type and filters.get('event_type'):
+        logs = logs.filter(event_type=filters['event_type'])
+    if filters.get('username'):
+        logs = logs.filter(user__username=filters['username'])
+    if filters.get('ip_address'):
+        logs = logs.filter(ip_address=filters['ip_address'])
+    start, end = date_range(filters)
+    if start:
+        logs = logs.filter(timestamp__gte=start)
+    if end:
+        logs = logs.filter(timestamp__lt=end)
+    return logs
+
+
+def _period_counts(logs, hourly):
+    """{period start: count} grouped by hour or day in the current time zone"""
+    if connection.vendor == 'sqlite' and timezone.get_current_timezone_name() == 'UTC':
+        # SQLite stores UTC timestamps as ISO text; grouping on a prefix avoids
+        # calling the Python-level Trunc function once per row
+        length, fmt = (13, '%Y-%m-%d %H') if hourly else (10, '%Y-%m-%d')
+        rows = logs.annotate(period=Substr('timestamp', 1, length)).values('period').annotate(count=Count('id'))
+        return {
+            timezone.make_aware(datetime.strptime(row['period'], fmt)): row['count'] for row in rows
+        }
+    trunc = TruncHour if hourly else TruncDay
+    rows = logs.annotate(period=trunc('timestamp')).values('period').annotate(count=Count('id'))
+    return {timezone.localtime(row['period']): row['count'] for row in rows}
+
+
+def _event_counts(logs, narrowed):
+    """
+    Counts per event type. Over a bare time range this is a UNION ALL of
+    (event_type, timestamp) index range counts instead of a scan of every row
+    in the range; with a user or IP filter that filter's index is narrower.
+    """
+    if narrowed:
+        return logs.values('event_type').annotate(count=Count('id')).order_by('-count')
+    parts = [
+        logs.filter(event_type=event_type).values('event_type').annotate(count=Count('id'))
+        for event_type, _ in SecurityLog.EVENT_TYPE_CHOICES
+    ]
+    return sorted(parts[0].union(*parts[1:], all=True), key=lambda row: -row['count'])
+
+
+def _buckets(counts, start, end, step):
+    peak = max(counts.values(), default=0)
+    current = timezone.localtime(start)
+    buckets = []
+    while current < end:
+        count = counts.get(current, 0)
+        buckets.append({'period': current, 'count': count, 'percent': count * 100 // peak if peak else 0})
+        current += step
+    return buckets
+
+
+def build_summary(filters):
+    now = timezone.now()
+    start, end = date_range(filters)
+    end = min(end or now, now)
+    start = start or end - timedelta(hours=DEFAULT_SUMMARY_HOURS)
+
+    logs = apply_filters(SecurityLog.objects.order_by(), filters, event_type=False).filter(
+        timestamp__gte=start, timestamp__lt=end
+    )
+    failed = logs.filter(event_type='LOGIN_FAILED')
+
+    hourly = end - start <= timedelta(days=HOURLY_MAX_DAYS)
+    if hourly:
+        step = timedelta(hours=1)
+        bucket_start = timezone.localtime(start).replace(minute=0, second=0, microsecond=0)
+    else:
+        step = timedelta(days=1)
+        bucket_start = timezone.localtime(start).replace(hour=0, minute=0, second=0, microsecond=0)
+        last_bucket = timezone.localtime(end).replace(hour=0, minute=0, second=0, microsecond=0)
+        if last_bucket - bucket_start >= step * MAX_BUCKETS:
+            bucket_start = last_bucket - step * (MAX_BUCKETS - 1)
+
+    failed_by_period = _period_counts(failed, hourly)
+    top_ips = failed.exclude(ip_address=None).values('ip_address').annotate(
+        count=Count('id')
+    ).order_by('-count', 'ip_address')[:TOP_IP_LIMIT]
+    labels = dict(SecurityLog.EVENT_TYPE_CHOICES)
+
+    return {
+        'start': start,
+        'end': end,
+        'hourly': hourly,
+        'chart_start': bucket_start,
+        'failed_logins': _buckets(failed_by_period, bucket_start, end, step),
+        'failed_total': sum(failed_by_period.values()),
+        'top_ips': list(top_ips),
+        'event_counts': [
+            {'event_type': row['event_type'], 'label': labels.get(row['event_type'], row['event_type']), 'count': row['count']}
+            for row in _event_counts(logs, narrowed=bool(filters.get('username') or filters.get('ip_address')))
+        ],
+    }
+
+
+def log_summary(filters):
+    """Summary panels for the filters, cached for SUMMARY_CACHE_TIMEOUT seconds"""
+    fingerprint = hashlib.sha1(repr(sorted((k, str(v)) for k, v in filters.items())).encode()).hexdigest()
+    key = f'security:summary:{fingerprint}'
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_summary(filters)
+        cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+    return summary
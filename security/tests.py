@@ -1,3 +1,311 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from authentication.models import Employee, SecurityLog
+from .archive import archive_expired, retention_cutoff, search_logs
+from .audit import ORPHAN_AGE, REJECTED_FILE, AuditWriter, _to_record, log_event, replay_spool
+from .models import SecurityLogArchive
+from .reports import MAX_BUCKETS, build_summary, date_range, parse_filters
+from .throttle import SlidingWindowThrottle
+
+
+class AuditSpoolTestCase(TransactionTestCase):
+    def setUp(self):
+        self.spool_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+
+    def write_segment(self, name, records, age=0, extra=''):
+        path = self.spool_dir / name
+        path.write_text(''.join(json.dumps(record) + '\n' for record in records) + extra)
+        if age:
+            stamp = time.time() - age
+            os.utime(path, (stamp, stamp))
+        return path
+
+    def spool_files(self):
+        return sorted(path.name for path in self.spool_dir.iterdir())
+
+
+class AuditWriterTests(AuditSpoolTestCase):
+    def setUp(self):
+        super().setUp()
+        # A long interval keeps the background thread out of the way; the tests flush explicitly
+        self.writer = AuditWriter(self.spool_dir, batch_size=100, flush_interval=3600)
+
+    def test_events_are_spooled_then_flushed(self):
+        for i in range(3):
+            self.writer.log(_to_record('LOGIN_FAILED', ip_address='10.0.0.1', event_description=f'attempt {i}'))
+
+        [segment] = self.spool_dir.glob('audit-*.jsonl')
+        self.assertEqual(len(segment.read_text().splitlines()), 3)
+        self.assertFalse(SecurityLog.objects.exists())
+
+        self.assertEqual(self.writer.flush(), 3)
+        self.assertEqual(
+            list(SecurityLog.objects.order_by('id').values_list('event_description', flat=True)),
+            ['attempt 0', 'attempt 1', 'attempt 2'],
+        )
+        self.assertEqual(self.spool_files(), [])
+        self.assertEqual(self.writer.flush(), 0)
+
+    def test_failed_flush_keeps_segment_for_replay(self):
+        self.writer.log(_to_record('LOGOUT', event_description='kept'))
+        with mock.patch('security.audit.write_records', side_effect=OperationalError('database is locked')), \
+                self.assertLogs('security.audit', 'ERROR'):
+            self.assertEqual(self.writer.flush(), 0)
+        self.assertEqual(len(self.spool_files()), 1)
+
+        self.assertEqual(replay_spool(self.spool_dir), 1)
+        self.assertEqual(SecurityLog.objects.get().event_description, 'kept')
+        self.assertEqual(self.spool_files(), [])
+
+
+class ReplaySpoolTests(AuditSpoolTestCase):
+    def test_replays_segment_and_skips_torn_line(self):
+        user = Employee.objects.create(username='user', name='User')
+        self.write_segment('audit-1-1.jsonl', [_to_record('LOGOUT', user=user)], extra='{"torn')
+
+        self.assertEqual(replay_spool(self.spool_dir), 1)
+        self.assertEqual(SecurityLog.objects.get().user, user)
+        self.assertEqual(self.spool_files(), [])
+
+    def test_bad_records_are_rejected_one_by_one(self):
+        user = Employee.objects.create(username='gone', name='Gone')
+        records = [
+            _to_record('LOGIN_SUCCESS', event_description='first'),
+            _to_record('LOGOUT', user=user, event_description='deleted user'),
+            dict(_to_record('LOGOUT', event_description='no type'), event_type=None),
+            _to_record('LOGIN_SUCCESS', event_description='last'),
+        ]
+        self.write_segment('audit-1-1.jsonl', records)
+        user.delete()
+
+        with self.assertLogs('security.audit', 'ERROR') as logs:
+            self.assertEqual(replay_spool(self.spool_dir), 2)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(sorted(SecurityLog.objects.values_list('event_description', flat=True)), ['first', 'last'])
+        self.assertEqual(self.spool_files(), [REJECTED_FILE])
+        rejected = [json.loads(line) for line in (self.spool_dir / REJECTED_FILE).read_text().splitlines()]
+        self.assertEqual([entry['record']['event_description'] for entry in rejected], ['deleted user', 'no type'])
+
+        self.assertEqual(replay_spool(self.spool_dir), 0)
+
+    def test_database_outage_releases_unwritten_records(self):
+        self.write_segment('audit-1-1.jsonl', [_to_record('LOGOUT', event_description='later')])
+        with mock.patch('security.audit.write_records', side_effect=OperationalError('database is locked')), \
+                self.assertLogs('security.audit', 'ERROR'):
+            self.assertEqual(replay_spool(self.spool_dir), 0)
+        self.assertEqual(self.spool_files(), ['audit-1-1.jsonl'])
+
+        self.assertEqual(replay_spool(self.spool_dir), 1)
+        self.assertEqual(SecurityLog.objects.get().event_description, 'later')
+
+    def test_recent_segments_and_live_claims_are_left_alone(self):
+        self.write_segment('audit-1-1.jsonl', [_to_record('LOGOUT', event_description='recent')])
+        self.write_segment('audit-2-1.999-1.claimed', [_to_record('LOGOUT', event_description='claimed')], age=60)
+
+        self.assertEqual(replay_spool(self.spool_dir, min_age=30), 0)
+        self.assertEqual(replay_spool(self.spool_dir), 1)
+        self.assertEqual(SecurityLog.objects.get().event_description, 'recent')
+        self.assertEqual(self.spool_files(), ['audit-2-1.999-1.claimed'])
+
+    def test_stale_claim_is_taken_over(self):
+        self.write_segment('audit-2-1.999-1.claimed', [_to_record('LOGOUT', event_description='orphan')],
+                           age=ORPHAN_AGE + 1)
+        self.assertEqual(replay_spool(self.spool_dir), 1)
+        self.assertEqual(self.spool_files(), [])
+
+    def test_segment_claimed_by_another_process_is_skipped(self):
+        self.write_segment('audit-1-1.jsonl', [_to_record('LOGOUT')])
+        with mock.patch('security.audit.os.rename', side_effect=FileNotFoundError):
+            self.assertEqual(replay_spool(self.spool_dir), 0)
+        self.assertFalse(SecurityLog.objects.exists())
+
+
+class SynchronousAuditLogTests(TestCase):
+    def test_log_event_writes_immediately(self):
+        log_event('LOGIN_FAILED', ip_address='10.0.0.1', event_description='sync')
+        self.assertEqual(SecurityLog.objects.get().event_description, 'sync')
+
+
+class SecurityLogArchiveTests(TestCase):
+    today = date(2025, 6, 15)
+
+    def setUp(self):
+        self.archive_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        settings_override = override_settings(SECURITY_LOG_ARCHIVE_DIR=self.archive_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.admin = Employee.objects.create(username='admin', name='Admin', role='Admin')
+        for day in (date(2025, 6, 10), date(2025, 1, 2), date(2024, 11, 20), date(2024, 11, 3), date(2024, 2, 29)):
+            self.log(day, f'failed {day}')
+
+    def log(self, day, description, event_type='LOGIN_FAILED'):
+        return SecurityLog.objects.create(
+            event_type=event_type, user=self.admin, ip_address='10.0.0.1', event_description=description,
+            timestamp=timezone.make_aware(datetime(day.year, day.month, day.day, 12)),
+        )
+
+    def test_retention_cutoff_is_a_month_start(self):
+        self.assertEqual(timezone.localtime(retention_cutoff(6, self.today)).date(), date(2024, 12, 1))
+
+    def test_old_months_move_to_compressed_segments(self):
+        archives = archive_expired(months=6, today=self.today)
+
+        self.assertEqual([(archive.month, archive.part, archive.row_count) for archive in archives],
+                         [(date(2024, 2, 1), 1, 1), (date(2024, 11, 1), 1, 2)])
+        self.assertEqual(SecurityLog.objects.count(), 2)
+        with gzip.open(self.archive_dir / archives[1].path, 'rt') as fp:
+            records = [json.loads(line) for line in fp]
+        self.assertEqual([record['event_description'] for record in records],
+                         ['failed 2024-11-03', 'failed 2024-11-20'])
+        self.assertEqual(records[0]['username'], 'admin')
+        self.assertEqual(archive_expired(months=6, today=self.today), [])
+
+    def test_late_rows_add_a_part(self):
+        archive_expired(months=6, today=self.today)
+        self.log(date(2024, 11, 25), 'late')
+        [archive] = archive_expired(months=6, today=self.today)
+        self.assertEqual((archive.month, archive.part, archive.row_count), (date(2024, 11, 1), 2, 1))
+
+    def test_search_spans_both_tiers_newest_first(self):
+        archive_expired(months=6, today=self.today)
+        results = search_logs(q='failed')
+        self.assertEqual([result['event_description'] for result in results], [
+            'failed 2025-06-10', 'failed 2025-01-02', 'failed 2024-11-20', 'failed 2024-11-03', 'failed 2024-02-29',
+        ])
+        self.assertEqual([result['tier'] for result in results], ['hot', 'hot', 'archive', 'archive', 'archive'])
+        self.assertEqual(len(search_logs(q='failed', limit=3)), 3)
+        self.assertEqual(len(search_logs(start_date=date(2024, 11, 10), end_date=date(2025, 1, 2))), 2)
+        self.assertEqual(search_logs(username='nobody'), [])
+        self.assertEqual(SecurityLogArchive.objects.count(), 2)
+
+    def test_search_view(self):
+        archive_expired(months=6, today=self.today)
+        self.client.force_login(self.admin)
+        response = self.client.get('/security/logs/search/', {'q': 'failed', 'start_date': 'bad'})
+        self.assertContains(response, 'failed 2024-02-29')
+        self.assertContains(response, 'Archive')
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.throttle = SlidingWindowThrottle('test', limit=3, window=100)
+
+    def test_limit_within_window(self):
+        for _ in range(2):
+            self.throttle.hit('client', now=10)
+        self.assertFalse(self.throttle.is_limited('client', now=20))
+        self.throttle.hit('client', now=30)
+        self.assertTrue(self.throttle.is_limited('client', now=40))
+        self.assertFalse(self.throttle.is_limited('other', now=40))
+        self.assertFalse(self.throttle.is_limited(None, now=40))
+
+    def test_previous_window_is_weighted_then_expires(self):
+        for _ in range(3):
+            self.throttle.hit('client', now=90)
+        self.assertEqual(self.throttle.count('client', now=125), 3 * 0.75)
+        self.assertFalse(self.throttle.is_limited('client', now=125))
+        self.assertEqual(self.throttle.count('client', now=210), 0)
+
+    def test_reset(self):
+        for _ in range(3):
+            self.throttle.hit('client', now=10)
+        self.throttle.reset('client', now=10)
+        self.assertEqual(self.throttle.count('client', now=10), 0)
+
+    def test_first_rejection_per_window_reports_previous_count(self):
+        self.assertEqual(self.throttle.reject('client', now=10), 0)
+        self.assertIsNone(self.throttle.reject('client', now=20))
+        self.assertEqual(self.throttle.reject('client', now=110), 2)
+
+
+@override_settings(LOGIN_THROTTLE_IP_LIMIT=4, LOGIN_THROTTLE_USERNAME_LIMIT=2, LOGIN_THROTTLE_WINDOW=300)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Employee.objects.create(username='alice', name='Alice')
+        self.user.set_password('correct')
+        self.user.save()
+        # Keep every attempt inside one window
+        clock = mock.patch('security.throttle.time.time', return_value=3000.0)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def login(self, username, password='wrong', ip_address='10.0.0.1'):
+        return self.client.post('/auth/login/', {'username': username, 'password': password},
+                                REMOTE_ADDR=ip_address)
+
+    def throttled_events(self):
+        return SecurityLog.objects.filter(event_type='LOGIN_THROTTLED').count()
+
+    def test_username_lockout_applies_from_any_ip(self):
+        self.login('alice', ip_address='10.0.0.1')
+        self.login('Alice ', ip_address='10.0.0.2')
+
+        self.assertEqual(self.login('alice', 'correct', ip_address='10.0.0.3').status_code, 429)
+        self.assertEqual(self.login('alice', 'correct', ip_address='10.0.0.4').status_code, 429)
+        self.assertEqual(self.throttled_events(), 1)
+        self.assertEqual(self.login('bob', ip_address='10.0.0.3').status_code, 200)
+
+    def test_ip_lockout_applies_to_any_username(self):
+        for index in range(4):
+            self.login(f'user{index}', ip_address='10.0.0.9')
+
+        self.assertEqual(self.login('alice', 'correct', ip_address='10.0.0.9').status_code, 429)
+        self.assertEqual(self.login('alice', 'correct', ip_address='10.0.0.10').status_code, 302)
+
+    def test_successful_login_clears_username_failures(self):
+        self.login('alice')
+        self.assertEqual(self.login('alice', 'correct').status_code, 302)
+        self.client.logout()
+        self.login('alice')
+        self.assertEqual(self.login('alice', 'correct').status_code, 302)
+
+
+class SecurityLogReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = Employee.objects.create(username='admin', name='Admin', role='Admin')
+        now = timezone.now()
+        for age in (timedelta(hours=2), timedelta(days=30), timedelta(days=800)):
+            SecurityLog.objects.create(event_type='LOGIN_FAILED', ip_address='10.0.0.1', timestamp=now - age)
+
+    def test_extreme_dates_are_clamped(self):
+        start, end = date_range(parse_filters({'start_date': '0001-01-01', 'end_date': '9999-12-31'}))
+        self.assertLess(start, end)
+        self.assertEqual(timezone.localtime(end).date(), date(9999, 12, 31))
+
+    def test_default_summary_is_hourly(self):
+        summary = build_summary(parse_filters({}))
+        self.assertTrue(summary['hourly'])
+        self.assertEqual(summary['failed_total'], 1)
+        self.assertIn(len(summary['failed_logins']), (24, 25))
+
+    def test_long_range_charts_at_most_max_buckets(self):
+        summary = build_summary(parse_filters({'start_date': '0001-01-01', 'end_date': '9999-12-31'}))
+        self.assertFalse(summary['hourly'])
+        self.assertEqual(summary['failed_total'], 3)
+        self.assertEqual(len(summary['failed_logins']), MAX_BUCKETS)
+        self.assertEqual(sum(bucket['count'] for bucket in summary['failed_logins']), 2)
+        self.assertGreater(summary['chart_start'], summary['start'])
+
+    def test_log_view_accepts_extreme_dates(self):
+        self.client.force_login(self.admin)
+        response = self.client.get('/employees/security-logs/', {'start_date': '0001-01-01', 'end_date': '9999-12-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Chart shows days since')
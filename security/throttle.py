@@ -0,0 +1,136 @@
+"""
+Sliding-window login throttling.
+
+Failed login attempts are counted per client IP and per username in the
+Django cache (process-local with the default LocMem backend, shared with
+Redis/Memcached). Each window keeps one counter; the sliding count is the
+current window's counter plus the previous window's, weighted by how much
+of it still overlaps the sliding interval. Over-limit attempts are rejected
+before `authenticate` runs, so they cost no password hashing and no
+per-attempt database write: only the first rejection in each window is
+logged, carrying the number of rejections from the window before.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .audit import log_event
+
+
+class SlidingWindowThrottle:
+    """At most `limit` hits per `window` seconds for each identifier"""
+
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def _key(self, ident, index, kind='hits'):
+        digest = hashlib.sha1(str(ident).encode()).hexdigest()
+        return f'throttle:{self.scope}:{kind}:{digest}:{index}'
+
+    def _position(self, now=None):
+        now = time.time() if now is None else now
+        index, offset = divmod(now, self.window)
+        return int(index), offset / self.window
+
+    def count(self, ident, now=None):
+        """Estimated hits within the last `window` seconds"""
+        index, elapsed = self._position(now)
+        current_key, previous_key = self._key(ident, index), self._key(ident, index - 1)
+        counts = cache.get_many([current_key, previous_key])
+        return counts.get(current_key, 0) + counts.get(previous_key, 0) * (1 - elapsed)
+
+    def is_limited(self, ident, now=None):
+        return ident is not None and self.count(ident, now) >= self.limit
+
+    def _incr(self, key):
+        cache.add(key, 0, timeout=self.window * 2)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr
+            cache.set(key, 1, timeout=self.window * 2)
+            return 1
+
+    def hit(self, ident, now=None):
+        if ident is not None:
+            index, _ = self._position(now)
+            self._incr(self._key(ident, index))
+
+    def reset(self, ident, now=None):
+        if ident is None:
+            return
+        index, _ = self._position(now)
+        cache.delete_many([self._key(ident, index), self._key(ident, index - 1)])
+
+    def reject(self, ident, now=None):
+        """
+        Count a rejected attempt; returns the previous window's rejection count
+        for the first rejection in a window and None for the rest.
+        """
+        index, _ = self._position(now)
+        rejections = self._incr(self._key(ident, index, kind='rejected'))
+        if rejections != 1:
+            return None
+        return cache.get(self._key(ident, index - 1, kind='rejected'), 0)
+
+
+def ip_throttle():
+    return SlidingWindowThrottle(
+        'login-ip',
+        getattr(settings, 'LOGIN_THROTTLE_IP_LIMIT', 20),
+        getattr(settings, 'LOGIN_THROTTLE_WINDOW', 300),
+    )
+
+
+def username_throttle():
+    return SlidingWindowThrottle(
+        'login-username',
+        getattr(settings, 'LOGIN_THROTTLE_USERNAME_LIMIT', 5),
+        getattr(settings, 'LOGIN_THROTTLE_WINDOW', 300),
+    )
+
+
+def _normalize(username):
+    return (username or '').strip().lower() or None
+
+
+def check_login_throttle(request, username):
+    """
+    Return True if this login attempt must be rejected without authenticating.
+
+    Logs one LOGIN_THROTTLED event per identifier and window.
+    """
+    ip_address = request.META.get('REMOTE_ADDR')
+    for throttle, ident, label in (
+        (ip_throttle(), ip_address, f'IP {ip_address}'),
+        (username_throttle(), _normalize(username), f'username {username}'),
+    ):
+        if not throttle.is_limited(ident):
+            continue
+        previous_rejections = throttle.reject(ident)
+        if previous_rejections is not None:
+            minutes = throttle.window // 60
+            log_event(
+                event_type='LOGIN_THROTTLED',
+                ip_address=ip_address,
+                user_agent=request.META.get('HTTP_USER_AGENT'),
+                event_description=(
+                    f"Login attempts for {label} throttled after {throttle.limit} failures "
+                    f"in {minutes} minutes ({previous_rejections} attempts rejected in the previous window)"
+                ),
+            )
+        return True
+    return False
+
+
+def record_login_failure(request, username):
+    ip_throttle().hit(request.META.get('REMOTE_ADDR'))
+    username_throttle().hit(_normalize(username))
+
+
+def clear_login_failures(username):
+    username_throttle().reset(_normalize(username))
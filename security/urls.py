@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('logs/search/', views.log_search, name='security_log_search'),
+    path('performance/', views.performance_stats, name='performance_stats'),
+]
@@ -1,3 +1,55 @@
-from django.shortcuts import render
+from datetime import datetime, timezone as dt_timezone
 
-# Create your views here.
+from django.conf import settings
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from authentication.models import SecurityLog
+from payroll_system import instrumentation as performance
+from .archive import search_logs
+from .models import SecurityLogArchive
+from .reports import parse_filters
+
+
+@login_required
+def log_search(request):
+    """Search security logs across the hot table and the monthly archives"""
+    if not request.user.is_admin:
+        messages.error(request, 'Access denied. Only administrators can view security logs.')
+        return redirect('home')
+    
+    filters = parse_filters(request.GET)
+    filters['q'] = request.GET.get('q', '').strip()
+    searched = any(filters.values())
+    
+    context = {
+        'results': search_logs(**filters) if searched else [],
+        'searched': searched,
+        'filters': request.GET,
+        'event_types': SecurityLog.EVENT_TYPE_CHOICES,
+        'archives': SecurityLogArchive.objects.all()[:24],
+    }
+    return render(request, 'security/log_search.html', context)
+
+
+@login_required
+def performance_stats(request):
+    """Per-view request timings and query counts sampled by PerformanceMiddleware"""
+    if not request.user.is_admin:
+        messages.error(request, 'Access denied. Only administrators can view performance statistics.')
+        return redirect('home')
+    
+    if request.method == 'POST':
+        performance.stats.reset()
+        messages.success(request, 'Performance statistics reset.')
+        return redirect('performance_stats')
+    
+    snapshot = performance.stats.snapshot()
+    context = {
+        'views': snapshot['views'],
+        'repeats': snapshot['repeats'],
+        'since': datetime.fromtimestamp(snapshot['since'], tz=dt_timezone.utc),
+        'sample_rate': getattr(settings, 'PERF_SAMPLE_RATE', performance.DEFAULT_SAMPLE_RATE),
+        'repeat_threshold': getattr(settings, 'PERF_REPEAT_THRESHOLD', 5),
+    }
+    return render(request, 'security/performance.html', context)
@@ -0,0 +1,162 @@
+"""
+Typed access to SystemSetting values.
+
+Settings are read far more often than they change, so each process keeps all
+of them in a local dict and only checks a version number in the shared cache
+per lookup. Saving settings (here, through the admin, or anywhere a
+SystemSetting is saved) bumps the version and every process reloads the
+whole table with one query on its next lookup.
+"""
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SystemSetting
+
+VERSION_KEY = 'settings_app:version'
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in ('true', '1', 'yes', 'on'):
+        return True
+    if value in ('false', '0', 'no', 'off', ''):
+        return False
+    raise ValueError(f'not a boolean: {value!r}')
+
+
+def _decimal(value):
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f'not a number: {value!r}')
+    if not number.is_finite():
+        raise ValueError(f'not a finite number: {value!r}')
+    return number
+
+
+def _serialize(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+# name: (parser, default)
+DEFINITIONS = {
+    'company_name': (str, 'Federal Agency'),
+    'max_leave_days': (_decimal, Decimal('30')),
+    'working_hours_per_day': (_decimal, Decimal('8')),
+    'overtime_rate': (_decimal, Decimal('1.5')),
+    'enable_notifications': (_boolean, True),
+    'backup_frequency': (str, 'daily'),
+    'session_timeout': (int, 8),
+}
+
+_snapshot = (None, {})  # (version, {setting_name: raw string})
+_snapshot_lock = threading.Lock()
+
+
+def _initial_version():
+    # Never restart from a number a process may already hold a snapshot for
+    # (the key can be evicted or the cache cleared)
+    return time.time_ns()
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _initial_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, _initial_version(), timeout=None)
+        return cache.incr(VERSION_KEY)
+
+
+def _raw_values():
+    global _snapshot
+    version = get_version()
+    if _snapshot[0] != version:
+        with _snapshot_lock:
+            if _snapshot[0] != version:
+                values = dict(SystemSetting.objects.values_list('setting_name', 'setting_value'))
+                _snapshot = (version, values)
+    return _snapshot[1]
+
+
+def _typed(name, raw_values, default=None):
+    parser, definition_default = DEFINITIONS.get(name, (str, default))
+    raw = raw_values.get(name)
+    if raw is None:
+        return definition_default
+    try:
+        return parser(raw)
+    except (TypeError, ValueError):
+        return definition_default
+
+
+def get_setting(name, default=None):
+    """Typed value of a setting; falls back to its default when unset or unparsable"""
+    return _typed(name, _raw_values(), default)
+
+
+def get_settings():
+    """Typed values of every defined setting"""
+    raw_values = _raw_values()
+    return {name: _typed(name, raw_values) for name in DEFINITIONS}
+
+
+def raw_settings():
+    """Stored strings of all settings, with defaults filled in for unset ones"""
+    values = {name: _serialize(default) for name, (_, default) in DEFINITIONS.items()}
+    values.update(_raw_values())
+    return values
+
+
+def validate(values):
+    """Error messages for submitted values that do not parse as their type"""
+    errors = []
+    for name, value in values.items():
+        parser = DEFINITIONS.get(name, (str, None))[0]
+        try:
+            parser(value)
+        except (TypeError, ValueError):
+            errors.append(f'Invalid value for {name.replace("_", " ")}: {value}')
+    return errors
+
+
+def save_settings(values, user=None):
+    """Upsert many settings in one statement and invalidate every process's copy"""
+    now = timezone.now()
+    rows = [
+        SystemSetting(setting_name=name, setting_value=_serialize(value), updated_by=user, updated_at=now)
+        for name, value in values.items()
+    ]
+    with transaction.atomic():
+        SystemSetting.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['setting_name'],
+            update_fields=['setting_value', 'updated_by', 'updated_at'],
+        )
+    invalidate()
+
+
+def invalidate():
+    """
+    Bump the version now, so this connection's next read sees the change, and
+    again on commit, so other processes cannot keep a copy read before it
+    """
+    bump_version()
+    transaction.on_commit(bump_version)
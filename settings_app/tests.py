@@ -1,3 +1,71 @@
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from authentication.models import Employee
+from hr_management.ledger import annual_allowance
+from .conf import get_setting, get_settings, save_settings, validate
+from .models import SystemSetting
+
+VALID_FORM = {
+    'company_name': 'Acme', 'max_leave_days': '25', 'overtime_rate': '2', 'working_hours_per_day': '7.5',
+    'session_timeout': '4', 'backup_frequency': 'weekly',
+}
+
+
+class SettingsAccessTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = Employee.objects.create(username='admin', name='Admin', role='Admin')
+
+    def test_defaults_and_types(self):
+        self.assertEqual(get_setting('overtime_rate'), Decimal('1.5'))
+        self.assertIs(get_setting('enable_notifications'), True)
+        self.assertEqual(get_setting('session_timeout'), 8)
+        self.assertEqual(get_setting('unknown', 'fallback'), 'fallback')
+
+    def test_reads_are_served_from_the_process_copy(self):
+        get_setting('overtime_rate')
+        with self.assertNumQueries(0):
+            get_setting('overtime_rate')
+            get_settings()
+
+    def test_save_settings_invalidates_copy(self):
+        get_setting('max_leave_days')
+        with self.captureOnCommitCallbacks(execute=True):
+            save_settings({'max_leave_days': Decimal('25'), 'enable_notifications': False}, user=self.admin)
+        self.assertEqual(get_setting('max_leave_days'), Decimal('25'))
+        self.assertEqual(annual_allowance(), Decimal('25'))
+        self.assertIs(get_setting('enable_notifications'), False)
+        self.assertEqual(SystemSetting.objects.get(setting_name='max_leave_days').updated_by, self.admin)
+
+    def test_model_save_invalidates_copy(self):
+        save_settings({'overtime_rate': '2'})
+        self.assertEqual(get_setting('overtime_rate'), Decimal('2'))
+        setting = SystemSetting.objects.get(setting_name='overtime_rate')
+        setting.setting_value = '3'
+        setting.save()
+        self.assertEqual(get_setting('overtime_rate'), Decimal('3'))
+
+    def test_non_finite_numbers_are_rejected(self):
+        for value in ('NaN', 'sNaN', 'Infinity', '-inf', 'abc', ''):
+            with self.subTest(value=value):
+                self.assertEqual(len(validate({'overtime_rate': value})), 1)
+        self.assertEqual(validate({'overtime_rate': '1.25', 'session_timeout': '4'}), [])
+
+    def test_unparsable_stored_value_falls_back_to_default(self):
+        SystemSetting.objects.create(setting_name='overtime_rate', setting_value='NaN')
+        self.assertEqual(get_setting('overtime_rate'), Decimal('1.5'))
+
+    def test_settings_view(self):
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/settings/', VALID_FORM)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(get_setting('working_hours_per_day'), Decimal('7.5'))
+        self.assertIs(get_setting('enable_notifications'), False)
+
+        response = self.client.post('/settings/', dict(VALID_FORM, overtime_rate='Infinity'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_setting('overtime_rate'), Decimal('2'))
@@ -0,0 +1,21 @@
+import signal
+
+from django.core.management.base import BaseCommand
+from task_queue.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None, help='Tasks run at once (default TASK_WORKER_CONCURRENCY)')
+        parser.add_argument('--poll-interval', type=float, default=None, help='Seconds between checks of an empty queue')
+        parser.add_argument('--burst', action='store_true', help='Exit once no queued task is due')
+
+    def handle(self, *args, **options):
+        worker = Worker(concurrency=options['concurrency'], poll_interval=options['poll_interval'])
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        self.stdout.write(f'Worker {worker.worker_id} running up to {worker.concurrency} tasks at once.')
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} tasks.'))
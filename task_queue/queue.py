@@ -0,0 +1,71 @@
+"""
+Database-backed background tasks.
+
+Functions decorated with @task (in an app's tasks.py) can be queued from a
+request with `enqueue(func, **kwargs)`, which only inserts a row in the
+task_queue table; `manage.py run_tasks` claims and runs queued tasks,
+highest priority first, and retries failures with exponential backoff.
+Since the row is written in the caller's transaction, a task queued by a
+request that rolls back is never run. Keyword arguments must be JSON
+serializable: pass primary keys and file names, not model instances.
+
+With TASKS_SYNC (set by the test settings) enqueue runs the task
+immediately instead, so tests can assert on its effects.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task
+
+_registry = {}
+
+
+class TaskDefinition:
+    def __init__(self, func, name, priority, max_attempts, retry_delay):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def backoff(self, attempts):
+        """Delay before retrying after the given number of failed attempts"""
+        return timedelta(seconds=self.retry_delay * 2 ** (attempts - 1))
+
+
+def task(name=None, priority=0, max_attempts=3, retry_delay=30):
+    """Register a function as a background task; the name defaults to 'app_module.function'"""
+    def register(func):
+        task_name = name or f"{func.__module__.split('.')[0]}.{func.__name__}"
+        definition = TaskDefinition(func, task_name, priority, max_attempts, retry_delay)
+        _registry[task_name] = definition
+        return definition
+    return register
+
+
+def get_task(name):
+    return _registry.get(name)
+
+
+def enqueue(definition, priority=None, delay=None, **kwargs):
+    """Queue a task to run in the background; returns the Task row (None when run synchronously)"""
+    if isinstance(definition, str):
+        definition = _registry[definition]
+    # Fail in the caller, not in the worker, on arguments that cannot be stored
+    kwargs = json.loads(json.dumps(kwargs))
+    if getattr(settings, 'TASKS_SYNC', False):
+        definition(**kwargs)
+        return None
+    return Task.objects.create(
+        name=definition.name,
+        kwargs=kwargs,
+        priority=definition.priority if priority is None else priority,
+        max_attempts=definition.max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay or 0),
+    )
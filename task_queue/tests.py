@@ -0,0 +1,125 @@
+import time
+from datetime import timedelta
+
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import enqueue, task
+from .worker import Worker, claim, execute, requeue_stale
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.flaky', max_attempts=2, retry_delay=10)
+def flaky():
+    raise ValueError('boom')
+
+
+@task(name='tests.slow')
+def slow(seconds, lock_timeout):
+    # Outlives the lock timeout, then sweeps stale locks as another worker would
+    time.sleep(seconds)
+    calls.append(requeue_stale(lock_timeout))
+
+
+# execute() closes the connection when done, which TestCase's transaction would not survive
+@override_settings(TASKS_SYNC=False)
+class TaskQueueTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_takes_due_tasks_by_priority_once(self):
+        low = enqueue(record, value=1)
+        high = enqueue(record, priority=5, value=2)
+        enqueue(record, delay=60, value=3)
+
+        self.assertEqual(claim('a', 1), [high.pk])
+        self.assertEqual(claim('b', 5), [low.pk])
+        self.assertEqual(claim('c', 5), [])
+        high.refresh_from_db()
+        self.assertEqual((high.status, high.locked_by, high.attempts), ('running', 'a', 1))
+
+    def test_execute_records_success(self):
+        pk = enqueue(record, value='x').pk
+        claim('a', 1)
+        self.assertTrue(execute(pk))
+        self.assertEqual(calls, ['x'])
+        done = Task.objects.get(pk=pk)
+        self.assertEqual((done.status, done.locked_by, done.locked_at), ('done', '', None))
+        self.assertIsNotNone(done.finished_at)
+
+    def test_failure_is_retried_with_backoff_then_fails(self):
+        pk = enqueue(flaky).pk
+        claim('a', 1)
+        with self.assertLogs('task_queue.worker', 'WARNING'):
+            self.assertFalse(execute(pk))
+        retry = Task.objects.get(pk=pk)
+        self.assertEqual((retry.status, retry.attempts), ('queued', 1))
+        self.assertIn('ValueError: boom', retry.last_error)
+        self.assertAlmostEqual((retry.run_after - timezone.now()).total_seconds(), 10, delta=5)
+        self.assertEqual(claim('a', 1), [])
+
+        Task.objects.filter(pk=pk).update(run_after=timezone.now())
+        claim('a', 1)
+        with self.assertLogs('task_queue.worker', 'WARNING'):
+            execute(pk)
+        failed = Task.objects.get(pk=pk)
+        self.assertEqual((failed.status, failed.attempts), ('failed', 2))
+        self.assertIsNotNone(failed.finished_at)
+
+    def test_unknown_task_fails_without_retry(self):
+        pk = Task.objects.create(name='tests.missing').pk
+        claim('a', 1)
+        with self.assertLogs('task_queue.worker', 'WARNING'):
+            execute(pk)
+        failed = Task.objects.get(pk=pk)
+        self.assertEqual(failed.status, 'failed')
+        self.assertIn('Unknown task', failed.last_error)
+
+    def test_stale_locks_are_requeued_or_failed(self):
+        stale = timezone.now() - timedelta(seconds=120)
+        retry = Task.objects.create(name='tests.record', status='running', attempts=1, locked_by='a', locked_at=stale)
+        spent = Task.objects.create(name='tests.record', status='running', attempts=3, locked_by='a', locked_at=stale)
+        fresh = Task.objects.create(name='tests.record', status='running', attempts=1, locked_by='b',
+                                    locked_at=timezone.now())
+
+        self.assertEqual(requeue_stale(60), 2)
+        self.assertEqual(Task.objects.get(pk=retry.pk).status, 'queued')
+        self.assertEqual(Task.objects.get(pk=spent.pk).status, 'failed')
+        self.assertEqual(Task.objects.get(pk=fresh.pk).status, 'running')
+
+    def test_heartbeat_renews_only_own_locks(self):
+        stale = timezone.now() - timedelta(seconds=120)
+        worker = Worker(lock_timeout=60)
+        own = Task.objects.create(name='tests.record', status='running', locked_by=worker.worker_id, locked_at=stale)
+        other = Task.objects.create(name='tests.record', status='running', locked_by='other', locked_at=stale)
+
+        self.assertEqual(worker.heartbeat([own.pk, other.pk]), 1)
+        self.assertEqual(requeue_stale(60), 1)
+        self.assertEqual(Task.objects.get(pk=own.pk).status, 'running')
+        self.assertEqual(Task.objects.get(pk=other.pk).status, 'queued')
+
+
+@override_settings(TASKS_SYNC=False)
+class WorkerTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_burst_runs_all_due_tasks(self):
+        for value in range(5):
+            enqueue(record, value=value)
+        self.assertEqual(Worker(concurrency=2, poll_interval=0.01).run(burst=True), 5)
+        self.assertEqual(sorted(calls), list(range(5)))
+        self.assertEqual(set(Task.objects.values_list('status', flat=True)), {'done'})
+
+    def test_task_outliving_the_lock_timeout_is_not_requeued(self):
+        pk = enqueue(slow, seconds=0.6, lock_timeout=0.3).pk
+        self.assertEqual(Worker(concurrency=1, poll_interval=0.01, lock_timeout=0.3).run(burst=True), 1)
+        self.assertEqual(calls, [0])
+        self.assertEqual(Task.objects.get(pk=pk).attempts, 1)
@@ -0,0 +1,182 @@
+"""
+Worker loop for `manage.py run_tasks`.
+
+A worker runs up to `concurrency` tasks at once on a thread pool. Tasks are
+claimed with a conditional UPDATE (status queued -> running), so any number
+of worker processes can share the table without running a task twice.
+While a task runs, its worker renews the lock every third of
+TASK_LOCK_TIMEOUT, so only tasks left running by a worker that died end up
+with a lock older than the timeout; they are queued again. Finished tasks
+are deleted after TASK_RETENTION_DAYS.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+from .queue import get_task
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL = 60  # Seconds between stale-lock and retention sweeps
+HEARTBEATS_PER_TIMEOUT = 3  # Lock renewals per TASK_LOCK_TIMEOUT while a task runs
+PURGE_BATCH_SIZE = 1000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def claim(worker_id, limit):
+    """Mark up to `limit` due tasks as running for this worker; returns their ids"""
+    now = timezone.now()
+    candidates = list(
+        Task.objects.filter(status='queued', run_after__lte=now)
+        .order_by('-priority', 'run_after', 'id')
+        .values_list('pk', flat=True)[:limit * 2]
+    )
+    claimed = []
+    for pk in candidates:
+        # Another worker may have claimed it since the SELECT
+        updated = Task.objects.filter(pk=pk, status='queued').update(
+            status='running', locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def execute(pk):
+    """Run one claimed task and record the outcome"""
+    try:
+        task = Task.objects.get(pk=pk)
+        definition = get_task(task.name)
+        try:
+            if definition is None:
+                raise LookupError(f'Unknown task {task.name!r}')
+            definition(**task.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            logger.warning('Task %s #%s failed (attempt %s of %s)', task.name, pk, task.attempts, task.max_attempts)
+            if definition is not None and task.attempts < task.max_attempts:
+                Task.objects.filter(pk=pk).update(
+                    status='queued', locked_by='', locked_at=None, last_error=error,
+                    run_after=timezone.now() + definition.backoff(task.attempts),
+                )
+            else:
+                Task.objects.filter(pk=pk).update(
+                    status='failed', locked_by='', locked_at=None, last_error=error, finished_at=timezone.now(),
+                )
+            return False
+        Task.objects.filter(pk=pk).update(status='done', locked_by='', locked_at=None, finished_at=timezone.now())
+        return True
+    finally:
+        close_old_connections()
+
+
+def requeue_stale(lock_timeout):
+    """Queue again tasks whose worker stopped without finishing them"""
+    cutoff = timezone.now() - timedelta(seconds=lock_timeout)
+    stale = Task.objects.filter(status='running', locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', locked_by='', locked_at=None, finished_at=timezone.now(),
+        last_error='Worker stopped while running the task',
+    )
+    return failed + stale.update(status='queued', locked_by='', locked_at=None)
+
+
+def purge_finished(retention_days):
+    """Delete done tasks older than the retention period, a batch at a time"""
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        batch = list(Task.objects.filter(status='done', finished_at__lt=cutoff).values_list('pk', flat=True)[:PURGE_BATCH_SIZE])
+        if not batch:
+            return deleted
+        deleted += Task.objects.filter(pk__in=batch).delete()[0]
+
+
+class Worker:
+    def __init__(self, concurrency=None, poll_interval=None, lock_timeout=None, retention_days=None):
+        self.concurrency = concurrency or _setting('TASK_WORKER_CONCURRENCY', 2)
+        self.poll_interval = poll_interval or _setting('TASK_POLL_INTERVAL', 1.0)
+        self.lock_timeout = lock_timeout or _setting('TASK_LOCK_TIMEOUT', 600)
+        self.retention_days = retention_days or _setting('TASK_RETENTION_DAYS', 7)
+        self.heartbeat_interval = self.lock_timeout / HEARTBEATS_PER_TIMEOUT
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.processed = 0
+
+    def stop(self):
+        """Finish the running tasks and exit; nothing new is claimed"""
+        self.stopping.set()
+
+    def maintenance(self):
+        requeue_stale(self.lock_timeout)
+        purge_finished(self.retention_days)
+
+    def heartbeat(self, pks):
+        """Renew the locks of tasks this worker is still running, so they are not taken for stale"""
+        return Task.objects.filter(pk__in=list(pks), status='running', locked_by=self.worker_id).update(
+            locked_at=timezone.now()
+        )
+
+    def run(self, burst=False):
+        """Process tasks until stopped, or with `burst` until no task is due"""
+        running = {}  # future: task pk
+        last_maintenance = None
+        last_heartbeat = timezone.now()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='task-worker') as pool:
+            while not self.stopping.is_set():
+                claimed = []
+                try:
+                    now = timezone.now()
+                    if running and (now - last_heartbeat).total_seconds() >= self.heartbeat_interval:
+                        self.heartbeat(running.values())
+                        last_heartbeat = now
+                    if last_maintenance is None or (now - last_maintenance).total_seconds() >= MAINTENANCE_INTERVAL:
+                        self.maintenance()
+                        last_maintenance = now
+                    free = self.concurrency - len(running)
+                    if free:
+                        claimed = claim(self.worker_id, free)
+                except DatabaseError:
+                    logger.exception('Could not claim tasks')
+                finally:
+                    close_old_connections()
+                running.update((pool.submit(execute, pk), pk) for pk in claimed)
+
+                if not running:
+                    if burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                if len(running) >= self.concurrency:
+                    timeout = self.heartbeat_interval  # Every slot busy: wait for one to free up
+                elif claimed:
+                    timeout = 0  # More tasks may be due
+                else:
+                    timeout = min(self.poll_interval, self.heartbeat_interval)
+                done, pending = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                running = {future: running[future] for future in pending}
+                self.processed += len(done)
+            # Keep renewing the locks while the last tasks finish
+            while running:
+                done, pending = wait(running, timeout=self.heartbeat_interval)
+                running = {future: running[future] for future in pending}
+                self.processed += len(done)
+                if running:
+                    self.heartbeat(running.values())
+                    close_old_connections()
+        return self.processed